@@ -0,0 +1,201 @@
+"""Inter-annotator agreement from running per-question rating sums.
+
+Triggers on ``feedback`` keep ``question_agreement`` current per question and
+metric. Per-category figures are not stored: :func:`category_summary` merges
+the per-question sums (a handful of rows per question) at read time, so a
+question moving to another category, or a different dispute threshold, needs
+no extra bookkeeping.
+"""
+import math
+import sqlite3
+
+# Rating columns tracked for inter-annotator agreement.
+RATING_METRICS = ("q_translation_rating", "answer_accuracy_rating", "answer_translation_rating")
+
+
+def _metric_case(alias: str) -> str:
+    whens = " ".join(f"WHEN '{m}' THEN {alias}.{m}" for m in RATING_METRICS)
+    return f"(CASE metric {whens} END)"
+
+
+def _metric_values(alias: str) -> str:
+    return " UNION ALL ".join(
+        f"SELECT '{m}' AS metric, {alias}.{m} AS value" for m in RATING_METRICS
+    )
+
+
+_ADD_NEW = f"""
+    INSERT INTO question_agreement (question_id, metric, n, total, total_sq)
+    SELECT NEW.question_id, metric, 1, value, value * value
+    FROM ({_metric_values("NEW")})
+    WHERE value IS NOT NULL AND NEW.submission_status = 'submitted'
+    ON CONFLICT(question_id, metric) DO UPDATE SET
+      n = n + excluded.n,
+      total = total + excluded.total,
+      total_sq = total_sq + excluded.total_sq;
+"""
+
+_REMOVE_OLD = f"""
+    UPDATE question_agreement SET
+      n = n - 1,
+      total = total - {_metric_case("OLD")},
+      total_sq = total_sq - {_metric_case("OLD")} * {_metric_case("OLD")}
+    WHERE question_id = OLD.question_id
+      AND OLD.submission_status = 'submitted'
+      AND {_metric_case("OLD")} IS NOT NULL;
+"""
+
+# Running per-question aggregates (count, sum, sum of squares) maintained by
+# triggers, so every write path -- UI, scripts, imports -- keeps them current.
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS question_agreement (
+    question_id INTEGER NOT NULL,
+    metric TEXT NOT NULL,
+    n INTEGER NOT NULL DEFAULT 0,
+    total INTEGER NOT NULL DEFAULT 0,
+    total_sq INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (question_id, metric)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS trg_feedback_agreement_insert
+AFTER INSERT ON feedback
+BEGIN
+{_ADD_NEW}
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_feedback_agreement_update
+AFTER UPDATE OF question_id, submission_status, {", ".join(RATING_METRICS)} ON feedback
+BEGIN
+{_REMOVE_OLD}
+{_ADD_NEW}
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_feedback_agreement_delete
+AFTER DELETE ON feedback
+BEGIN
+{_REMOVE_OLD}
+END;
+"""
+
+
+def ensure_schema(conn: sqlite3.Connection) -> None:
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='question_agreement'"
+    ).fetchone()
+    conn.executescript(SCHEMA)
+    if not exists:
+        recompute(conn)
+
+
+def recompute(conn: sqlite3.Connection) -> int:
+    """Batch mode: rebuild every aggregate with one grouped pass per metric."""
+    conn.execute("DELETE FROM question_agreement")
+    inserted = 0
+    for metric in RATING_METRICS:
+        inserted += conn.execute(
+            f"""
+            INSERT INTO question_agreement (question_id, metric, n, total, total_sq)
+            SELECT question_id, '{metric}', COUNT({metric}), SUM({metric}), SUM({metric} * {metric})
+            FROM feedback
+            WHERE submission_status = 'submitted' AND {metric} IS NOT NULL
+            GROUP BY question_id
+            """
+        ).rowcount
+    return inserted
+
+
+def _stats(n, total, total_sq):
+    if not n:
+        return None, None
+    mean = total / n
+    if n < 2:
+        return mean, 0.0
+    variance = max((total_sq - total * total / n) / (n - 1), 0.0)
+    return mean, variance
+
+
+def _metric_columns() -> str:
+    parts = []
+    for m in RATING_METRICS:
+        parts.append(f"MAX(CASE WHEN qa.metric = '{m}' THEN qa.n END) AS {m}_n")
+        parts.append(f"MAX(CASE WHEN qa.metric = '{m}' THEN qa.total END) AS {m}_total")
+        parts.append(f"MAX(CASE WHEN qa.metric = '{m}' THEN qa.total_sq END) AS {m}_total_sq")
+    return ",\n              ".join(parts)
+
+
+_VARIANCE_SQL = "(CASE WHEN qa.n >= 2 THEN (qa.total_sq - qa.total * 1.0 * qa.total / qa.n) / (qa.n - 1) ELSE 0 END)"
+
+
+def disputed_questions(conn: sqlite3.Connection, stddev_threshold: float, limit=None):
+    """Questions ordered by their largest per-metric variance, most disputed first.
+
+    Reads only ``question_agreement`` (a few rows per question), never ``feedback``.
+    """
+    sql = f"""
+        SELECT
+          qa.question_id,
+          q.category,
+          q.q_gu,
+          MAX({_VARIANCE_SQL}) AS max_variance,
+          {_metric_columns()}
+        FROM question_agreement qa
+        JOIN questions q ON q.id = qa.question_id
+        WHERE qa.n > 0
+        GROUP BY qa.question_id
+        HAVING MAX(qa.n) >= 2
+        ORDER BY max_variance DESC, qa.question_id
+    """
+    params = ()
+    if limit is not None:
+        sql += " LIMIT ?"
+        params = (limit,)
+    results = []
+    for row in conn.execute(sql, params).fetchall():
+        item = {
+            "question_id": row["question_id"],
+            "category": row["category"] or "",
+            "q_gu": row["q_gu"],
+            "max_stddev": math.sqrt(row["max_variance"] or 0.0),
+        }
+        for m in RATING_METRICS:
+            mean, variance = _stats(row[f"{m}_n"], row[f"{m}_total"], row[f"{m}_total_sq"])
+            item[f"{m}_n"] = row[f"{m}_n"] or 0
+            item[f"{m}_mean"] = mean
+            item[f"{m}_stddev"] = None if variance is None else math.sqrt(variance)
+        item["disputed"] = item["max_stddev"] >= stddev_threshold
+        results.append(item)
+    return results
+
+
+def category_summary(conn: sqlite3.Connection, stddev_threshold: float):
+    """Per-category aggregates, merged from the per-question running sums."""
+    rows = conn.execute(
+        f"""
+        SELECT
+          COALESCE(q.category, '') AS category,
+          qa.metric,
+          SUM(qa.n) AS n,
+          SUM(qa.total) AS total,
+          SUM(qa.total_sq) AS total_sq,
+          COUNT(DISTINCT qa.question_id) AS questions,
+          COUNT(DISTINCT CASE WHEN qa.n >= 2 AND {_VARIANCE_SQL} >= ? THEN qa.question_id END) AS disputed_questions
+        FROM question_agreement qa
+        JOIN questions q ON q.id = qa.question_id
+        WHERE qa.n > 0
+        GROUP BY COALESCE(q.category, ''), qa.metric
+        ORDER BY category, qa.metric
+        """,
+        (stddev_threshold * stddev_threshold,),
+    ).fetchall()
+    summary = {}
+    for row in rows:
+        mean, variance = _stats(row["n"], row["total"], row["total_sq"])
+        entry = summary.setdefault(row["category"], {"category": row["category"], "metrics": {}})
+        entry["metrics"][row["metric"]] = {
+            "n": row["n"],
+            "mean": mean,
+            "stddev": None if variance is None else math.sqrt(variance),
+            "questions": row["questions"],
+            "disputed_questions": row["disputed_questions"],
+        }
+    return list(summary.values())
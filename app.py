@@ -1,20 +1,47 @@
+import atexit
 import csv
+import gzip
+import hmac
 import html
 import io
+import json
 import os
+import queue
 import random
+import signal
 import sqlite3
-from datetime import datetime
+import sys
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional
 
 import markdown
-from flask import Flask, Response, g, redirect, render_template, request, session, url_for
+from flask import Flask, Response, g, jsonify, redirect, render_template, request, send_file, session, url_for
 from markupsafe import Markup
+from werkzeug.exceptions import RequestEntityTooLarge
+
+import analytics
+import datasets
+import dedupe
+import feedback
+import live
+import maintenance
+import queueing
+import replica
+import schema
+import snapshots
+import storage
+import timings
+import tracing
 
 
 BASE_DIR = Path(__file__).resolve().parent
-DB_PATH = BASE_DIR / "app.db"
+DB_PATH = Path(os.environ.get("DB_PATH") or BASE_DIR / "app.db")
+CATALOG_PATH = Path(os.environ.get("CATALOG_PATH") or BASE_DIR / "catalog.db")
+DATASETS_DIR = Path(os.environ.get("DATASETS_DIR") or BASE_DIR / "datasets")
 SOURCE_CSV = BASE_DIR / "data" / "Sheets" / "500_goldenset_final_sheet.csv"
 
 
@@ -23,100 +50,254 @@ def create_app() -> Flask:
     app.config["SECRET_KEY"] = os.environ.get("SECRET_KEY", "dev-secret-change-me")
     app.config["ADMIN_EMAIL"] = os.environ.get("ADMIN_EMAIL", "admin@local")
     app.config["ADMIN_PASSWORD"] = os.environ.get("ADMIN_PASSWORD", "admin123")
+    app.config["DB_PATH"] = DB_PATH
+    app.config["CATALOG_PATH"] = CATALOG_PATH
+    app.config["DATASETS_DIR"] = DATASETS_DIR
+    app.config["WRITE_BATCH_WINDOW_MS"] = float(os.environ.get("WRITE_BATCH_WINDOW_MS", "5"))
+    app.config["WRITE_MAX_BATCH"] = int(os.environ.get("WRITE_MAX_BATCH", "256"))
+    app.config["EXPORT_SETTLE_SECONDS"] = float(os.environ.get("EXPORT_SETTLE_SECONDS", "5"))
+    app.config["AGREEMENT_STDDEV_THRESHOLD"] = float(os.environ.get("AGREEMENT_STDDEV_THRESHOLD", "1.0"))
+    app.config["SNAPSHOT_DIR"] = Path(os.environ.get("SNAPSHOT_DIR") or BASE_DIR / "snapshots")
+    app.config["SNAPSHOT_INTERVAL_MINUTES"] = float(os.environ.get("SNAPSHOT_INTERVAL_MINUTES", "0"))
+    app.config["SNAPSHOT_KEEP"] = int(os.environ.get("SNAPSHOT_KEEP", "7"))
+    app.config["SNAPSHOT_PAGES"] = int(os.environ.get("SNAPSHOT_PAGES", "256"))
+    app.config["USER_CACHE_SIZE"] = int(os.environ.get("USER_CACHE_SIZE", "1024"))
+    app.config["LIVE_POLL_INTERVAL_MS"] = float(os.environ.get("LIVE_POLL_INTERVAL_MS", "500"))
+    app.config["LIVE_KEEPALIVE_SECONDS"] = float(os.environ.get("LIVE_KEEPALIVE_SECONDS", "15"))
+    app.config["OFFLINE_BUNDLE_MAX"] = int(os.environ.get("OFFLINE_BUNDLE_MAX", "50"))
+    # Caps request bodies both as sent and after gzip decompression.
+    app.config["MAX_CONTENT_LENGTH"] = int(os.environ.get("MAX_CONTENT_LENGTH", str(64 * 1024 * 1024)))
+    app.config["INGEST_TOKEN"] = os.environ.get("INGEST_TOKEN", "")
+    app.config["TIMING_FLUSH_SIZE"] = int(os.environ.get("TIMING_FLUSH_SIZE", "200"))
+    app.config["TIMING_FLUSH_SECONDS"] = float(os.environ.get("TIMING_FLUSH_SECONDS", "10"))
+    app.config["MAINTENANCE_INTERVAL_MINUTES"] = float(os.environ.get("MAINTENANCE_INTERVAL_MINUTES", "60"))
+    app.config["MAINTENANCE_IDLE_SECONDS"] = float(os.environ.get("MAINTENANCE_IDLE_SECONDS", "60"))
+    app.config["MAINTENANCE_BUDGET_SECONDS"] = float(os.environ.get("MAINTENANCE_BUDGET_SECONDS", "5"))
+    app.config["TIMING_RETENTION_DAYS"] = float(os.environ.get("TIMING_RETENTION_DAYS", "90"))
+    app.config["TRACE_FILE"] = os.environ.get("TRACE_FILE", "")
+    app.config["TRACE_SECRET"] = os.environ.get("TRACE_SECRET") or app.config["SECRET_KEY"]
+    app.config["TRACE_SAMPLE"] = float(os.environ.get("TRACE_SAMPLE", "1"))
+    app.config["QUEUE_ORDERING"] = os.environ.get("QUEUE_ORDERING", queueing.DEFAULT_ORDERING)
+    app.config["REPORT_REPLICA_DIR"] = Path(os.environ.get("REPORT_REPLICA_DIR") or BASE_DIR / "replicas")
+    app.config["REPORT_REPLICA_MAX_AGE_SECONDS"] = float(os.environ.get("REPORT_REPLICA_MAX_AGE_SECONDS", "0"))
+
+    dataset_catalog = datasets.DatasetCatalog(
+        app.config["CATALOG_PATH"], app.config["DB_PATH"], app.config["DATASETS_DIR"]
+    )
+
+    def current_dataset() -> str:
+        return g.get("dataset") or datasets.DEFAULT_DATASET
+
+    def current_db_path() -> Path:
+        # Every per-dataset resource (connection, writer, caches) keys off this path.
+        return g.get("db_path") or Path(app.config["DB_PATH"])
+
+    write_queues = {}
+    write_queues_lock = threading.Lock()
+
+    version_watchers = {}
+    cache_registries = {}
+    progress_broadcasters = {}
+    report_replicas = {}
+    timing_buffers = {}
+
+    def table_versions() -> dict:
+        # One data_version probe per request, shared by every cache.
+        if "table_versions" not in g:
+            db_path = current_db_path()
+            with write_queues_lock:
+                watcher = version_watchers.get(db_path)
+                if watcher is None:
+                    watcher = storage.VersionWatcher(db_path)
+                    version_watchers[db_path] = watcher
+            g.table_versions = watcher.versions()
+        return g.table_versions
+
+    # name -> (tables read, max entries); every worker builds its own copies.
+    cache_specs = {
+        "users": (("users",), app.config["USER_CACHE_SIZE"]),
+        "email_prefixes": (("users",), 1024),
+        "pickers": (("questions", "users"), 2048),
+        "rendered_questions": (("questions",), 512),
+        "user_progress": (("assignments", "feedback"), 1024),
+    }
+
+    def get_cache_registry() -> storage.CacheRegistry:
+        db_path = current_db_path()
+        with write_queues_lock:
+            registry = cache_registries.get(db_path)
+            if registry is None:
+                registry = storage.CacheRegistry()
+                for name, (depends_on, max_entries) in cache_specs.items():
+                    registry.register(storage.DependentCache(name, depends_on, max_entries))
+                cache_registries[db_path] = registry
+            return registry
+
+    def cached(name: str, key, load, depends_on=None):
+        """``load()`` through the named cache; ``None`` results are not cached."""
+        cache = get_cache_registry().get(name)
+        value = cache.get(key)
+        if value is None:
+            # Versions were probed at the start of the request, before load() reads.
+            versions = table_versions()
+            value = load()
+            if value is not None:
+                cache.set(key, value, versions, depends_on)
+        return value
+
+    def get_progress_broadcaster() -> live.ProgressBroadcaster:
+        db_path = current_db_path()
+        with write_queues_lock:
+            broadcaster = progress_broadcasters.get(db_path)
+            if broadcaster is None:
+                broadcaster = live.ProgressBroadcaster(
+                    db_path, poll_interval=app.config["LIVE_POLL_INTERVAL_MS"] / 1000.0
+                )
+                progress_broadcasters[db_path] = broadcaster
+            return broadcaster
+
+    def get_timing_buffer() -> timings.TimingBuffer:
+        db_path = current_db_path()
+        with write_queues_lock:
+            buffer = timing_buffers.get(db_path)
+            if buffer is None:
+                buffer = timings.TimingBuffer(
+                    flush_size=app.config["TIMING_FLUSH_SIZE"],
+                    flush_seconds=app.config["TIMING_FLUSH_SECONDS"],
+                )
+                timing_buffers[db_path] = buffer
+            return buffer
+
+    def write_timings(events: list):
+        retention_days = app.config["TIMING_RETENTION_DAYS"]
+        return lambda conn: timings.write_events(conn, events, retention_days)
+
+    def record_timing(metric: str, ms: float, user_id, question_id) -> None:
+        # Fire and forget: a full buffer is queued to the writer without waiting on it.
+        events = get_timing_buffer().add(user_id, question_id, metric, ms)
+        if events:
+            get_write_queue().submit_call(write_timings(events))
+
+    def flush_timings() -> int:
+        events = get_timing_buffer().drain()
+        if events:
+            get_write_queue().call(write_timings(events))
+        return len(events)
+
+    def get_report_replica() -> Optional[replica.ReportingReplica]:
+        # REPORT_REPLICA_MAX_AGE_SECONDS=0 keeps reports on the primary database.
+        if app.config["REPORT_REPLICA_MAX_AGE_SECONDS"] <= 0:
+            return None
+        db_path = current_db_path()
+        with write_queues_lock:
+            report_replica = report_replicas.get(db_path)
+            if report_replica is None:
+                report_replica = replica.ReportingReplica(
+                    db_path,
+                    app.config["REPORT_REPLICA_DIR"],
+                    max_age_seconds=app.config["REPORT_REPLICA_MAX_AGE_SECONDS"],
+                )
+                report_replicas[db_path] = report_replica
+            return report_replica
+
+    snapshot_scheduler = snapshots.SnapshotScheduler(
+        db_paths=dataset_catalog.db_paths,
+        snapshot_dir=app.config["SNAPSHOT_DIR"],
+        interval_seconds=app.config["SNAPSHOT_INTERVAL_MINUTES"] * 60,
+        keep=app.config["SNAPSHOT_KEEP"],
+        pages=app.config["SNAPSHOT_PAGES"],
+    )
+    maintenance_scheduler = maintenance.MaintenanceScheduler(
+        db_paths=dataset_catalog.db_paths,
+        interval_seconds=app.config["MAINTENANCE_INTERVAL_MINUTES"] * 60,
+        idle_seconds=app.config["MAINTENANCE_IDLE_SECONDS"],
+        budget_seconds=app.config["MAINTENANCE_BUDGET_SECONDS"],
+    )
 
     def get_db() -> sqlite3.Connection:
         if "db" not in g:
-            g.db = sqlite3.connect(DB_PATH)
-            g.db.row_factory = sqlite3.Row
+            g.db = storage.connect(current_db_path())
         return g.db
 
+    def get_report_db() -> sqlite3.Connection:
+        """Read-only connection for admin reports and exports (the primary when no replica)."""
+        report_replica = get_report_replica()
+        if report_replica is None:
+            return get_db()
+        if "report_db" not in g:
+            report_replica.ensure_fresh()
+            # Taken before opening, so the stamp is never newer than the data read.
+            g.report_status = report_replica.status()
+            g.report_db = report_replica.connect()
+        return g.report_db
+
+    def report_status() -> Optional[dict]:
+        if "report_status" in g:
+            return g.report_status
+        report_replica = get_report_replica()
+        return report_replica.status() if report_replica is not None else None
+
+    def refresh_reports() -> None:
+        # Called after admin writes so the page rendered next reflects them.
+        report_replica = get_report_replica()
+        if report_replica is not None:
+            g.pop("report_status", None)
+            stale = g.pop("report_db", None)
+            if stale is not None:
+                stale.close()
+            report_replica.refresh()
+
+    def get_write_queue() -> storage.WriteQueue:
+        db_path = current_db_path()
+        with write_queues_lock:
+            writer = write_queues.get(db_path)
+            if writer is None:
+                writer = storage.WriteQueue(
+                    db_path,
+                    batch_window_ms=app.config["WRITE_BATCH_WINDOW_MS"],
+                    max_batch=app.config["WRITE_MAX_BATCH"],
+                )
+                write_queues[db_path] = writer
+            return writer
+
+    def shutdown() -> None:
+        # Commit queued writes, then fold the WAL into the DB file so nothing lives
+        # only in app.db-wal when the container (and its writable layer) goes away.
+        with write_queues_lock:
+            writers = dict(write_queues)
+        for writer in writers.values():
+            writer.stop()
+        for db_path in {Path(app.config["DB_PATH"]), *writers}:
+            try:
+                storage.checkpoint(db_path)
+            except sqlite3.Error:
+                pass
+
+    atexit.register(shutdown)
+
     @app.teardown_appcontext
     def close_db(_error):
-        db = g.pop("db", None)
-        if db is not None:
-            db.close()
+        for key in ("db", "report_db"):
+            db = g.pop(key, None)
+            if db is not None:
+                db.close()
 
-    def init_db() -> None:
-        db = get_db()
-        db.executescript(
-            """
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                email TEXT NOT NULL UNIQUE,
-                username TEXT,
-                is_admin INTEGER NOT NULL DEFAULT 0
-            );
-
-            CREATE TABLE IF NOT EXISTS questions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                category TEXT,
-                q_gu TEXT NOT NULL,
-                q_en TEXT,
-                search_results TEXT,
-                a_en TEXT,
-                a_gu TEXT,
-                active INTEGER NOT NULL DEFAULT 1
-            );
-
-            CREATE UNIQUE INDEX IF NOT EXISTS idx_questions_unique
-            ON questions(category, q_gu, q_en);
-
-            CREATE TABLE IF NOT EXISTS assignments (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                question_id INTEGER NOT NULL,
-                UNIQUE(user_id, question_id),
-                FOREIGN KEY(user_id) REFERENCES users(id),
-                FOREIGN KEY(question_id) REFERENCES questions(id)
-            );
-
-            CREATE TABLE IF NOT EXISTS feedback (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                question_id INTEGER NOT NULL,
-                submission_status TEXT NOT NULL DEFAULT 'submitted',
-                q_translation_rating INTEGER,
-                q_translation_comment TEXT,
-                search_rating INTEGER,
-                search_issue_type TEXT,
-                search_comment TEXT,
-                answer_accuracy_rating INTEGER,
-                answer_translation_rating INTEGER,
-                answer_comment TEXT,
-                created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL,
-                UNIQUE(user_id, question_id),
-                FOREIGN KEY(user_id) REFERENCES users(id),
-                FOREIGN KEY(question_id) REFERENCES questions(id)
-            );
-
-            CREATE TABLE IF NOT EXISTS suggested_questions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                question_text_gu TEXT NOT NULL,
-                question_text_en TEXT,
-                status TEXT NOT NULL DEFAULT 'new',
-                notes TEXT,
-                created_at TEXT NOT NULL,
-                FOREIGN KEY(user_id) REFERENCES users(id)
-            );
-            """
-        )
-        migrate_db()
-        db.commit()
+    initialized_dbs = set()
+    init_lock = threading.Lock()
 
-    def migrate_db() -> None:
-        db = get_db()
-        feedback_columns = {
-            row["name"] for row in db.execute("PRAGMA table_info(feedback)").fetchall()
-        }
-        if "submission_status" not in feedback_columns:
-            db.execute(
-                "ALTER TABLE feedback ADD COLUMN submission_status TEXT NOT NULL DEFAULT 'submitted'"
-            )
-            db.execute(
-                "UPDATE feedback SET submission_status='submitted' WHERE submission_status IS NULL OR submission_status=''"
-            )
+    def init_db() -> None:
+        # Schema checks and migrations run once per database file per process, not per request.
+        db_path = current_db_path()
+        if db_path in initialized_dbs:
+            return
+        with init_lock:
+            if db_path in initialized_dbs:
+                return
+            db = get_db()
+            schema.ensure_schema(db)
+            if queueing.configure(db, app.config["QUEUE_ORDERING"]):
+                db.commit()
+            initialized_dbs.add(db_path)
 
     def parse_search_sections(raw_text: str):
         text = (raw_text or "").strip()
@@ -166,7 +347,18 @@ def create_app() -> Flask:
         )
         return Markup(rendered)
 
-    def get_pending_question_for_user(user_id: int) -> Optional[sqlite3.Row]:
+    def rendered_question(question: sqlite3.Row) -> dict:
+        return cached(
+            "rendered_questions",
+            question["id"],
+            lambda: {
+                "search_sections": parse_search_sections(question["search_results"]),
+                "answer_en_md": render_markdown(question["a_en"]),
+                "answer_gu_md": render_markdown(question["a_gu"]),
+            },
+        )
+
+    def get_pending_questions_for_user(user_id: int, limit: int = 1):
         return get_db().execute(
             """
             SELECT q.*
@@ -177,13 +369,20 @@ def create_app() -> Flask:
              AND f.question_id = a.question_id
              AND f.submission_status = 'submitted'
             WHERE a.user_id = ? AND q.active = 1 AND f.id IS NULL
-            ORDER BY q.id
-            LIMIT 1
+            ORDER BY a.priority DESC, a.question_id
+            LIMIT ?
             """,
-            (user_id,),
-        ).fetchone()
+            (user_id, limit),
+        ).fetchall()
+
+    def get_pending_question_for_user(user_id: int) -> Optional[sqlite3.Row]:
+        rows = get_pending_questions_for_user(user_id, 1)
+        return rows[0] if rows else None
 
     def get_user_progress(user_id: int):
+        return cached("user_progress", user_id, lambda: load_user_progress(user_id))
+
+    def load_user_progress(user_id: int):
         row = get_db().execute(
             """
             SELECT
@@ -238,11 +437,15 @@ def create_app() -> Flask:
         db.executemany(
             """
             INSERT OR IGNORE INTO questions
-            (category, q_gu, q_en, search_results, a_en, a_gu)
-            VALUES (?, ?, ?, ?, ?, ?)
+            (content_key, payload_hash, category, q_gu, q_en, search_results, a_en, a_gu)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             """,
-            rows,
+            [
+                (storage.question_content_key(*row[:3]), storage.question_payload_hash(*row[3:]), *row)
+                for row in rows
+            ],
         )
+        dedupe.sync_questions(db)
         db.commit()
 
     def bootstrap_users_if_empty() -> None:
@@ -261,17 +464,92 @@ def create_app() -> Flask:
         except (TypeError, ValueError):
             return None
 
+    def select_dataset() -> None:
+        requested = datasets.normalize_slug(request.values.get("dataset"))
+        slug = requested or session.get("dataset") or datasets.DEFAULT_DATASET
+        db_path = dataset_catalog.resolve(slug)
+        if db_path is None:
+            slug, db_path = datasets.DEFAULT_DATASET, Path(app.config["DB_PATH"])
+        if slug != (session.get("dataset") or datasets.DEFAULT_DATASET):
+            # Annotator ids belong to one dataset file; switching requires a fresh login.
+            session.pop("user_id", None)
+            session["dataset"] = slug
+        g.dataset = slug
+        g.db_path = db_path
+
+    @app.context_processor
+    def inject_datasets():
+        return {"datasets": dataset_catalog.list(), "current_dataset": current_dataset()}
+
+    trace_recorder = (
+        tracing.TraceRecorder(app.config["TRACE_FILE"], app.config["TRACE_SECRET"], app.config["TRACE_SAMPLE"])
+        if app.config["TRACE_FILE"]
+        else None
+    )
+
+    @app.before_request
+    def start_trace():
+        if trace_recorder is not None and request.endpoint != "static" and trace_recorder.wants():
+            g.trace_started = (time.time(), time.perf_counter())
+
+    @app.after_request
+    def finish_trace(response):
+        started = g.pop("trace_started", None)
+        if started is not None:
+            trace_recorder.record(
+                request,
+                response,
+                session,
+                current_dataset(),
+                started[0],
+                (time.perf_counter() - started[1]) * 1000.0,
+            )
+        return response
+
+    SERVER_TIMED_ENDPOINTS = {"annotate": "annotate", "annotate_save": "save"}
+
+    @app.before_request
+    def start_server_timing():
+        # Registered first so the measured time includes dataset selection and bootstrap.
+        if request.endpoint in SERVER_TIMED_ENDPOINTS:
+            g.timing_started = time.perf_counter()
+
+    @app.after_request
+    def finish_server_timing(response):
+        started = g.pop("timing_started", None)
+        if started is not None:
+            elapsed_ms = (time.perf_counter() - started) * 1000.0
+            response.headers["Server-Timing"] = f"app;dur={elapsed_ms:.1f}"
+            if session.get("user_id"):
+                record_timing(
+                    SERVER_TIMED_ENDPOINTS[request.endpoint],
+                    elapsed_ms,
+                    session["user_id"],
+                    g.get("timing_question_id"),
+                )
+        return response
+
     @app.before_request
     def ensure_bootstrapped():
+        if request.endpoint == "static":
+            return
+        select_dataset()
         init_db()
-        bootstrap_questions_if_empty()
+        if current_dataset() == datasets.DEFAULT_DATASET:
+            bootstrap_questions_if_empty()
         bootstrap_users_if_empty()
+        snapshot_scheduler.start()
+        maintenance_scheduler.start()
+        # Drops entries that read a table changed by any process since this worker's last request.
+        get_cache_registry().sync(table_versions())
 
     def current_user():
         user_id = session.get("user_id")
         if not user_id:
             return None
-        return get_db().execute("SELECT * FROM users WHERE id = ?", (user_id,)).fetchone()
+        return cached(
+            "users", user_id, lambda: get_db().execute("SELECT * FROM users WHERE id = ?", (user_id,)).fetchone()
+        )
 
     def require_user():
         user = current_user()
@@ -290,23 +568,48 @@ def create_app() -> Flask:
             return redirect(url_for("annotate"))
         return redirect(url_for("annotator_login"))
 
+    def search_emails(prefix: str, limit: int = 8):
+        prefix = storage.normalize_email(prefix)
+        if not prefix:
+            return []
+        # Range scan on idx_users_email_norm; LIKE 'x%' would not use the index.
+        return cached(
+            "email_prefixes",
+            (prefix, limit),
+            lambda: [
+                row["email"]
+                for row in get_db().execute(
+                    """
+                    SELECT email FROM users
+                    WHERE email_norm >= ? AND email_norm < ?
+                    ORDER BY email_norm
+                    LIMIT ?
+                    """,
+                    (prefix, storage.prefix_upper_bound(prefix), limit),
+                )
+            ],
+        )
+
     @app.route("/annotator/login", methods=["GET", "POST"])
     def annotator_login():
-        db = get_db()
         if request.method == "POST":
-            email = (request.form.get("email") or "").strip().lower()
-            user = db.execute("SELECT * FROM users WHERE lower(email) = ?", (email,)).fetchone()
+            email = storage.normalize_email(request.form.get("email"))
+            user = get_db().execute("SELECT id FROM users WHERE email_norm = ?", (email,)).fetchone()
             if user:
                 session["user_id"] = user["id"]
                 return redirect(url_for("annotate"))
             return render_template(
                 "annotator_login.html",
-                users=db.execute("SELECT email FROM users ORDER BY email").fetchall(),
-                error="Selected email was not found.",
+                email=email,
+                error="Email was not found.",
             )
+        return render_template("annotator_login.html", email="")
 
-        users = db.execute("SELECT email FROM users ORDER BY email").fetchall()
-        return render_template("annotator_login.html", users=users)
+    @app.route("/annotator/emails.json")
+    def annotator_emails():
+        response = jsonify({"emails": search_emails(request.args.get("q") or "")})
+        response.headers["Cache-Control"] = "private, max-age=30"
+        return response
 
     @app.route("/annotator/logout")
     def annotator_logout():
@@ -323,6 +626,7 @@ def create_app() -> Flask:
 
         if not question:
             return render_template("annotate_done.html", user=user, progress=progress)
+        g.timing_question_id = question["id"]
 
         existing = get_feedback(user["id"], question["id"])
         form_data = {}
@@ -343,9 +647,7 @@ def create_app() -> Flask:
             user=user,
             question=question,
             progress=progress,
-            search_sections=parse_search_sections(question["search_results"]),
-            answer_en_md=render_markdown(question["a_en"]),
-            answer_gu_md=render_markdown(question["a_gu"]),
+            **rendered_question(question),
             form_data=form_data,
             error=None,
             notice=request.args.get("notice"),
@@ -361,6 +663,7 @@ def create_app() -> Flask:
         question_id = get_required_int(request.form.get("question_id"))
         if question_id is None:
             return redirect(url_for("annotate"))
+        g.timing_question_id = question_id
         question = db.execute("SELECT * FROM questions WHERE id = ? AND active = 1", (question_id,)).fetchone()
         assigned = db.execute(
             "SELECT 1 FROM assignments WHERE user_id = ? AND question_id = ?",
@@ -369,131 +672,286 @@ def create_app() -> Flask:
         if not question or not assigned:
             return redirect(url_for("annotate"))
 
-        form_data = {
-            "q_translation_rating": (request.form.get("q_translation_rating") or "").strip(),
-            "q_translation_comment": (request.form.get("q_translation_comment") or "").strip(),
-            "search_comment": (request.form.get("search_comment") or "").strip(),
-            "answer_accuracy_rating": (request.form.get("answer_accuracy_rating") or "").strip(),
-            "answer_translation_rating": (request.form.get("answer_translation_rating") or "").strip(),
-            "answer_comment": (request.form.get("answer_comment") or "").strip(),
-        }
+        form_data = feedback.clean_form(request.form)
         save_action = (request.form.get("save_action") or "submitted").strip()
-        if save_action not in {"draft", "submitted"}:
+        if save_action not in feedback.SAVE_ACTIONS:
             save_action = "submitted"
 
-        if save_action == "submitted":
-            required_rating_fields = [
-                "q_translation_rating",
-                "answer_accuracy_rating",
-                "answer_translation_rating",
-            ]
-            for field in required_rating_fields:
-                if form_data[field] not in {"1", "2", "3", "4", "5"}:
-                    return render_template(
-                        "annotate.html",
-                        user=user,
-                        question=question,
-                        progress=get_user_progress(user["id"]),
-                        search_sections=parse_search_sections(question["search_results"]),
-                        answer_en_md=render_markdown(question["a_en"]),
-                        answer_gu_md=render_markdown(question["a_gu"]),
-                        form_data=form_data,
-                        error="All ratings are required and must be between 1 and 5 before submit.",
-                        notice=None,
-                    )
-
-        if save_action == "submitted":
-            if int(form_data["q_translation_rating"]) <= 2 and not form_data["q_translation_comment"]:
-                return render_template(
-                    "annotate.html",
-                    user=user,
-                    question=question,
-                    progress=get_user_progress(user["id"]),
-                    search_sections=parse_search_sections(question["search_results"]),
-                    answer_en_md=render_markdown(question["a_en"]),
-                    answer_gu_md=render_markdown(question["a_gu"]),
-                    form_data=form_data,
-                    error="Add a question translation comment when rating is 1 or 2.",
-                    notice=None,
-                )
-            if (
-                int(form_data["answer_accuracy_rating"]) <= 2
-                or int(form_data["answer_translation_rating"]) <= 2
-            ) and not form_data["answer_comment"]:
-                return render_template(
-                    "annotate.html",
-                    user=user,
-                    question=question,
-                    progress=get_user_progress(user["id"]),
-                    search_sections=parse_search_sections(question["search_results"]),
-                    answer_en_md=render_markdown(question["a_en"]),
-                    answer_gu_md=render_markdown(question["a_gu"]),
-                    form_data=form_data,
-                    error="Add an answer comment when answer accuracy/translation rating is 1 or 2.",
-                    notice=None,
-                )
+        error = feedback.validate(form_data, save_action)
+        if error:
+            return render_template(
+                "annotate.html",
+                user=user,
+                question=question,
+                progress=get_user_progress(user["id"]),
+                **rendered_question(question),
+                form_data=form_data,
+                error=error,
+                notice=None,
+            )
 
         now = datetime.utcnow().isoformat()
-        def rating_or_none(value: str):
-            return int(value) if value in {"1", "2", "3", "4", "5"} else None
-
-        params = (
-            user["id"],
-            question_id,
-            save_action,
-            rating_or_none(form_data["q_translation_rating"]),
-            form_data["q_translation_comment"],
-            None,
-            None,
-            form_data["search_comment"],
-            rating_or_none(form_data["answer_accuracy_rating"]),
-            rating_or_none(form_data["answer_translation_rating"]),
-            form_data["answer_comment"],
-            now,
-            now,
-        )
 
-        db.execute(
-            """
-            INSERT INTO feedback (
-                user_id, question_id,
-                submission_status,
-                q_translation_rating, q_translation_comment,
-                search_rating, search_issue_type, search_comment,
-                answer_accuracy_rating, answer_translation_rating, answer_comment,
-                created_at, updated_at
-            )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(user_id, question_id) DO UPDATE SET
-                submission_status=excluded.submission_status,
-                q_translation_rating=excluded.q_translation_rating,
-                q_translation_comment=excluded.q_translation_comment,
-                search_rating=excluded.search_rating,
-                search_issue_type=excluded.search_issue_type,
-                search_comment=excluded.search_comment,
-                answer_accuracy_rating=excluded.answer_accuracy_rating,
-                answer_translation_rating=excluded.answer_translation_rating,
-                answer_comment=excluded.answer_comment,
-                updated_at=excluded.updated_at
-            """,
-            params,
-        )
-        db.commit()
+        def save(conn: sqlite3.Connection) -> None:
+            feedback.upsert(conn, user["id"], question_id, save_action, form_data, now)
+            # A submit changes what is left for every assignee of the question.
+            queueing.refresh_questions(conn, [question_id])
+
+        # Routed through the shared writer so concurrent saves group-commit
+        # instead of contending for SQLite's write lock one request at a time.
+        get_write_queue().call(save)
         if save_action == "draft":
             return render_template(
                 "annotate.html",
                 user=user,
                 question=question,
                 progress=get_user_progress(user["id"]),
-                search_sections=parse_search_sections(question["search_results"]),
-                answer_en_md=render_markdown(question["a_en"]),
-                answer_gu_md=render_markdown(question["a_gu"]),
+                **rendered_question(question),
                 form_data=form_data,
                 error=None,
                 notice="Draft saved. This question remains pending until you submit.",
             )
         return redirect(url_for("annotate", notice="Submitted and moved to next pending question."))
 
+    @app.route("/annotate/timings", methods=["POST"])
+    def annotate_timings():
+        # Beacon from annotate.html; sendBeacon ignores the response, so errors stay terse.
+        user = require_user()
+        if not isinstance(user, sqlite3.Row):
+            return jsonify({"error": "login required"}), 401
+        payload = request.get_json(force=True, silent=True)
+        if not isinstance(payload, dict):
+            return jsonify({"error": "body must be a JSON object"}), 400
+        question_id = get_required_int(payload.get("question_id"))
+        if question_id is None:
+            return jsonify({"error": "question_id is required"}), 400
+        for metric in timings.CLIENT_METRICS:
+            value = payload.get(f"{metric}_ms")
+            if (
+                isinstance(value, (int, float))
+                and not isinstance(value, bool)
+                and 0 <= value <= timings.MAX_DURATION_MS
+            ):
+                record_timing(metric, value, user["id"], question_id)
+        return Response(status=204)
+
+    @app.route("/annotate/draft", methods=["PATCH", "POST"])
+    def annotate_draft():
+        # Autosave target: only changed fields arrive, and nothing is rendered back.
+        user = require_user()
+        if not isinstance(user, sqlite3.Row):
+            return jsonify({"error": "login required"}), 401
+        payload = request.get_json(silent=True)
+        if not isinstance(payload, dict):
+            return jsonify({"error": "body must be a JSON object"}), 400
+        question_id = get_required_int(payload.get("question_id"))
+        fields = payload.get("fields") or {}
+        if question_id is None or not isinstance(fields, dict):
+            return jsonify({"error": "question_id and fields are required"}), 400
+
+        columns = []
+        values = []
+        for key, raw in fields.items():
+            value = "" if raw is None else str(raw).strip()
+            if key in feedback.TEXT_FIELDS:
+                columns.append(key)
+                values.append(value)
+            elif key in feedback.RATING_FIELDS:
+                # Like a form draft: a malformed rating is stored as NULL, not rejected.
+                columns.append(key)
+                values.append(feedback.rating_or_none(value))
+            else:
+                return jsonify({"error": f"unknown field {key}"}), 400
+        if not columns:
+            return Response(status=204)
+
+        now = datetime.utcnow().isoformat()
+        # Insert-select keeps the assignment/active check inside the single
+        # upsert; a row that is already submitted is never reverted to draft.
+        sql = f"""
+            INSERT INTO feedback (
+                user_id, question_id, submission_status, {", ".join(columns)}, created_at, updated_at
+            )
+            SELECT a.user_id, a.question_id, 'draft', {", ".join("?" for _ in columns)}, ?, ?
+            FROM assignments a
+            JOIN questions q ON q.id = a.question_id AND q.active = 1
+            WHERE a.user_id = ? AND a.question_id = ?
+            ON CONFLICT(user_id, question_id) DO UPDATE SET
+                {", ".join(f"{col}=excluded.{col}" for col in columns)},
+                updated_at=excluded.updated_at
+            WHERE feedback.submission_status = 'draft'
+        """
+
+        def save_draft(conn: sqlite3.Connection) -> int:
+            changed = conn.execute(sql, (*values, now, now, user["id"], question_id)).rowcount
+            if changed:
+                queueing.refresh_assignment(conn, user["id"], question_id)
+            return changed
+
+        changed = get_write_queue().call(save_draft)
+        if not changed:
+            return jsonify({"error": "question is not an open assignment"}), 409
+        return Response(status=204)
+
+    def build_offline_bundle(user: sqlite3.Row, limit: int) -> dict:
+        questions = get_pending_questions_for_user(user["id"], limit)
+        drafts = {}
+        if questions:
+            ids = [q["id"] for q in questions]
+            placeholders = ",".join("?" for _ in ids)
+            drafts = {
+                row["question_id"]: row
+                for row in get_db().execute(
+                    f"""
+                    SELECT * FROM feedback
+                    WHERE user_id = ? AND submission_status = 'draft' AND question_id IN ({placeholders})
+                    """,
+                    (user["id"], *ids),
+                )
+            }
+        items = []
+        for q in questions:
+            draft = drafts.get(q["id"])
+            rendered = rendered_question(q)
+            items.append(
+                {
+                    "id": q["id"],
+                    "category": q["category"] or "",
+                    "q_gu": q["q_gu"] or "",
+                    "q_en": q["q_en"] or "",
+                    "search_sections": rendered["search_sections"],
+                    "answer_en_html": str(rendered["answer_en_md"]),
+                    "answer_gu_html": str(rendered["answer_gu_md"]),
+                    "draft": {
+                        key: "" if draft is None or draft[key] is None else str(draft[key])
+                        for key in feedback.FORM_FIELDS
+                    },
+                }
+            )
+        return {
+            "dataset": current_dataset(),
+            "user": user["email"],
+            "issued_at": datetime.utcnow().isoformat(),
+            "questions": items,
+        }
+
+    @app.route("/annotate/offline")
+    def annotate_offline():
+        user = require_user()
+        if not isinstance(user, sqlite3.Row):
+            return user
+        return render_template(
+            "annotate_offline.html",
+            user=user,
+            max_questions=app.config["OFFLINE_BUNDLE_MAX"],
+        )
+
+    @app.route("/annotate/offline-sw.js")
+    def annotate_offline_worker():
+        return Response(
+            render_template("offline_sw.js"),
+            mimetype="application/javascript",
+            headers={"Cache-Control": "no-cache"},
+        )
+
+    @app.route("/annotate/bundle.json")
+    def annotate_bundle():
+        user = require_user()
+        if not isinstance(user, sqlite3.Row):
+            return jsonify({"error": "login required"}), 401
+        limit = max(min(as_int(request.args.get("limit"), 20), app.config["OFFLINE_BUNDLE_MAX"]), 1)
+        body = json.dumps(build_offline_bundle(user, limit), ensure_ascii=False).encode("utf-8")
+        headers = {"Cache-Control": "no-store", "Vary": "Accept-Encoding"}
+        if "gzip" in (request.headers.get("Accept-Encoding") or ""):
+            body = gzip.compress(body, compresslevel=6)
+            headers["Content-Encoding"] = "gzip"
+        return Response(body, mimetype="application/json", headers=headers)
+
+    def read_request_body() -> Optional[bytes]:
+        # Clients may gzip large uploads; None means the body claimed gzip but is not.
+        raw = request.get_data()
+        if request.headers.get("Content-Encoding") == "gzip":
+            try:
+                return storage.gunzip(raw, app.config["MAX_CONTENT_LENGTH"])
+            except ValueError:
+                raise RequestEntityTooLarge() from None
+            except (zlib.error, EOFError):
+                return None
+        return raw
+
+    @app.route("/annotate/bundle/upload", methods=["POST"])
+    def annotate_bundle_upload():
+        """Reconcile feedback completed offline; safe to retry after a dropped connection."""
+        user = require_user()
+        if not isinstance(user, sqlite3.Row):
+            return jsonify({"error": "login required"}), 401
+        raw = read_request_body()
+        if raw is None:
+            return jsonify({"error": "body is not valid gzip"}), 400
+        try:
+            payload = json.loads(raw or b"{}")
+        except ValueError:
+            return jsonify({"error": "body must be JSON"}), 400
+        items = payload.get("items") if isinstance(payload, dict) else None
+        if not isinstance(items, list):
+            return jsonify({"error": "items list is required"}), 400
+        if len(items) > app.config["OFFLINE_BUNDLE_MAX"] * 4:
+            return jsonify({"error": "too many items in one upload"}), 413
+        if (payload.get("dataset") or datasets.DEFAULT_DATASET) != current_dataset():
+            return jsonify({"error": "bundle belongs to another dataset"}), 409
+
+        results = []
+        accepted = []
+        for item in items:
+            item = item if isinstance(item, dict) else {}
+            question_id = get_required_int(item.get("question_id"))
+            save_action = item.get("save_action") or "submitted"
+            fields = item.get("fields") if isinstance(item.get("fields"), dict) else {}
+            form_data = feedback.clean_form(fields)
+            error = "question_id is required" if question_id is None else feedback.validate(form_data, save_action)
+            result = {"question_id": question_id, "status": "rejected" if error else None}
+            if error:
+                result["error"] = error
+            else:
+                accepted.append((result, question_id, save_action, form_data))
+            results.append(result)
+
+        now = datetime.utcnow().isoformat()
+
+        def reconcile(conn: sqlite3.Connection) -> None:
+            if not accepted:
+                return
+            ids = sorted({question_id for _result, question_id, _action, _data in accepted})
+            placeholders = ",".join("?" for _ in ids)
+            open_ids = {
+                row[0]
+                for row in conn.execute(
+                    f"""
+                    SELECT a.question_id
+                    FROM assignments a
+                    JOIN questions q ON q.id = a.question_id AND q.active = 1
+                    WHERE a.user_id = ? AND a.question_id IN ({placeholders})
+                    """,
+                    (user["id"], *ids),
+                )
+            }
+            saved = []
+            for result, question_id, save_action, form_data in accepted:
+                if question_id not in open_ids:
+                    result.update(status="rejected", error="question is not an open assignment")
+                elif feedback.upsert(conn, user["id"], question_id, save_action, form_data, now, replay=True):
+                    result["status"] = "saved"
+                    saved.append(question_id)
+                else:
+                    result["status"] = "unchanged"
+            queueing.refresh_questions(conn, saved)
+
+        get_write_queue().call(reconcile)
+        counts = {
+            status: sum(1 for r in results if r["status"] == status) for status in ("saved", "unchanged", "rejected")
+        }
+        return jsonify({"results": results, **counts})
+
     @app.route("/questions", methods=["GET", "POST"])
     def all_questions():
         user = require_user()
@@ -505,14 +963,15 @@ def create_app() -> Flask:
             gu = (request.form.get("question_text_gu") or "").strip()
             en = (request.form.get("question_text_en") or "").strip()
             if gu:
-                db.execute(
+                suggestion_id = db.execute(
                     """
                     INSERT INTO suggested_questions
                     (user_id, question_text_gu, question_text_en, status, created_at)
                     VALUES (?, ?, ?, 'new', ?)
                     """,
                     (user["id"], gu, en, datetime.utcnow().isoformat()),
-                )
+                ).lastrowid
+                dedupe.index_suggestion(db, suggestion_id, gu, en)
                 db.commit()
 
         questions = db.execute(
@@ -548,28 +1007,157 @@ def create_app() -> Flask:
         if request.method == "POST":
             action = request.form.get("action") or "single"
             if action == "single":
-                email = (request.form.get("email") or "").strip().lower()
+                email = storage.normalize_email(request.form.get("email"))
                 username = (request.form.get("username") or "").strip() or None
                 if email:
                     db.execute(
-                        "INSERT OR IGNORE INTO users (email, username, is_admin) VALUES (?, ?, 0)",
-                        (email, username),
+                        "INSERT OR IGNORE INTO users (email, email_norm, username, is_admin) VALUES (?, ?, ?, 0)",
+                        (email, email, username),
                     )
                     db.commit()
             elif action == "bulk":
                 bulk_emails = request.form.get("bulk_emails") or ""
                 raw = bulk_emails.replace(",", "\n").replace(";", "\n").splitlines()
-                emails = sorted({x.strip().lower() for x in raw if x.strip()})
-                for email in emails:
-                    db.execute(
-                        "INSERT OR IGNORE INTO users (email, is_admin) VALUES (?, 0)",
-                        (email,),
-                    )
+                emails = sorted({storage.normalize_email(x) for x in raw if x.strip()})
+                db.executemany(
+                    "INSERT OR IGNORE INTO users (email, email_norm, is_admin) VALUES (?, ?, 0)",
+                    [(email, email) for email in emails],
+                )
                 db.commit()
 
         users = db.execute("SELECT * FROM users ORDER BY email").fetchall()
         return render_template("admin_users.html", users=users, admin=admin)
 
+    @app.route("/admin/datasets", methods=["GET", "POST"])
+    def admin_datasets():
+        admin = require_admin()
+        if not admin:
+            return redirect(url_for("admin_login"))
+        error = None
+        if request.method == "POST":
+            try:
+                dataset_catalog.create(request.form.get("slug"), request.form.get("title") or "")
+            except ValueError as exc:
+                error = str(exc)
+            else:
+                return redirect(url_for("admin_datasets"))
+        return render_template("admin_datasets.html", admin=admin, error=error)
+
+    def parse_assignment_filters(source) -> dict:
+        status_filter = (source.get("status") or "all").strip()
+        if status_filter not in {"all", "unassigned", "partial", "full"}:
+            status_filter = "all"
+        return {
+            "status": status_filter,
+            "user_id": (source.get("user_id") or "").strip(),
+            "category": (source.get("category") or "").strip(),
+            "q": (source.get("q") or "").strip(),
+        }
+
+    def question_summary_sql(filters: dict):
+        """Per-question assigned/completed counts for the dashboard filters, with params."""
+        where_clauses = ["q.active = 1"]
+        params = []
+        if filters["category"]:
+            where_clauses.append("q.category = ?")
+            params.append(filters["category"])
+        if filters["q"]:
+            where_clauses.append("(q.q_gu LIKE ? OR q.q_en LIKE ?)")
+            like = f"%{filters['q']}%"
+            params.extend([like, like])
+        if filters["user_id"]:
+            where_clauses.append("EXISTS (SELECT 1 FROM assignments a2 WHERE a2.question_id = q.id AND a2.user_id = ?)")
+            params.append(as_int(filters["user_id"], 0))
+
+        status_having = ""
+        if filters["status"] == "unassigned":
+            status_having = "HAVING assigned_count = 0"
+        elif filters["status"] == "partial":
+            status_having = "HAVING assigned_count > 0 AND completed_count < assigned_count"
+        elif filters["status"] == "full":
+            status_having = "HAVING assigned_count > 0 AND completed_count >= assigned_count"
+
+        sql = f"""
+            SELECT
+              q.id AS question_id,
+              q.category,
+              q.q_gu,
+              COUNT(DISTINCT a.user_id) AS assigned_count,
+              COUNT(DISTINCT CASE WHEN f.user_id IS NOT NULL THEN f.user_id END) AS completed_count
+            FROM questions q
+            LEFT JOIN assignments a ON a.question_id = q.id
+            LEFT JOIN feedback f
+              ON f.question_id = q.id
+             AND f.user_id = a.user_id
+             AND f.submission_status = 'submitted'
+            WHERE {' AND '.join(where_clauses)}
+            GROUP BY q.id
+            {status_having}
+        """
+        return sql, params
+
+    BULK_OPERATIONS = {"unassign", "reassign", "clear_inactive"}
+
+    def bulk_assignment_scope(operation: str, filters: dict, pending_only: bool):
+        """WHERE clause (over ``assignments a``) selecting the rows a bulk operation touches."""
+        if operation == "clear_inactive":
+            clauses = ["a.question_id IN (SELECT id FROM questions WHERE active = 0)"]
+            params = []
+        else:
+            summary_sql, params = question_summary_sql(filters)
+            clauses = [f"a.question_id IN (SELECT question_id FROM ({summary_sql}))"]
+            if filters["user_id"]:
+                clauses.append("a.user_id = ?")
+                params.append(as_int(filters["user_id"], 0))
+        # Deactivated questions can no longer be annotated, so clear_inactive drops submitted rows too.
+        if pending_only and operation != "clear_inactive":
+            clauses.append(
+                """
+                NOT EXISTS (
+                  SELECT 1 FROM feedback f
+                  WHERE f.user_id = a.user_id
+                    AND f.question_id = a.question_id
+                    AND f.submission_status = 'submitted'
+                )
+                """
+            )
+        return " AND ".join(clauses), params
+
+    def run_bulk_assignment(operation: str, filters: dict, pending_only: bool, target_user_id):
+        scope, params = bulk_assignment_scope(operation, filters, pending_only)
+
+        def apply(conn: sqlite3.Connection) -> dict:
+            # Pin the matching rows first: inserting the target user's rows changes
+            # the per-question counts that status filters are evaluated on.
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS bulk_scope (id INTEGER PRIMARY KEY)")
+            conn.execute("DELETE FROM temp.bulk_scope")
+            conn.execute(f"INSERT INTO temp.bulk_scope (id) SELECT a.id FROM assignments a WHERE {scope}", params)
+            question_ids = [
+                row[0]
+                for row in conn.execute(
+                    "SELECT DISTINCT a.question_id FROM assignments a JOIN temp.bulk_scope s ON s.id = a.id"
+                )
+            ]
+            added = 0
+            if operation == "reassign":
+                added = conn.execute(
+                    """
+                    INSERT OR IGNORE INTO assignments (user_id, question_id)
+                    SELECT ?, a.question_id FROM assignments a JOIN temp.bulk_scope s ON s.id = a.id
+                    """,
+                    (target_user_id,),
+                ).rowcount
+            removed = conn.execute(
+                "DELETE FROM assignments WHERE id IN (SELECT id FROM temp.bulk_scope)"
+            ).rowcount
+            queueing.refresh_questions(conn, question_ids)
+            if removed >= maintenance.LARGE_CHANGE_ROWS:
+                maintenance.request(conn, f"bulk {operation} removed {removed} assignments")
+            return {"removed": removed, "added": added}
+
+        # One queued item = one savepoint inside one write transaction.
+        return get_write_queue().call(apply, timeout=300)
+
     @app.route("/admin/assignments", methods=["GET", "POST"])
     def admin_assignments():
         admin = require_admin()
@@ -578,6 +1166,8 @@ def create_app() -> Flask:
 
         db = get_db()
         action = request.form.get("action")
+        filters = parse_assignment_filters(request.values)
+        bulk = None
         if request.method == "POST":
             if action == "manual":
                 user_id = get_required_int(request.form.get("user_id"))
@@ -588,6 +1178,7 @@ def create_app() -> Flask:
                     "INSERT OR IGNORE INTO assignments (user_id, question_id) VALUES (?, ?)",
                     (user_id, question_id),
                 )
+                queueing.refresh_questions(db, [question_id])
                 db.commit()
             elif action == "random":
                 user_ids = [
@@ -608,73 +1199,55 @@ def create_app() -> Flask:
                     pool = [r["id"] for r in unassigned]
                     random.shuffle(pool)
                     if assign_mode == "all":
-                        idx = 0
-                        for qid in pool:
-                            uid = user_ids[idx % len(user_ids)]
-                            db.execute(
-                                "INSERT OR IGNORE INTO assignments (user_id, question_id) VALUES (?, ?)",
-                                (uid, qid),
-                            )
-                            idx += 1
+                        pairs = [(user_ids[idx % len(user_ids)], qid) for idx, qid in enumerate(pool)]
                     else:
+                        pairs = []
                         for uid in user_ids:
                             selected = pool[:count_per_user]
                             pool = pool[count_per_user:]
-                            for qid in selected:
-                                db.execute(
-                                    "INSERT OR IGNORE INTO assignments (user_id, question_id) VALUES (?, ?)",
-                                    (uid, qid),
-                                )
+                            pairs.extend((uid, qid) for qid in selected)
+                    db.executemany(
+                        "INSERT OR IGNORE INTO assignments (user_id, question_id) VALUES (?, ?)",
+                        pairs,
+                    )
+                    queueing.refresh_questions(db, [qid for _uid, qid in pairs])
                     db.commit()
-
-        status_filter = (request.args.get("status") or "all").strip()
-        if status_filter not in {"all", "unassigned", "partial", "full"}:
-            status_filter = "all"
-        user_filter = (request.args.get("user_id") or "").strip()
-        category_filter = (request.args.get("category") or "").strip()
-        query_filter = (request.args.get("q") or "").strip()
+            elif action in {"bulk_preview", "bulk_apply"}:
+                operation = request.form.get("operation") or ""
+                pending_only = request.form.get("pending_only") == "on"
+                target_user_id = get_required_int(request.form.get("target_user_id"))
+                bulk = {
+                    "operation": operation,
+                    "pending_only": pending_only,
+                    "target_user_id": target_user_id,
+                    "error": None,
+                }
+                if operation not in BULK_OPERATIONS:
+                    bulk["error"] = "Choose a bulk operation."
+                elif operation == "reassign" and (not filters["user_id"] or target_user_id is None):
+                    bulk["error"] = "Reassign needs a source user (User filter) and a target user."
+                elif operation == "reassign" and str(target_user_id) == filters["user_id"]:
+                    bulk["error"] = "Source and target user are the same."
+                elif action == "bulk_preview":
+                    scope, params = bulk_assignment_scope(operation, filters, pending_only)
+                    bulk["preview"] = db.execute(
+                        f"SELECT COUNT(*) AS c FROM assignments a WHERE {scope}", params
+                    ).fetchone()["c"]
+                else:
+                    bulk["result"] = run_bulk_assignment(operation, filters, pending_only, target_user_id)
+            if action in {"manual", "random", "bulk_apply"}:
+                refresh_reports()
+
+        status_filter = filters["status"]
+        user_filter = filters["user_id"]
+        category_filter = filters["category"]
+        query_filter = filters["q"]
         page = max(as_int(request.args.get("page"), 1), 1)
         page_size = max(min(as_int(request.args.get("page_size"), 50), 200), 10)
+        base_summary_sql, params = question_summary_sql(filters)
 
-        where_clauses = ["q.active = 1"]
-        params = []
-        if category_filter:
-            where_clauses.append("q.category = ?")
-            params.append(category_filter)
-        if query_filter:
-            where_clauses.append("(q.q_gu LIKE ? OR q.q_en LIKE ?)")
-            like = f"%{query_filter}%"
-            params.extend([like, like])
-        if user_filter:
-            where_clauses.append("EXISTS (SELECT 1 FROM assignments a2 WHERE a2.question_id = q.id AND a2.user_id = ?)")
-            params.append(as_int(user_filter, 0))
-
-        status_having = ""
-        if status_filter == "unassigned":
-            status_having = "HAVING assigned_count = 0"
-        elif status_filter == "partial":
-            status_having = "HAVING assigned_count > 0 AND completed_count < assigned_count"
-        elif status_filter == "full":
-            status_having = "HAVING assigned_count > 0 AND completed_count >= assigned_count"
-
-        base_summary_sql = f"""
-            SELECT
-              q.id AS question_id,
-              q.category,
-              q.q_gu,
-              COUNT(DISTINCT a.user_id) AS assigned_count,
-              COUNT(DISTINCT CASE WHEN f.user_id IS NOT NULL THEN f.user_id END) AS completed_count
-            FROM questions q
-            LEFT JOIN assignments a ON a.question_id = q.id
-            LEFT JOIN feedback f
-              ON f.question_id = q.id
-             AND f.user_id = a.user_id
-             AND f.submission_status = 'submitted'
-            WHERE {' AND '.join(where_clauses)}
-            GROUP BY q.id
-            {status_having}
-        """
-
+        # Everything below is read-only reporting; it runs on the replica when one is configured.
+        db = get_report_db()
         total_items = db.execute(
             f"SELECT COUNT(*) AS c FROM ({base_summary_sql}) t",
             params,
@@ -683,10 +1256,13 @@ def create_app() -> Flask:
         if page > total_pages:
             page = total_pages
 
-        users = db.execute("SELECT id, email FROM users ORDER BY email").fetchall()
-        questions = db.execute(
-            "SELECT id, q_gu, category FROM questions WHERE active = 1 ORDER BY id LIMIT 1000"
-        ).fetchall()
+        user_labels = {
+            row["id"]: row["email"]
+            for row in db.execute(
+                "SELECT id, email FROM users WHERE id IN (?, ?)",
+                (as_int(user_filter, 0), (bulk or {}).get("target_user_id") or 0),
+            )
+        }
         categories = db.execute(
             "SELECT DISTINCT category FROM questions WHERE category IS NOT NULL AND category != '' ORDER BY category"
         ).fetchall()
@@ -740,12 +1316,13 @@ def create_app() -> Flask:
         return render_template(
             "admin_assignments.html",
             admin=admin,
-            users=users,
-            questions=questions,
+            user_labels=user_labels,
             categories=categories,
             summary=summary,
             metrics=metrics,
             user_progress=user_progress,
+            bulk=bulk,
+            report=report_status(),
             filters={
                 "status": status_filter,
                 "user_id": user_filter,
@@ -758,6 +1335,125 @@ def create_app() -> Flask:
             },
         )
 
+    def picker_page(kind: str, build):
+        """Shared JSON shape for picker endpoints, cached per dataset and query until ``kind`` changes."""
+        query = (request.args.get("q") or "").strip()
+        after = request.args.get("after") or ""
+        limit = max(min(as_int(request.args.get("limit"), 20), 100), 1)
+
+        def load():
+            items = build(query, after, limit + 1)
+            return {
+                "items": items[:limit],
+                "next": items[limit - 1]["cursor"] if len(items) > limit else None,
+            }
+
+        payload = cached("pickers", (kind, query, after, limit), load, depends_on=(kind,))
+        response = jsonify(payload)
+        response.headers["Cache-Control"] = "private, max-age=15"
+        return response
+
+    def pick_questions(query: str, after: str, limit: int):
+        db = get_db()
+        after_id = as_int(after, 0)
+        digits = query.lstrip("#")
+        if digits.isdigit():
+            # Id search: the exact id first, then following ids (rowid range, no scan).
+            rows = db.execute(
+                "SELECT id, category, q_gu FROM questions WHERE active = 1 AND id >= ? AND id > ? ORDER BY id LIMIT ?",
+                (int(digits), after_id, limit),
+            ).fetchall()
+        elif query:
+            # One prefix range per index, each bounded by the page size, merged by id here:
+            # an OR of both ranges under ORDER BY id is planned as a full scan in id order.
+            upper = storage.prefix_upper_bound(query)
+            by_id = {}
+            for index, column in (("idx_questions_q_gu", "q_gu"), ("idx_questions_q_en", "q_en COLLATE NOCASE")):
+                for row in db.execute(
+                    f"""
+                    SELECT id, category, q_gu FROM questions INDEXED BY {index}
+                    WHERE {column} >= ? AND {column} < ? AND active = 1 AND id > ?
+                    ORDER BY id
+                    LIMIT ?
+                    """,
+                    (query, upper, after_id, limit),
+                ):
+                    by_id[row["id"]] = row
+            rows = [by_id[question_id] for question_id in sorted(by_id)[:limit]]
+        else:
+            rows = db.execute(
+                "SELECT id, category, q_gu FROM questions WHERE active = 1 AND id > ? ORDER BY id LIMIT ?",
+                (after_id, limit),
+            ).fetchall()
+        return [
+            {
+                "id": row["id"],
+                "label": f"#{row['id']} " + (f"[{row['category']}] " if row["category"] else "") + f"- {row['q_gu'][:100]}",
+                "cursor": str(row["id"]),
+            }
+            for row in rows
+        ]
+
+    def pick_users(query: str, after: str, limit: int):
+        prefix = storage.normalize_email(query)
+        clauses, params = [], []
+        if prefix:
+            clauses.append("email_norm >= ? AND email_norm < ?")
+            params.extend([prefix, storage.prefix_upper_bound(prefix)])
+        if after:
+            clauses.append("email_norm > ?")
+            params.append(after)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = get_db().execute(
+            f"SELECT id, email, email_norm FROM users {where} ORDER BY email_norm LIMIT ?",
+            (*params, limit),
+        ).fetchall()
+        return [{"id": row["id"], "label": row["email"], "cursor": row["email_norm"]} for row in rows]
+
+    @app.route("/admin/picker/questions.json")
+    def admin_pick_questions():
+        admin = require_admin()
+        if not admin:
+            return Response(status=401)
+        return picker_page("questions", pick_questions)
+
+    @app.route("/admin/picker/users.json")
+    def admin_pick_users():
+        admin = require_admin()
+        if not admin:
+            return Response(status=401)
+        return picker_page("users", pick_users)
+
+    @app.route("/admin/assignments/stream")
+    def admin_assignments_stream():
+        admin = require_admin()
+        if not admin:
+            return Response(status=401)
+        broadcaster = get_progress_broadcaster()
+        # Every connection, including a reconnect with Last-Event-ID, starts from a fresh
+        # full snapshot: ids are per worker process, so one from another worker means nothing.
+        subscriber = broadcaster.subscribe()
+        keepalive = app.config["LIVE_KEEPALIVE_SECONDS"]
+
+        def events():
+            try:
+                yield "retry: 3000\n\n"
+                while True:
+                    try:
+                        event_id, payload = subscriber.get(timeout=keepalive)
+                    except queue.Empty:
+                        yield ": keepalive\n\n"
+                        continue
+                    yield f"id: {event_id}\nevent: progress\ndata: {payload}\n\n"
+            finally:
+                broadcaster.unsubscribe(subscriber)
+
+        return Response(
+            events(),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
     @app.route("/admin/data", methods=["GET", "POST"])
     def admin_data():
         admin = require_admin()
@@ -765,6 +1461,7 @@ def create_app() -> Flask:
             return redirect(url_for("admin_login"))
 
         db = get_db()
+        import_summary = None
         if request.method == "POST":
             file = request.files.get("questions_csv")
             if file:
@@ -775,6 +1472,7 @@ def create_app() -> Flask:
                     import_mode = "upsert"
                 replace_assignments = request.form.get("replace_assignments") == "on"
                 seen_question_ids = set()
+                question_sync = storage.QuestionSync(db)
 
                 def find_col(row, names):
                     for name in names:
@@ -783,18 +1481,21 @@ def create_app() -> Flask:
                     return ""
 
                 def get_or_create_user_id(email: str) -> Optional[int]:
-                    email = (email or "").strip().lower()
+                    email = storage.normalize_email(email)
                     if not email:
                         return None
-                    user = db.execute("SELECT id FROM users WHERE lower(email)=?", (email,)).fetchone()
+                    user = db.execute("SELECT id FROM users WHERE email_norm=?", (email,)).fetchone()
                     if not user:
-                        db.execute("INSERT OR IGNORE INTO users (email, is_admin) VALUES (?, 0)", (email,))
-                        user = db.execute("SELECT id FROM users WHERE lower(email)=?", (email,)).fetchone()
+                        db.execute(
+                            "INSERT OR IGNORE INTO users (email, email_norm, is_admin) VALUES (?, ?, 0)",
+                            (email, email),
+                        )
+                        user = db.execute("SELECT id FROM users WHERE email_norm=?", (email,)).fetchone()
                     return user["id"] if user else None
 
                 def apply_assignments(question_id: int, email_blob: str) -> None:
                     raw = (email_blob or "").replace(";", ",").replace("|", ",").split(",")
-                    emails = sorted({x.strip().lower() for x in raw if x.strip()})
+                    emails = sorted({storage.normalize_email(x) for x in raw if x.strip()})
                     if replace_assignments:
                         db.execute("DELETE FROM assignments WHERE question_id = ?", (question_id,))
                     for email in emails:
@@ -818,51 +1519,10 @@ def create_app() -> Flask:
                     qid_raw = (find_col(row, ["id", "ID", "question_id", "Question ID"]) or "").strip()
                     qid = as_int(qid_raw, 0) if qid_raw else 0
 
+                    fields = (category, q_gu, q_en, search_results, a_en, a_gu)
                     if import_mode == "insert":
-                        db.execute(
-                            """
-                            INSERT OR IGNORE INTO questions
-                            (category, q_gu, q_en, search_results, a_en, a_gu, active)
-                            VALUES (?, ?, ?, ?, ?, ?, 1)
-                            """,
-                            (category, q_gu, q_en, search_results, a_en, a_gu),
-                        )
-                        found = db.execute(
-                            "SELECT id FROM questions WHERE category=? AND q_gu=? AND q_en=?",
-                            (category, q_gu, q_en),
-                        ).fetchone()
-                        return found["id"] if found else None
-
-                    if qid:
-                        existing = db.execute("SELECT id FROM questions WHERE id=?", (qid,)).fetchone()
-                        if existing:
-                            db.execute(
-                                """
-                                UPDATE questions
-                                SET category=?, q_gu=?, q_en=?, search_results=?, a_en=?, a_gu=?, active=1
-                                WHERE id=?
-                                """,
-                                (category, q_gu, q_en, search_results, a_en, a_gu, qid),
-                            )
-                            return qid
-
-                    db.execute(
-                        """
-                        INSERT INTO questions (category, q_gu, q_en, search_results, a_en, a_gu, active)
-                        VALUES (?, ?, ?, ?, ?, ?, 1)
-                        ON CONFLICT(category, q_gu, q_en) DO UPDATE SET
-                          search_results=excluded.search_results,
-                          a_en=excluded.a_en,
-                          a_gu=excluded.a_gu,
-                          active=1
-                        """,
-                        (category, q_gu, q_en, search_results, a_en, a_gu),
-                    )
-                    found = db.execute(
-                        "SELECT id FROM questions WHERE category=? AND q_gu=? AND q_en=?",
-                        (category, q_gu, q_en),
-                    ).fetchone()
-                    return found["id"] if found else None
+                        return question_sync.insert_if_missing(fields)
+                    return question_sync.upsert(fields, question_id=qid or None)
 
                 for row in reader:
                     question_id = upsert_question(row)
@@ -885,34 +1545,57 @@ def create_app() -> Flask:
                     if assignees:
                         apply_assignments(question_id, assignees)
 
+                deactivated = 0
                 if import_mode == "sync":
                     if seen_question_ids:
                         placeholders = ",".join("?" for _ in seen_question_ids)
-                        db.execute(
-                            f"UPDATE questions SET active=0 WHERE id NOT IN ({placeholders})",
+                        deactivated = db.execute(
+                            f"UPDATE questions SET active=0 WHERE active=1 AND id NOT IN ({placeholders})",
                             tuple(seen_question_ids),
-                        )
+                        ).rowcount
                     else:
-                        db.execute("UPDATE questions SET active=0")
+                        deactivated = db.execute("UPDATE questions SET active=0 WHERE active=1").rowcount
+                    if deactivated:
+                        maintenance.request(db, f"sync import deactivated {deactivated} questions")
+                dedupe.sync_questions(db)
+                queueing.refresh_all(db)
                 db.commit()
+                import_summary = {**question_sync.counts, "deactivated": deactivated}
 
         suggestions = db.execute(
             """
-            SELECT s.*, u.email
+            SELECT
+              s.*,
+              u.email,
+              m.question_id AS match_question_id,
+              m.question_score AS match_score,
+              q.q_gu AS match_q_gu,
+              m.duplicate_of,
+              m.duplicate_score,
+              m.cluster_id,
+              (SELECT COUNT(*) FROM suggestion_matches c WHERE c.cluster_id = m.cluster_id) AS cluster_size
             FROM suggested_questions s
             JOIN users u ON u.id = s.user_id
+            LEFT JOIN suggestion_matches m ON m.suggestion_id = s.id
+            LEFT JOIN questions q ON q.id = m.question_id
             ORDER BY s.id DESC
             LIMIT 200
             """
         ).fetchall()
-        return render_template("admin_data.html", admin=admin, suggestions=suggestions)
+        return render_template(
+            "admin_data.html",
+            admin=admin,
+            suggestions=suggestions,
+            import_summary=import_summary,
+            duplicate_threshold=dedupe.DUPLICATE_THRESHOLD,
+        )
 
     @app.route("/admin/export/questions.csv")
     def export_questions():
         admin = require_admin()
         if not admin:
             return redirect(url_for("admin_login"))
-        db = get_db()
+        db = get_report_db()
         rows = db.execute(
             """
             SELECT category AS "Category",
@@ -925,39 +1608,304 @@ def create_app() -> Flask:
             ORDER BY id
             """
         ).fetchall()
-        return to_csv_response("questions_export.csv", rows)
+        return with_report_headers(to_csv_response(export_filename("questions_export", "csv"), rows))
+
+    @app.route("/admin/analytics", methods=["GET", "POST"])
+    def admin_analytics():
+        admin = require_admin()
+        if not admin:
+            return redirect(url_for("admin_login"))
+        notice = None
+        if request.method == "POST" and request.form.get("action") == "recompute":
+            rows = get_write_queue().call(analytics.recompute, timeout=300)
+            notice = f"Recomputed agreement aggregates ({rows} question/metric rows)."
+            refresh_reports()
+        db = get_report_db()
+        threshold = app.config["AGREEMENT_STDDEV_THRESHOLD"]
+        limit = max(min(as_int(request.args.get("limit"), 50), 500), 10)
+        return render_template(
+            "admin_analytics.html",
+            admin=admin,
+            metrics=analytics.RATING_METRICS,
+            categories=analytics.category_summary(db, threshold),
+            disputed=analytics.disputed_questions(db, threshold, limit=limit),
+            threshold=threshold,
+            limit=limit,
+            notice=notice,
+            report=report_status(),
+        )
+
+    @app.route("/admin/timings")
+    def admin_timings():
+        admin = require_admin()
+        if not admin:
+            return redirect(url_for("admin_login"))
+        if flush_timings():
+            refresh_reports()
+        days = max(min(as_int(request.args.get("days"), 7), 90), 1)
+        since = int(time.time()) - days * 86400
+        return render_template(
+            "admin_timings.html",
+            admin=admin,
+            summary=timings.summarize(get_report_db(), since),
+            metrics=list(timings.METRICS),
+            days=days,
+            report=report_status(),
+        )
+
+    @app.route("/admin/export/agreement.csv")
+    def export_agreement():
+        admin = require_admin()
+        if not admin:
+            return redirect(url_for("admin_login"))
+        rows = analytics.disputed_questions(get_report_db(), app.config["AGREEMENT_STDDEV_THRESHOLD"])
+        for row in rows:
+            for key, value in row.items():
+                if isinstance(value, float):
+                    row[key] = round(value, 4)
+            row["disputed"] = int(row["disputed"])
+        return with_report_headers(to_csv_response(export_filename("agreement_export", "csv"), rows))
+
+    FEEDBACK_EXPORT_SELECT = """
+        SELECT
+          u.email AS user_email,
+          q.id AS question_id,
+          q.q_gu AS "Q (Gu)",
+          q.q_en AS "Q (En)",
+          f.submission_status,
+          f.q_translation_rating,
+          f.q_translation_comment,
+          f.search_rating,
+          f.search_issue_type,
+          f.search_comment,
+          f.answer_accuracy_rating,
+          f.answer_translation_rating,
+          f.answer_comment,
+          f.created_at,
+          f.updated_at,
+          f.id AS _cursor_id
+        FROM feedback f
+        JOIN users u ON u.id = f.user_id
+        JOIN questions q ON q.id = f.question_id
+    """
+
+    def parse_export_cursor(raw: str):
+        # Cursor format: "<updated_at>|<feedback id>"; empty means "from the start".
+        raw = (raw or "").strip()
+        if not raw:
+            return "", 0
+        updated_at, _, fid = raw.rpartition("|")
+        if not updated_at:
+            return None
+        try:
+            return updated_at, int(fid)
+        except ValueError:
+            return None
+
+    def query_feedback_export():
+        """Rows for the feedback export plus the cursor to resume from.
+
+        Without ``since`` this is the historical full export (newest first).
+        With ``since`` it walks ``idx_feedback_updated`` forward from the cursor,
+        leaving out rows younger than ``EXPORT_SETTLE_SECONDS`` so a save that
+        commits slightly after its timestamp is not skipped by the next pull.
+        On the reporting replica the horizon is measured from the copy's age.
+        """
+        db = get_report_db()
+        if "since" not in request.args:
+            rows = db.execute(f"{FEEDBACK_EXPORT_SELECT} ORDER BY f.updated_at DESC").fetchall()
+            return rows, None
+        cursor = parse_export_cursor(request.args.get("since"))
+        if cursor is None:
+            return None, None
+        limit = max(min(as_int(request.args.get("limit"), 10000), 50000), 1)
+        settle = app.config["EXPORT_SETTLE_SECONDS"]
+        report = report_status()
+        if report is not None:
+            settle += report["age_seconds"] or 0.0
+        horizon = (datetime.utcnow() - timedelta(seconds=settle)).isoformat()
+        rows = db.execute(
+            f"""
+            {FEEDBACK_EXPORT_SELECT}
+            WHERE (f.updated_at, f.id) > (?, ?) AND f.updated_at < ?
+            ORDER BY f.updated_at, f.id
+            LIMIT ?
+            """,
+            (*cursor, horizon, limit),
+        ).fetchall()
+        if rows:
+            next_cursor = f"{rows[-1]['updated_at']}|{rows[-1]['_cursor_id']}"
+        else:
+            next_cursor = request.args.get("since") or ""
+        return rows, next_cursor
+
+    def export_row_dict(row) -> dict:
+        return {key: row[key] for key in row.keys() if not key.startswith("_")}
 
     @app.route("/admin/export/feedback.csv")
     def export_feedback():
         admin = require_admin()
         if not admin:
             return redirect(url_for("admin_login"))
+        rows, next_cursor = query_feedback_export()
+        if rows is None:
+            return Response("Invalid since cursor.", status=400, mimetype="text/plain")
+        response = to_csv_response(
+            export_filename("feedback_export", "csv"), [export_row_dict(r) for r in rows]
+        )
+        if next_cursor is not None:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return with_report_headers(response)
+
+    @app.route("/admin/export/feedback.jsonl")
+    def export_feedback_jsonl():
+        admin = require_admin()
+        if not admin:
+            return redirect(url_for("admin_login"))
+        rows, next_cursor = query_feedback_export()
+        if rows is None:
+            return Response("Invalid since cursor.", status=400, mimetype="text/plain")
+        body = "".join(json.dumps(export_row_dict(r), ensure_ascii=False) + "\n" for r in rows)
+        response = Response(
+            body,
+            headers={
+                "Content-Disposition": f"attachment; filename={export_filename('feedback_export', 'jsonl')}"
+            },
+            mimetype="application/x-ndjson",
+        )
+        if next_cursor is not None:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return with_report_headers(response)
+
+    def ingest_token_ok() -> bool:
+        token = app.config["INGEST_TOKEN"]
+        header = request.headers.get("Authorization") or ""
+        if not token or not header.startswith("Bearer "):
+            return False
+        return hmac.compare_digest(header[len("Bearer ") :].strip().encode(), token.encode())
+
+    @app.route("/admin/feedback/ingest", methods=["POST"])
+    def admin_feedback_ingest():
+        """Bulk-load feedback produced outside the UI (JSON Lines or CSV).
+
+        Accepts an admin session or ``Authorization: Bearer $INGEST_TOKEN``.
+        Rows are validated like ``/annotate/save`` and written through the
+        write queue in batches; the response reports per-line errors.
+        """
+        if not require_admin() and not ingest_token_ok():
+            return jsonify({"error": "admin session or ingest token required"}), 401
+        raw = read_request_body()
+        if raw is None:
+            return jsonify({"error": "body is not valid gzip"}), 400
+        try:
+            text = raw.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            return jsonify({"error": "body must be UTF-8"}), 400
+        fmt = (request.args.get("format") or "").lower()
+        if not fmt:
+            fmt = "csv" if request.mimetype == "text/csv" else "jsonl"
+        if fmt not in ("jsonl", "csv"):
+            return jsonify({"error": "format must be jsonl or csv"}), 400
+
+        def flag(name: str) -> bool:
+            return request.args.get(name, "").lower() in ("1", "true", "yes")
+
+        batch_size = max(min(as_int(request.args.get("batch_size"), feedback.INGEST_BATCH_SIZE), 50000), 1)
+        lines = io.StringIO(text, newline="")
+        records = feedback.iter_csv(lines) if fmt == "csv" else feedback.iter_jsonl(lines)
+        ingest = feedback.FeedbackIngest(
+            create_users=flag("create_users"), assign=flag("assign"), dry_run=flag("dry_run")
+        )
+        started = time.perf_counter()
+        write_queue = get_write_queue()
+        for batch in ingest.batches(records, batch_size):
+            write_queue.call(lambda conn, batch=batch: ingest.write_batch(conn, batch), timeout=300)
+        if ingest.counts["saved"] and not ingest.dry_run:
+            write_queue.call(queueing.refresh_all, timeout=300)
+            refresh_reports()
+        elapsed = time.perf_counter() - started
+        return jsonify(
+            {
+                **ingest.summary(),
+                "elapsed_ms": round(elapsed * 1000, 1),
+                "rows_per_second": round(ingest.counts["rows"] / elapsed) if elapsed > 0 else None,
+            }
+        )
+
+    @app.route("/admin/metrics.json")
+    def admin_metrics():
+        admin = require_admin()
+        if not admin:
+            return redirect(url_for("admin_login"))
+        return jsonify(
+            {
+                "write_queue": get_write_queue().stats(),
+                "snapshots": snapshots.snapshot_metrics(get_db()),
+                "live_progress": get_progress_broadcaster().stats(),
+                "report_replica": report_status(),
+                "timings": get_timing_buffer().stats(),
+                "maintenance": maintenance_scheduler.status(),
+                "caches": get_cache_registry().stats(),
+                "trace": trace_recorder.stats() if trace_recorder is not None else None,
+            }
+        )
+
+    @app.route("/admin/maintenance", methods=["GET", "POST"])
+    def admin_maintenance():
+        admin = require_admin()
+        if not admin:
+            return redirect(url_for("admin_login"))
+        db_path = current_db_path()
+        results = None
+        if request.method == "POST" and request.form.get("action") == "run":
+            tasks = [task for task in request.form.getlist("tasks") if task in maintenance.TASKS]
+            results = maintenance.run(
+                db_path,
+                tasks=tasks or None,
+                budget_seconds=app.config["MAINTENANCE_BUDGET_SECONDS"],
+                trigger="manual",
+            )
         db = get_db()
-        rows = db.execute(
-            """
-            SELECT
-              u.email AS user_email,
-              q.id AS question_id,
-              q.q_gu AS "Q (Gu)",
-              q.q_en AS "Q (En)",
-              f.submission_status,
-              f.q_translation_rating,
-              f.q_translation_comment,
-              f.search_rating,
-              f.search_issue_type,
-              f.search_comment,
-              f.answer_accuracy_rating,
-              f.answer_translation_rating,
-              f.answer_comment,
-              f.created_at,
-              f.updated_at
-            FROM feedback f
-            JOIN users u ON u.id = f.user_id
-            JOIN questions q ON q.id = f.question_id
-            ORDER BY f.updated_at DESC
-            """
-        ).fetchall()
-        return to_csv_response("feedback_export.csv", rows)
+        return render_template(
+            "admin_maintenance.html",
+            admin=admin,
+            tasks=maintenance.TASKS,
+            results=results,
+            stats=maintenance.database_stats(db, db_path),
+            scheduler=maintenance_scheduler.status(),
+            pending=maintenance.pending_requests(db),
+            runs=maintenance.recent_runs(db),
+        )
+
+    @app.route("/admin/snapshot.db.gz")
+    def admin_snapshot():
+        admin = require_admin()
+        if not admin:
+            return redirect(url_for("admin_login"))
+        db_path = current_db_path()
+        info = snapshots.create_snapshot(
+            db_path, app.config["SNAPSHOT_DIR"], pages=app.config["SNAPSHOT_PAGES"]
+        )
+        get_write_queue().call(lambda conn: snapshots.record_run(conn, info, "download"))
+        snapshots.prune_snapshots(app.config["SNAPSHOT_DIR"], db_path.stem, app.config["SNAPSHOT_KEEP"])
+        return send_file(
+            info["path"],
+            mimetype="application/gzip",
+            as_attachment=True,
+            download_name=Path(info["path"]).name,
+        )
+
+    def export_filename(stem: str, extension: str) -> str:
+        dataset = current_dataset()
+        if dataset == datasets.DEFAULT_DATASET:
+            return f"{stem}.{extension}"
+        return f"{stem}_{dataset}.{extension}"
+
+    def with_report_headers(response: Response) -> Response:
+        report = report_status()
+        if report is not None:
+            response.headers["X-Data-As-Of"] = report["as_of"] or ""
+        return response
 
     def to_csv_response(filename: str, rows) -> Response:
         output = []
@@ -991,4 +1939,6 @@ app = create_app()
 if __name__ == "__main__":
     debug = os.environ.get("FLASK_DEBUG", "0") == "1"
     port = int(os.environ.get("PORT", "5001"))
+    # docker stop sends SIGTERM; exit normally so the atexit checkpoint runs.
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
     app.run(host="0.0.0.0", debug=debug, port=port)
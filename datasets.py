@@ -0,0 +1,109 @@
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+DEFAULT_DATASET = "default"
+SLUG_RE = re.compile(r"^[a-z0-9][a-z0-9_-]{0,47}$")
+
+CATALOG_SCHEMA = """
+CREATE TABLE IF NOT EXISTS datasets (
+    slug TEXT PRIMARY KEY,
+    title TEXT,
+    db_path TEXT NOT NULL UNIQUE,
+    created_at TEXT NOT NULL
+);
+"""
+
+
+def normalize_slug(value) -> str:
+    return (value or "").strip().lower()
+
+
+class DatasetCatalog:
+    """Maps dataset slugs to their own SQLite files.
+
+    The ``default`` dataset is always the main ``DB_PATH`` and is not stored in
+    the catalog. Other datasets live in ``datasets_dir/<slug>.db`` (paths are
+    stored relative to the catalog so the directory can be moved or mounted).
+    """
+
+    def __init__(self, catalog_path, default_db_path, datasets_dir, refresh_seconds: float = 10.0):
+        self.catalog_path = Path(catalog_path)
+        self.default_db_path = Path(default_db_path)
+        self.datasets_dir = Path(datasets_dir)
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._loaded_at = 0.0
+        self._entries: dict = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        self.catalog_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.catalog_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.executescript(CATALOG_SCHEMA)
+        return conn
+
+    def _resolve_path(self, stored: str) -> Path:
+        path = Path(stored)
+        return path if path.is_absolute() else (self.catalog_path.parent / path).resolve()
+
+    def _load(self, force: bool = False) -> dict:
+        with self._lock:
+            if not force and time.monotonic() - self._loaded_at < self.refresh_seconds:
+                return self._entries
+            entries = {
+                DEFAULT_DATASET: {"slug": DEFAULT_DATASET, "title": "Default", "db_path": self.default_db_path}
+            }
+            if self.catalog_path.exists():
+                conn = self._connect()
+                try:
+                    for row in conn.execute("SELECT slug, title, db_path FROM datasets ORDER BY slug"):
+                        entries[row["slug"]] = {
+                            "slug": row["slug"],
+                            "title": row["title"] or row["slug"],
+                            "db_path": self._resolve_path(row["db_path"]),
+                        }
+                finally:
+                    conn.close()
+            self._entries = entries
+            self._loaded_at = time.monotonic()
+            return entries
+
+    def list(self):
+        return list(self._load().values())
+
+    def db_paths(self):
+        return [entry["db_path"] for entry in self.list()]
+
+    def resolve(self, slug) -> Optional[Path]:
+        slug = normalize_slug(slug) or DEFAULT_DATASET
+        entry = self._load().get(slug) or self._load(force=True).get(slug)
+        return entry["db_path"] if entry else None
+
+    def create(self, slug, title: str = "") -> Path:
+        slug = normalize_slug(slug)
+        if not SLUG_RE.match(slug):
+            raise ValueError("Dataset slug must be lowercase letters, digits, '-' or '_' (max 48).")
+        if slug == DEFAULT_DATASET:
+            return self.default_db_path
+        self.datasets_dir.mkdir(parents=True, exist_ok=True)
+        db_path = (self.datasets_dir / f"{slug}.db").resolve()
+        try:
+            stored = str(db_path.relative_to(self.catalog_path.parent.resolve()))
+        except ValueError:
+            stored = str(db_path)
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR IGNORE INTO datasets (slug, title, db_path, created_at) VALUES (?, ?, ?, ?)",
+                    (slug, (title or "").strip() or slug, stored, datetime.utcnow().isoformat()),
+                )
+        finally:
+            conn.close()
+        self._load(force=True)
+        return self.resolve(slug)
@@ -0,0 +1,296 @@
+import sqlite3
+from array import array
+from datetime import datetime
+from hashlib import blake2b
+from random import Random
+from typing import Optional
+
+from similarity import char_ngrams
+
+# 20 bands of 3 rows: pairs with trigram Jaccard above ~0.37 usually share a bucket.
+NUM_PERM = 60
+BANDS = 20
+ROWS_PER_BAND = NUM_PERM // BANDS
+FIELD_WEIGHTS = {"gu": 0.7, "en": 0.3}
+DUPLICATE_THRESHOLD = 0.6
+MAX_CANDIDATES = 50
+
+_MASK64 = (1 << 64) - 1
+_rng = Random(20240601)
+# Odd multipliers make each ``(a * h + b) mod 2**64`` a permutation of 64-bit hashes.
+_PERMUTATIONS = [(_rng.getrandbits(64) | 1, _rng.getrandbits(64)) for _ in range(NUM_PERM)]
+
+# MinHash signatures per question / suggestion and their LSH band buckets, so a
+# lookup reads a few index entries per band instead of comparing every item.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS minhash_items (
+    kind TEXT NOT NULL,
+    item_id INTEGER NOT NULL,
+    text_key TEXT,
+    sig_gu BLOB,
+    sig_en BLOB,
+    PRIMARY KEY (kind, item_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS minhash_buckets (
+    field TEXT NOT NULL,
+    band INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    item_id INTEGER NOT NULL,
+    PRIMARY KEY (field, band, bucket, kind, item_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_minhash_buckets_item
+ON minhash_buckets(kind, item_id);
+
+CREATE TABLE IF NOT EXISTS suggestion_matches (
+    suggestion_id INTEGER PRIMARY KEY,
+    question_id INTEGER,
+    question_score REAL,
+    duplicate_of INTEGER,
+    duplicate_score REAL,
+    cluster_id INTEGER NOT NULL,
+    updated_at TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_suggestion_matches_cluster
+ON suggestion_matches(cluster_id);
+
+CREATE INDEX IF NOT EXISTS idx_suggestion_matches_question
+ON suggestion_matches(question_id);
+"""
+
+
+def ensure_schema(conn: sqlite3.Connection) -> None:
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='minhash_items'"
+    ).fetchone()
+    conn.executescript(SCHEMA)
+    if not exists:
+        rebuild(conn)
+
+
+def signature(text) -> Optional[array]:
+    grams = char_ngrams(text)
+    if not grams:
+        return None
+    hashes = [int.from_bytes(blake2b(gram.encode("utf-8"), digest_size=8).digest(), "big") for gram in grams]
+    return array("Q", (min((a * h + b) & _MASK64 for h in hashes) for a, b in _PERMUTATIONS))
+
+
+def signatures(q_gu, q_en) -> dict:
+    return {"gu": signature(q_gu), "en": signature(q_en)}
+
+
+def _from_blob(blob) -> Optional[array]:
+    if blob is None:
+        return None
+    sig = array("Q")
+    sig.frombytes(blob)
+    return sig
+
+
+def _band_keys(sigs: dict) -> list:
+    keys = []
+    for field, sig in sigs.items():
+        if sig is None:
+            continue
+        for band in range(BANDS):
+            rows = sig[band * ROWS_PER_BAND : (band + 1) * ROWS_PER_BAND]
+            bucket = int.from_bytes(blake2b(rows.tobytes(), digest_size=8).digest(), "big", signed=True)
+            keys.append((field, band, bucket))
+    return keys
+
+
+def similarity(a: dict, b: dict) -> float:
+    """Weighted MinHash estimate of trigram Jaccard over fields present on both sides."""
+    total = weight_sum = 0.0
+    for field, weight in FIELD_WEIGHTS.items():
+        if a.get(field) is None or b.get(field) is None:
+            continue
+        same = sum(1 for x, y in zip(a[field], b[field]) if x == y)
+        total += weight * same / NUM_PERM
+        weight_sum += weight
+    return total / weight_sum if weight_sum else 0.0
+
+
+def _store(conn: sqlite3.Connection, kind: str, item_id: int, text_key, sigs: dict) -> None:
+    conn.execute("DELETE FROM minhash_buckets WHERE kind=? AND item_id=?", (kind, item_id))
+    conn.execute(
+        "INSERT OR REPLACE INTO minhash_items (kind, item_id, text_key, sig_gu, sig_en) VALUES (?, ?, ?, ?, ?)",
+        (
+            kind,
+            item_id,
+            text_key,
+            sigs["gu"].tobytes() if sigs["gu"] is not None else None,
+            sigs["en"].tobytes() if sigs["en"] is not None else None,
+        ),
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO minhash_buckets (field, band, bucket, kind, item_id) VALUES (?, ?, ?, ?, ?)",
+        [(*key, kind, item_id) for key in _band_keys(sigs)],
+    )
+
+
+def _candidates(conn: sqlite3.Connection, kind: str, sigs: dict) -> dict:
+    """Items of ``kind`` sharing at least one band bucket, with their signatures."""
+    keys = _band_keys(sigs)
+    if not keys:
+        return {}
+    values = ",".join("(?, ?, ?)" for _ in keys)
+    rows = conn.execute(
+        f"""
+        SELECT m.item_id, m.sig_gu, m.sig_en
+        FROM (
+          SELECT item_id, COUNT(*) AS shared
+          FROM minhash_buckets
+          WHERE kind = ? AND (field, band, bucket) IN (VALUES {values})
+          GROUP BY item_id
+          ORDER BY shared DESC
+          LIMIT ?
+        ) c
+        JOIN minhash_items m ON m.kind = ? AND m.item_id = c.item_id
+        """,
+        (kind, *[part for key in keys for part in key], MAX_CANDIDATES, kind),
+    ).fetchall()
+    return {row[0]: {"gu": _from_blob(row[1]), "en": _from_blob(row[2])} for row in rows}
+
+
+def _best(candidates: dict, sigs: dict, allowed=None):
+    best_id, best_score = None, 0.0
+    for item_id, item_sigs in candidates.items():
+        if allowed is not None and item_id not in allowed:
+            continue
+        score = similarity(sigs, item_sigs)
+        if score > best_score or (score == best_score and best_id is not None and item_id < best_id):
+            best_id, best_score = item_id, score
+    return (best_id, round(best_score, 4)) if best_id is not None else (None, None)
+
+
+def _closest_question(conn: sqlite3.Connection, sigs: dict):
+    candidates = _candidates(conn, "question", sigs)
+    if not candidates:
+        return None, None
+    placeholders = ",".join("?" for _ in candidates)
+    active = {
+        row[0]
+        for row in conn.execute(
+            f"SELECT id FROM questions WHERE active = 1 AND id IN ({placeholders})", list(candidates)
+        )
+    }
+    return _best(candidates, sigs, active)
+
+
+def index_suggestion(conn: sqlite3.Connection, suggestion_id: int, q_gu, q_en) -> dict:
+    """Index one new suggestion and record its closest question and duplicate cluster.
+
+    A suggestion joins the cluster of its most similar earlier suggestion when
+    the score reaches ``DUPLICATE_THRESHOLD``; otherwise it starts its own.
+    Runs inside the caller's transaction.
+    """
+    sigs = signatures(q_gu, q_en)
+    question_id, question_score = _closest_question(conn, sigs)
+    earlier = {
+        item_id: item_sigs
+        for item_id, item_sigs in _candidates(conn, "suggestion", sigs).items()
+        if item_id < suggestion_id
+    }
+    duplicate_of, duplicate_score = _best(earlier, sigs)
+    cluster_id = suggestion_id
+    if duplicate_of is not None and duplicate_score >= DUPLICATE_THRESHOLD:
+        row = conn.execute(
+            "SELECT cluster_id FROM suggestion_matches WHERE suggestion_id = ?", (duplicate_of,)
+        ).fetchone()
+        cluster_id = row[0] if row else duplicate_of
+    _store(conn, "suggestion", suggestion_id, None, sigs)
+    match = {
+        "question_id": question_id,
+        "question_score": question_score,
+        "duplicate_of": duplicate_of,
+        "duplicate_score": duplicate_score,
+        "cluster_id": cluster_id,
+    }
+    conn.execute(
+        """
+        INSERT OR REPLACE INTO suggestion_matches
+        (suggestion_id, question_id, question_score, duplicate_of, duplicate_score, cluster_id, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        (suggestion_id, *match.values(), datetime.utcnow().isoformat()),
+    )
+    return match
+
+
+def sync_questions(conn: sqlite3.Connection) -> int:
+    """Re-index questions whose text changed and refresh affected suggestion matches.
+
+    ``questions.content_key`` is the change marker, so an unchanged import only
+    costs one indexed anti-join. Suggestions re-scored are those sharing a
+    bucket with a re-indexed question or pointing at one that changed or was
+    deactivated. Returns the number of questions re-indexed.
+    """
+    changed = conn.execute(
+        """
+        SELECT q.id, q.content_key, q.q_gu, q.q_en
+        FROM questions q
+        LEFT JOIN minhash_items m ON m.kind = 'question' AND m.item_id = q.id
+        WHERE m.text_key IS NOT q.content_key
+        """
+    ).fetchall()
+    affected = set()
+    for question_id, content_key, q_gu, q_en in changed:
+        sigs = signatures(q_gu, q_en)
+        _store(conn, "question", question_id, content_key, sigs)
+        affected.update(_candidates(conn, "suggestion", sigs))
+    changed_ids = [row[0] for row in changed]
+    for start in range(0, len(changed_ids), 500):
+        chunk = changed_ids[start : start + 500]
+        placeholders = ",".join("?" for _ in chunk)
+        affected.update(
+            row[0]
+            for row in conn.execute(
+                f"SELECT suggestion_id FROM suggestion_matches WHERE question_id IN ({placeholders})", chunk
+            )
+        )
+    affected.update(
+        row[0]
+        for row in conn.execute(
+            """
+            SELECT m.suggestion_id
+            FROM suggestion_matches m
+            JOIN questions q ON q.id = m.question_id
+            WHERE q.active = 0
+            """
+        )
+    )
+    if affected:
+        updates = []
+        now = datetime.utcnow().isoformat()
+        for suggestion_id in sorted(affected):
+            row = conn.execute(
+                "SELECT sig_gu, sig_en FROM minhash_items WHERE kind = 'suggestion' AND item_id = ?",
+                (suggestion_id,),
+            ).fetchone()
+            if row is None:
+                continue
+            sigs = {"gu": _from_blob(row[0]), "en": _from_blob(row[1])}
+            updates.append((*_closest_question(conn, sigs), now, suggestion_id))
+        conn.executemany(
+            "UPDATE suggestion_matches SET question_id=?, question_score=?, updated_at=? WHERE suggestion_id=?",
+            updates,
+        )
+    return len(changed)
+
+
+def rebuild(conn: sqlite3.Connection) -> int:
+    conn.execute("DELETE FROM minhash_buckets")
+    conn.execute("DELETE FROM minhash_items")
+    conn.execute("DELETE FROM suggestion_matches")
+    sync_questions(conn)
+    rows = conn.execute(
+        "SELECT id, question_text_gu, question_text_en FROM suggested_questions ORDER BY id"
+    ).fetchall()
+    for suggestion_id, q_gu, q_en in rows:
+        index_suggestion(conn, suggestion_id, q_gu, q_en)
+    return len(rows)
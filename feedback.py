@@ -0,0 +1,297 @@
+import csv
+import json
+import sqlite3
+from datetime import datetime, timezone
+from typing import Optional
+
+import storage
+
+RATING_FIELDS = ("q_translation_rating", "answer_accuracy_rating", "answer_translation_rating")
+TEXT_FIELDS = ("q_translation_comment", "search_comment", "answer_comment")
+FORM_FIELDS = (
+    "q_translation_rating",
+    "q_translation_comment",
+    "search_comment",
+    "answer_accuracy_rating",
+    "answer_translation_rating",
+    "answer_comment",
+)
+SAVE_ACTIONS = ("draft", "submitted")
+VALID_RATINGS = {"1", "2", "3", "4", "5"}
+
+_VALUE_COLUMNS = (
+    "submission_status",
+    "q_translation_rating",
+    "q_translation_comment",
+    "search_rating",
+    "search_issue_type",
+    "search_comment",
+    "answer_accuracy_rating",
+    "answer_translation_rating",
+    "answer_comment",
+)
+
+_UPSERT_SQL = f"""
+    INSERT INTO feedback (
+        user_id, question_id,
+        {", ".join(_VALUE_COLUMNS)},
+        created_at, updated_at
+    )
+    VALUES (?, ?, {", ".join("?" for _ in _VALUE_COLUMNS)}, ?, ?)
+    ON CONFLICT(user_id, question_id) DO UPDATE SET
+        {", ".join(f"{col}=excluded.{col}" for col in _VALUE_COLUMNS)},
+        updated_at=excluded.updated_at
+"""
+
+# Replays (offline uploads) must be idempotent: identical values are not
+# rewritten, and a draft never reverts a row that was already submitted.
+_REPLAY_GUARD = f"""
+    WHERE ({", ".join(f"feedback.{col}" for col in _VALUE_COLUMNS)})
+          IS NOT ({", ".join(f"excluded.{col}" for col in _VALUE_COLUMNS)})
+      AND (feedback.submission_status = 'draft' OR excluded.submission_status = 'submitted')
+"""
+
+
+def clean_form(source) -> dict:
+    """The six annotator fields as stripped strings (missing -> ``""``)."""
+    return {key: ("" if source.get(key) is None else str(source.get(key))).strip() for key in FORM_FIELDS}
+
+
+def validate(form_data: dict, save_action: str) -> Optional[str]:
+    """Error message for a save that must be rejected, else ``None``.
+
+    Drafts accept partial input (malformed ratings are stored as ``NULL``).
+    """
+    if save_action not in SAVE_ACTIONS:
+        return "Unknown save action."
+    if save_action == "draft":
+        return None
+    for field in RATING_FIELDS:
+        if form_data[field] not in VALID_RATINGS:
+            return "All ratings are required and must be between 1 and 5 before submit."
+    if int(form_data["q_translation_rating"]) <= 2 and not form_data["q_translation_comment"]:
+        return "Add a question translation comment when rating is 1 or 2."
+    if (
+        int(form_data["answer_accuracy_rating"]) <= 2 or int(form_data["answer_translation_rating"]) <= 2
+    ) and not form_data["answer_comment"]:
+        return "Add an answer comment when answer accuracy/translation rating is 1 or 2."
+    return None
+
+
+def rating_or_none(value: str):
+    return int(value) if value in VALID_RATINGS else None
+
+
+def upsert(
+    conn: sqlite3.Connection,
+    user_id: int,
+    question_id: int,
+    save_action: str,
+    form_data: dict,
+    now: str,
+    replay: bool = False,
+) -> int:
+    """Write one annotator's feedback row; returns the number of rows written.
+
+    With ``replay`` the write is skipped when nothing changed or when a draft
+    would overwrite a submitted row, so uploading the same batch twice is a no-op.
+    """
+    values = (
+        save_action,
+        rating_or_none(form_data["q_translation_rating"]),
+        form_data["q_translation_comment"],
+        None,
+        None,
+        form_data["search_comment"],
+        rating_or_none(form_data["answer_accuracy_rating"]),
+        rating_or_none(form_data["answer_translation_rating"]),
+        form_data["answer_comment"],
+    )
+    sql = _UPSERT_SQL + (_REPLAY_GUARD if replay else "")
+    return conn.execute(sql, (user_id, question_id, *values, now, now)).rowcount
+
+
+INGEST_BATCH_SIZE = 5000
+MAX_REPORTED_ERRORS = 1000
+
+
+def iter_jsonl(lines):
+    """``(line_no, record, error)`` per non-blank JSON Lines row."""
+    for line_no, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield line_no, None, f"invalid JSON: {exc}"
+            continue
+        if not isinstance(record, dict):
+            yield line_no, None, "each line must be a JSON object"
+            continue
+        yield line_no, record, None
+
+
+def iter_csv(lines):
+    """``(line_no, record, error)`` per CSV row; headers match the feedback export."""
+    reader = csv.DictReader(lines)
+    for record in reader:
+        yield reader.line_num, record, None
+
+
+def _timestamp(value) -> Optional[str]:
+    """ISO date or datetime as naive UTC ``isoformat()``, like server-side ``now``; blank -> ``None``."""
+    value = ("" if value is None else str(value)).strip()
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.isoformat()
+
+
+def prepare_row(record: dict) -> tuple:
+    """Validate one ingest record; raises ``ValueError`` with the row's error.
+
+    Uses the same rules as ``/annotate/save``; ``search_rating`` (optional) must
+    also be 1-5. Returns ``(email, user_id, question_id, values, created_at)``;
+    ``created_at`` is ``None`` when the record has none.
+    """
+    email = storage.normalize_email(record.get("user_email") or record.get("email"))
+    user_id = str(record.get("user_id") or "").strip()
+    if not email and not user_id.isdigit():
+        raise ValueError("user_email or user_id is required")
+    question_id = str(record.get("question_id") or "").strip()
+    if not question_id.isdigit():
+        raise ValueError("question_id must be an integer")
+    save_action = str(record.get("submission_status") or "submitted").strip()
+    form_data = clean_form(record)
+    error = validate(form_data, save_action)
+    if error:
+        raise ValueError(error)
+    search_rating = str(record.get("search_rating") or "").strip()
+    if search_rating and search_rating not in VALID_RATINGS:
+        raise ValueError("search_rating must be between 1 and 5")
+    try:
+        created_at = _timestamp(record.get("created_at"))
+    except ValueError:
+        raise ValueError("created_at must be an ISO date or timestamp") from None
+    values = (
+        save_action,
+        rating_or_none(form_data["q_translation_rating"]),
+        form_data["q_translation_comment"],
+        rating_or_none(search_rating),
+        str(record.get("search_issue_type") or "").strip() or None,
+        form_data["search_comment"],
+        rating_or_none(form_data["answer_accuracy_rating"]),
+        rating_or_none(form_data["answer_translation_rating"]),
+        form_data["answer_comment"],
+    )
+    return email, int(user_id) if user_id.isdigit() else None, int(question_id), values, created_at
+
+
+class FeedbackIngest:
+    """Validates and upserts externally produced feedback in large batches.
+
+    Rows are validated up front; each batch then resolves users, questions and
+    assignments with one query apiece and writes with a single ``executemany``
+    of the replay-safe upsert, so re-ingesting the same file changes nothing.
+    A written row's ``updated_at`` is the server time of its batch, whatever
+    the record says, so incremental exports pick it up; the record's
+    ``created_at`` is kept for new rows. Callers own the transaction around
+    :meth:`write_batch`.
+    """
+
+    def __init__(self, create_users: bool = False, assign: bool = False, dry_run: bool = False):
+        self.create_users = create_users
+        self.assign = assign
+        self.dry_run = dry_run
+        self.counts = {"rows": 0, "saved": 0, "unchanged": 0, "rejected": 0}
+        self.errors: list = []
+
+    def reject(self, line_no: int, message: str) -> None:
+        self.counts["rejected"] += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line_no, "error": message})
+
+    def batches(self, records, batch_size: int = INGEST_BATCH_SIZE):
+        """Validated rows from ``(line_no, record, error)`` triples, ``batch_size`` at a time."""
+        batch = []
+        for line_no, record, error in records:
+            self.counts["rows"] += 1
+            if error:
+                self.reject(line_no, error)
+                continue
+            try:
+                batch.append((line_no, *prepare_row(record)))
+            except ValueError as exc:
+                self.reject(line_no, str(exc))
+                continue
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _lookup(self, conn: sqlite3.Connection, sql: str, keys) -> list:
+        keys = list(keys)
+        if not keys:
+            return []
+        return conn.execute(sql.format(placeholders=",".join("?" for _ in keys)), keys).fetchall()
+
+    def write_batch(self, conn: sqlite3.Connection, batch: list) -> None:
+        if self.dry_run:
+            conn.execute("SAVEPOINT ingest_dry_run")
+        emails = {row[1] for row in batch if row[1]}
+        if self.create_users and emails:
+            conn.executemany(
+                "INSERT OR IGNORE INTO users (email, email_norm, is_admin) VALUES (?, ?, 0)",
+                [(email, email) for email in emails],
+            )
+        by_email = dict(self._lookup(conn, "SELECT email_norm, id FROM users WHERE email_norm IN ({placeholders})", emails))
+        known_ids = {
+            row[0]
+            for row in self._lookup(
+                conn, "SELECT id FROM users WHERE id IN ({placeholders})", {row[2] for row in batch if row[2]}
+            )
+        }
+        question_ids = {row[3] for row in batch}
+        known_questions = {
+            row[0] for row in self._lookup(conn, "SELECT id FROM questions WHERE id IN ({placeholders})", question_ids)
+        }
+        assigned = {
+            (row[0], row[1])
+            for row in self._lookup(
+                conn, "SELECT user_id, question_id FROM assignments WHERE question_id IN ({placeholders})", question_ids
+            )
+        }
+
+        now = datetime.utcnow().isoformat()
+        params = []
+        new_assignments = []
+        for line_no, email, user_id, question_id, values, created_at in batch:
+            resolved = by_email.get(email) if email else (user_id if user_id in known_ids else None)
+            if resolved is None:
+                self.reject(line_no, "unknown user")
+                continue
+            if question_id not in known_questions:
+                self.reject(line_no, "unknown question_id")
+                continue
+            if (resolved, question_id) not in assigned:
+                if not self.assign:
+                    self.reject(line_no, "user is not assigned to this question")
+                    continue
+                assigned.add((resolved, question_id))
+                new_assignments.append((resolved, question_id))
+            params.append((resolved, question_id, *values, created_at or now, now))
+        if new_assignments:
+            conn.executemany("INSERT OR IGNORE INTO assignments (user_id, question_id) VALUES (?, ?)", new_assignments)
+        written = conn.executemany(_UPSERT_SQL + _REPLAY_GUARD, params).rowcount if params else 0
+        self.counts["saved"] += written
+        self.counts["unchanged"] += len(params) - written
+        if self.dry_run:
+            conn.execute("ROLLBACK TO ingest_dry_run")
+            conn.execute("RELEASE ingest_dry_run")
+
+    def summary(self) -> dict:
+        return {**self.counts, "dry_run": self.dry_run, "errors": self.errors}
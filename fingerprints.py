@@ -0,0 +1,115 @@
+import hashlib
+import json
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS import_fingerprints (
+    source TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    schema_version INTEGER NOT NULL,
+    options TEXT NOT NULL,
+    loaded_at TEXT NOT NULL
+);
+"""
+
+
+def ensure_schema(conn: sqlite3.Connection) -> None:
+    conn.executescript(SCHEMA)
+
+
+def sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with Path(path).open("rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def encode_options(options: dict) -> str:
+    return json.dumps(options, sort_keys=True, separators=(",", ":"))
+
+
+def check(conn: sqlite3.Connection, sources: dict, schema_version: int, options: dict):
+    """Compare source files against the last successful load.
+
+    ``sources`` maps a name (``golden``, ``eval``) to a path. Files whose size
+    and mtime match the stored fingerprint are not re-hashed. Returns
+    ``(unchanged, fingerprints)``; pass ``fingerprints`` to :func:`record` once
+    the load is committed. Entries flagged ``stat_changed`` (touched but maybe
+    identical files) are what :func:`refresh_stats` needs after a skip.
+    """
+    encoded = encode_options(options)
+    stored = {
+        row["source"]: row
+        for row in conn.execute("SELECT * FROM import_fingerprints").fetchall()
+    }
+    unchanged = True
+    fingerprints = {}
+    for name, path in sources.items():
+        path = Path(path)
+        stat = path.stat()
+        previous = stored.get(name)
+        same_stat = (
+            previous is not None
+            and previous["path"] == str(path)
+            and previous["size"] == stat.st_size
+            and previous["mtime_ns"] == stat.st_mtime_ns
+        )
+        digest = previous["sha256"] if same_stat else sha256_file(path)
+        fingerprints[name] = {
+            "path": str(path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": digest,
+            "stat_changed": not same_stat,
+        }
+        if (
+            previous is None
+            or previous["sha256"] != digest
+            or previous["schema_version"] != schema_version
+            or previous["options"] != encoded
+        ):
+            unchanged = False
+    return unchanged, fingerprints
+
+
+def record(conn: sqlite3.Connection, fingerprints: dict, schema_version: int, options: dict) -> None:
+    now = datetime.utcnow().isoformat()
+    encoded = encode_options(options)
+    conn.executemany(
+        """
+        INSERT INTO import_fingerprints (source, path, size, mtime_ns, sha256, schema_version, options, loaded_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(source) DO UPDATE SET
+          path=excluded.path,
+          size=excluded.size,
+          mtime_ns=excluded.mtime_ns,
+          sha256=excluded.sha256,
+          schema_version=excluded.schema_version,
+          options=excluded.options,
+          loaded_at=excluded.loaded_at
+        """,
+        [
+            (name, fp["path"], fp["size"], fp["mtime_ns"], fp["sha256"], schema_version, encoded, now)
+            for name, fp in fingerprints.items()
+        ],
+    )
+
+
+def refresh_stats(conn: sqlite3.Connection, fingerprints: dict) -> int:
+    """After a skip: store new path/size/mtime for re-hashed files, keeping ``loaded_at``.
+
+    Writes nothing when every file matched on size and mtime, so an unchanged
+    start is read-only and ``loaded_at`` keeps marking the last real load.
+    """
+    stale = [
+        (fp["path"], fp["size"], fp["mtime_ns"], name) for name, fp in fingerprints.items() if fp.get("stat_changed")
+    ]
+    if stale:
+        conn.executemany("UPDATE import_fingerprints SET path=?, size=?, mtime_ns=? WHERE source=?", stale)
+    return len(stale)
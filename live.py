@@ -0,0 +1,188 @@
+import json
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import storage
+
+# Table versions that can move assignment progress.
+WATCHED_TABLES = ("assignments", "feedback", "questions", "users")
+
+USER_PROGRESS_SQL = """
+    SELECT
+      u.id,
+      COUNT(DISTINCT a.question_id) AS assigned,
+      COUNT(DISTINCT CASE WHEN f.submission_status = 'submitted' THEN f.question_id END) AS completed,
+      COUNT(DISTINCT CASE WHEN f.submission_status = 'draft' THEN f.question_id END) AS drafts
+    FROM users u
+    LEFT JOIN assignments a ON a.user_id = u.id
+    LEFT JOIN feedback f ON f.user_id = u.id AND f.question_id = a.question_id
+    GROUP BY u.id
+"""
+
+QUESTION_STATUS_SQL = """
+    SELECT
+      q.id,
+      COUNT(DISTINCT a.user_id) AS assigned_count,
+      COUNT(DISTINCT CASE WHEN f.user_id IS NOT NULL THEN f.user_id END) AS completed_count
+    FROM questions q
+    LEFT JOIN assignments a ON a.question_id = q.id
+    LEFT JOIN feedback f
+      ON f.question_id = q.id
+     AND f.user_id = a.user_id
+     AND f.submission_status = 'submitted'
+    WHERE q.active = 1
+    GROUP BY q.id
+"""
+
+
+def progress_state(conn: sqlite3.Connection) -> dict:
+    users = {
+        row["id"]: {"assigned": row["assigned"], "completed": row["completed"], "drafts": row["drafts"]}
+        for row in conn.execute(USER_PROGRESS_SQL)
+    }
+    questions = {
+        row["id"]: {"assigned_count": row["assigned_count"], "completed_count": row["completed_count"]}
+        for row in conn.execute(QUESTION_STATUS_SQL)
+    }
+    metrics = {"total_questions": len(questions), "unassigned": 0, "partial": 0, "full": 0}
+    for status in questions.values():
+        if status["assigned_count"] == 0:
+            metrics["unassigned"] += 1
+        elif status["completed_count"] < status["assigned_count"]:
+            metrics["partial"] += 1
+        else:
+            metrics["full"] += 1
+    return {"users": users, "questions": questions, "metrics": metrics}
+
+
+def progress_delta(previous: dict, current: dict) -> dict:
+    """Entries whose values changed; removed users/questions map to ``None``."""
+    delta = {}
+    for section in ("users", "questions"):
+        old, new = previous.get(section, {}), current[section]
+        changed = {key: value for key, value in new.items() if old.get(key) != value}
+        changed.update({key: None for key in old.keys() - new.keys()})
+        if changed:
+            delta[section] = changed
+    if previous.get("metrics") != current["metrics"]:
+        delta["metrics"] = current["metrics"]
+    return delta
+
+
+def watched_versions(versions: dict) -> tuple:
+    return tuple(versions.get(name) for name in WATCHED_TABLES)
+
+
+class ProgressBroadcaster:
+    """One polling thread per database that fans progress deltas out to subscribers.
+
+    The thread probes ``PRAGMA data_version`` (via :class:`storage.VersionWatcher`)
+    every ``poll_interval`` seconds and recomputes the aggregates only when one
+    of the ``WATCHED_TABLES`` versions moved, so the cost is per change, not per
+    viewer. It stops itself when the last subscriber leaves.
+
+    Queue items are ``(event_id, payload)``. A new subscriber first gets the
+    full state (same shape as a delta) tagged with the id of the last delta it
+    includes; a subscriber that falls behind gets its backlog replaced by the
+    same kind of snapshot.
+    """
+
+    def __init__(self, db_path, poll_interval: float = 0.5, max_pending: int = 100):
+        self.db_path = Path(db_path)
+        self.poll_interval = poll_interval
+        self.max_pending = max_pending
+        self._subscribers: set = set()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._state: dict = {}
+        self._versions = None
+        self._event_id = 0
+        self.events_sent = 0
+        self.recomputes = 0
+
+    def subscribe(self) -> "queue.Queue":
+        subscriber: "queue.Queue" = queue.Queue(maxsize=self.max_pending)
+        with self._lock:
+            if self._versions is None:
+                # No thread has been keeping the state current; read it once now.
+                conn = storage.connect(self.db_path)
+                try:
+                    with conn:
+                        conn.execute("BEGIN")
+                        versions = dict(conn.execute("SELECT name, version FROM table_versions").fetchall())
+                        self._state = progress_state(conn)
+                    self._versions = watched_versions(versions)
+                    self.recomputes += 1
+                finally:
+                    conn.close()
+            subscriber.put_nowait(self._snapshot())
+            self._subscribers.add(subscriber)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name=f"progress-feed:{self.db_path.name}", daemon=True
+                )
+                self._thread.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber: "queue.Queue") -> None:
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "events_sent": self.events_sent,
+                "recomputes": self.recomputes,
+            }
+
+    def _snapshot(self) -> tuple:
+        # Caller holds self._lock.
+        return self._event_id, json.dumps(self._state, separators=(",", ":"))
+
+    def _update(self, current: dict, versions: tuple) -> None:
+        delta = progress_delta(self._state, current)
+        with self._lock:
+            self._state, self._versions = current, versions
+            self.recomputes += 1
+            if not delta:
+                return
+            self._event_id += 1
+            event = (self._event_id, json.dumps(delta, separators=(",", ":")))
+            subscribers = list(self._subscribers)
+            snapshot = None
+            for subscriber in subscribers:
+                try:
+                    subscriber.put_nowait(event)
+                except queue.Full:
+                    # A stalled tab has missed deltas; replace its backlog with the full state.
+                    while True:
+                        try:
+                            subscriber.get_nowait()
+                        except queue.Empty:
+                            break
+                    snapshot = snapshot or self._snapshot()
+                    subscriber.put_nowait(snapshot)
+            self.events_sent += 1
+
+    def _run(self) -> None:
+        watcher = storage.VersionWatcher(self.db_path)
+        conn = storage.connect(self.db_path)
+        try:
+            while True:
+                with self._lock:
+                    if not self._subscribers:
+                        # The state goes stale from here; the next subscribe() rereads it.
+                        self._thread, self._versions = None, None
+                        return
+                    known = self._versions
+                versions = watched_versions(watcher.versions())
+                if versions != known:
+                    self._update(progress_state(conn), versions)
+                time.sleep(self.poll_interval)
+        finally:
+            conn.close()
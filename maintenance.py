@@ -0,0 +1,287 @@
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Optional
+
+import storage
+
+TASKS = ("optimize", "analyze", "incremental_vacuum", "checkpoint")
+ANALYSIS_LIMIT = 1000  # rows sampled per index by ANALYZE / PRAGMA optimize
+VACUUM_STEP_PAGES = 256  # pages freed per write transaction, so writers get in between steps
+BUSY_TIMEOUT_MS = 500  # maintenance backs off quickly instead of queueing behind annotators
+LARGE_CHANGE_ROWS = 1000  # bulk writes at least this big request a fresh ANALYZE
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS maintenance_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_at TEXT NOT NULL,
+    trigger TEXT NOT NULL,
+    task TEXT NOT NULL,
+    status TEXT NOT NULL,
+    duration_ms REAL NOT NULL,
+    bytes_reclaimed INTEGER NOT NULL DEFAULT 0,
+    detail TEXT
+);
+
+CREATE TABLE IF NOT EXISTS maintenance_requests (
+    task TEXT PRIMARY KEY,
+    requested_at TEXT NOT NULL,
+    reason TEXT
+);
+"""
+
+
+def ensure_schema(conn: sqlite3.Connection) -> None:
+    conn.executescript(SCHEMA)
+
+
+def request(conn: sqlite3.Connection, reason: str, task: str = "analyze") -> None:
+    """Ask the next maintenance window to run ``task``, e.g. after a bulk rebuild.
+
+    Runs inside the caller's transaction, so the request lands with the change.
+    """
+    conn.execute(
+        "INSERT INTO maintenance_requests (task, requested_at, reason) VALUES (?, ?, ?) "
+        "ON CONFLICT(task) DO UPDATE SET requested_at = excluded.requested_at, reason = excluded.reason",
+        (task, datetime.utcnow().isoformat(), reason),
+    )
+
+
+def _file_size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def _optimize(conn: sqlite3.Connection, db_path: Path, deadline: float):
+    conn.execute("PRAGMA optimize")
+    return "ok", 0, None
+
+
+def _analyze(conn: sqlite3.Connection, db_path: Path, deadline: float):
+    conn.execute("ANALYZE")
+    conn.execute("DELETE FROM maintenance_requests WHERE task = 'analyze'")
+    return "ok", 0, None
+
+
+def _incremental_vacuum(conn: sqlite3.Connection, db_path: Path, deadline: float):
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        return "skipped", 0, "auto_vacuum is not INCREMENTAL; run scripts/maintain_db.py --enable-incremental-vacuum"
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    start_free = free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    while free and time.monotonic() < deadline:
+        conn.execute(f"PRAGMA incremental_vacuum({min(free, VACUUM_STEP_PAGES)})").fetchall()
+        free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    status = "partial" if free else "ok"
+    return status, (start_free - free) * page_size, f"free pages {start_free} -> {free}"
+
+
+def _checkpoint(conn: sqlite3.Connection, db_path: Path, deadline: float):
+    wal_path = Path(f"{db_path}-wal")
+    before = _file_size(wal_path)
+    busy, frames, done = conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
+    detail = f"{done}/{frames} WAL frames checkpointed"
+    if not busy and frames == done and time.monotonic() < deadline:
+        # Everything is already in the DB; TRUNCATE only has to wait out current readers.
+        busy = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()[0]
+        detail += ", WAL busy" if busy else ", WAL truncated"
+    status = "busy" if busy else ("ok" if frames == done else "partial")
+    return status, max(before - _file_size(wal_path), 0), detail
+
+
+_RUNNERS = {
+    "optimize": _optimize,
+    "analyze": _analyze,
+    "incremental_vacuum": _incremental_vacuum,
+    "checkpoint": _checkpoint,
+}
+
+
+def due_tasks(conn: sqlite3.Connection) -> list:
+    """Tasks for a scheduled window: ANALYZE only when requested or never run."""
+    requested = conn.execute("SELECT 1 FROM maintenance_requests WHERE task = 'analyze'").fetchone()
+    analyzed = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone()
+    return [task for task in TASKS if task != "analyze" or requested or not analyzed]
+
+
+def run(db_path, tasks=None, budget_seconds: float = 5.0, trigger: str = "manual") -> list:
+    """Run maintenance ``tasks`` (default :func:`due_tasks`) within ``budget_seconds``.
+
+    Every statement runs in autocommit on a dedicated connection with a short
+    busy timeout; a progress handler interrupts whatever is still running when
+    the budget is spent. Each task's outcome is recorded in ``maintenance_runs``.
+    """
+    db_path = Path(db_path)
+    run_at = datetime.utcnow().isoformat()
+    deadline = time.monotonic() + budget_seconds
+    conn = storage.connect(db_path, timeout=BUSY_TIMEOUT_MS / 1000.0)
+    conn.isolation_level = None
+    results = []
+    try:
+        conn.execute(f"PRAGMA analysis_limit={ANALYSIS_LIMIT}")
+        conn.set_progress_handler(lambda: time.monotonic() > deadline, 10000)
+        for task in tasks or due_tasks(conn):
+            started = time.monotonic()
+            if started >= deadline:
+                status, reclaimed, detail = "skipped", 0, "time budget spent"
+            else:
+                try:
+                    status, reclaimed, detail = _RUNNERS[task](conn, db_path, deadline)
+                except sqlite3.OperationalError as exc:
+                    message = str(exc)
+                    status = "interrupted" if "interrupt" in message else (
+                        "busy" if "locked" in message or "busy" in message else "error"
+                    )
+                    reclaimed, detail = 0, message
+            results.append(
+                {
+                    "task": task,
+                    "status": status,
+                    "duration_ms": round((time.monotonic() - started) * 1000.0, 3),
+                    "bytes_reclaimed": reclaimed,
+                    "detail": detail,
+                }
+            )
+        conn.set_progress_handler(None, 0)
+        # The bookkeeping insert is tiny, so it may wait for annotator writes.
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany(
+            """
+            INSERT INTO maintenance_runs (run_at, trigger, task, status, duration_ms, bytes_reclaimed, detail)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (run_at, trigger, r["task"], r["status"], r["duration_ms"], r["bytes_reclaimed"], r["detail"])
+                for r in results
+            ],
+        )
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+    return results
+
+
+def database_stats(conn: sqlite3.Connection, db_path) -> dict:
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    return {
+        "page_size": page_size,
+        "page_count": conn.execute("PRAGMA page_count").fetchone()[0],
+        "free_bytes": conn.execute("PRAGMA freelist_count").fetchone()[0] * page_size,
+        "auto_vacuum": {0: "none", 1: "full", 2: "incremental"}.get(
+            conn.execute("PRAGMA auto_vacuum").fetchone()[0], "unknown"
+        ),
+        "db_bytes": _file_size(Path(db_path)),
+        "wal_bytes": _file_size(Path(f"{db_path}-wal")),
+    }
+
+
+def recent_runs(conn: sqlite3.Connection, limit: int = 50) -> list:
+    return [dict(row) for row in conn.execute("SELECT * FROM maintenance_runs ORDER BY id DESC LIMIT ?", (limit,))]
+
+
+def pending_requests(conn: sqlite3.Connection) -> list:
+    return [dict(row) for row in conn.execute("SELECT * FROM maintenance_requests ORDER BY requested_at")]
+
+
+def enable_incremental_vacuum(db_path) -> dict:
+    """One-off switch of an existing DB to ``auto_vacuum=INCREMENTAL``.
+
+    SQLite only applies the mode through a full ``VACUUM``, which rewrites the
+    file and blocks writers for its duration; run it while the app is idle.
+    """
+    started = time.monotonic()
+    before = _file_size(Path(db_path))
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.isolation_level = None
+    try:
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("VACUUM")
+        mode = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        conn.close()
+    return {
+        "auto_vacuum": mode,
+        "duration_ms": round((time.monotonic() - started) * 1000.0, 3),
+        "bytes_reclaimed": max(before - _file_size(Path(db_path)), 0),
+    }
+
+
+class MaintenanceScheduler:
+    """Background thread that runs maintenance on each database once it has been idle.
+
+    A database is idle when ``PRAGMA data_version`` has not moved for
+    ``idle_seconds``; it is maintained at most once per ``interval_seconds``.
+    """
+
+    def __init__(
+        self,
+        db_paths: Callable[[], list],
+        interval_seconds: float,
+        idle_seconds: float = 60.0,
+        budget_seconds: float = 5.0,
+    ):
+        self.db_paths = db_paths
+        self.interval_seconds = interval_seconds
+        self.idle_seconds = idle_seconds
+        self.budget_seconds = budget_seconds
+        self.last_error: Optional[str] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._watch = {}  # db_path -> [connection, data_version, changed_at, last_run_at]
+
+    def start(self) -> None:
+        if self.interval_seconds <= 0:
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="maintenance-scheduler", daemon=True)
+            self._thread.start()
+
+    def _idle_and_due(self, db_path: Path, now: float) -> bool:
+        state = self._watch.get(db_path)
+        if state is None:
+            state = self._watch[db_path] = [sqlite3.connect(db_path), None, now, 0.0]
+        version = state[0].execute("PRAGMA data_version").fetchone()[0]
+        if version != state[1]:
+            state[1], state[2] = version, now
+        return now - state[2] >= self.idle_seconds and now - state[3] >= self.interval_seconds
+
+    def run_once(self) -> dict:
+        ran = {}
+        now = time.monotonic()
+        for db_path in self.db_paths():
+            db_path = Path(db_path)
+            if not db_path.exists() or not self._idle_and_due(db_path, now):
+                continue
+            ran[str(db_path)] = run(db_path, budget_seconds=self.budget_seconds, trigger="scheduled")
+            self._watch[db_path][3] = time.monotonic()
+        return ran
+
+    def status(self) -> dict:
+        now = time.monotonic()
+        return {
+            "enabled": self.interval_seconds > 0,
+            "running": self._thread is not None and self._thread.is_alive(),
+            "interval_seconds": self.interval_seconds,
+            "idle_seconds": self.idle_seconds,
+            "budget_seconds": self.budget_seconds,
+            "idle_for_seconds": {
+                str(path): round(now - state[2], 1) for path, state in list(self._watch.items())
+            },
+            "last_error": self.last_error,
+        }
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(max(min(self.idle_seconds, self.interval_seconds) / 4, 1.0))
+            try:
+                self.run_once()
+                self.last_error = None
+            except Exception as exc:  # keep the scheduler alive across failures
+                self.last_error = f"{type(exc).__name__}: {exc}"
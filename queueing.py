@@ -0,0 +1,243 @@
+import sqlite3
+
+# Weights for the "completion" ordering. A draft the annotator already started
+# always comes first; otherwise questions one review short of complete win,
+# with a nudge towards categories that are furthest behind.
+DRAFT_WEIGHT = 10.0
+REMAINING_WEIGHT = 2.0
+CATEGORY_WEIGHT = 0.5
+
+# Each ordering is a SQL expression over the columns of ``_inputs_sql``:
+#   remaining     assignees of the question without a submitted review (>= 1 while pending)
+#   category_lag  share of the category's active questions not yet fully annotated (0.1 steps)
+#   draft_at      julianday of this annotator's draft, NULL without one
+# Higher priority is served first; ties fall back to the lowest question id.
+ORDERINGS = {
+    "id": "0.0",
+    "completion": f"""
+        CASE WHEN draft_at IS NOT NULL THEN {DRAFT_WEIGHT} + draft_at / 1e7 ELSE 0.0 END
+        + {REMAINING_WEIGHT} / MAX(remaining, 1)
+        + {CATEGORY_WEIGHT} * category_lag
+    """,
+}
+DEFAULT_ORDERING = "completion"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS queue_settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS queue_categories (
+    category TEXT PRIMARY KEY,
+    lag REAL NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    complete INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS queue_questions (
+    question_id INTEGER PRIMARY KEY,
+    category TEXT NOT NULL,
+    complete INTEGER NOT NULL
+);
+"""
+
+# Completion state of active questions: fully annotated once every assignee submitted.
+_QUESTION_STATE_SQL = """
+    SELECT
+      q.id AS question_id,
+      COALESCE(q.category, '') AS category,
+      CASE WHEN assigned > 0 AND submitted >= assigned THEN 1 ELSE 0 END AS complete
+    FROM (
+      SELECT
+        q.id,
+        q.category,
+        (SELECT COUNT(*) FROM assignments a WHERE a.question_id = q.id) AS assigned,
+        (
+          SELECT COUNT(*)
+          FROM assignments a
+          JOIN feedback f
+            ON f.user_id = a.user_id
+           AND f.question_id = a.question_id
+           AND f.submission_status = 'submitted'
+          WHERE a.question_id = q.id
+        ) AS submitted
+      FROM questions q
+      WHERE q.active = 1 AND {scope}
+    ) q
+"""
+
+_LAG_SQL = "ROUND(1.0 - CAST(complete AS REAL) / total, 1)"
+
+
+def _inputs_sql(scope: str) -> str:
+    # Progress is aggregated once per question rather than per assignment, so a
+    # full refresh stays linear in the number of assignments.
+    return f"""
+        WITH scoped AS (
+          SELECT a.id, a.user_id, a.question_id, COALESCE(q.category, '') AS category
+          FROM assignments a
+          JOIN questions q ON q.id = a.question_id
+          WHERE {scope}
+        ),
+        progress AS (
+          SELECT x.question_id, COUNT(*) - COUNT(y.id) AS remaining
+          FROM assignments x
+          LEFT JOIN feedback y
+            ON y.user_id = x.user_id
+           AND y.question_id = x.question_id
+           AND y.submission_status = 'submitted'
+          WHERE x.question_id IN (SELECT question_id FROM scoped)
+          GROUP BY x.question_id
+        )
+        SELECT
+          s.id AS assignment_id,
+          p.remaining,
+          COALESCE(c.lag, 1.0) AS category_lag,
+          CASE WHEN f.submission_status = 'draft' THEN julianday(f.updated_at) END AS draft_at
+        FROM scoped s
+        JOIN progress p ON p.question_id = s.question_id
+        LEFT JOIN queue_categories c ON c.category = s.category
+        LEFT JOIN feedback f ON f.user_id = s.user_id AND f.question_id = s.question_id
+    """
+
+
+def ensure_schema(conn: sqlite3.Connection) -> None:
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    if "queue_categories" in tables and "queue_questions" not in tables:
+        # Lag-only table from before the per-question counters; rebuilt below.
+        conn.execute("DROP TABLE queue_categories")
+    conn.executescript(SCHEMA)
+    if "queue_questions" not in tables:
+        _rebuild_categories(conn)
+
+
+def current_ordering(conn: sqlite3.Connection) -> str:
+    row = conn.execute("SELECT value FROM queue_settings WHERE key = 'ordering'").fetchone()
+    return row[0] if row and row[0] in ORDERINGS else DEFAULT_ORDERING
+
+
+def configure(conn: sqlite3.Connection, ordering: str) -> bool:
+    """Select the ordering; recompute every priority only if it changed."""
+    if ordering not in ORDERINGS:
+        raise ValueError(f"Unknown queue ordering {ordering!r}; expected one of {', '.join(ORDERINGS)}.")
+    row = conn.execute("SELECT value FROM queue_settings WHERE key = 'ordering'").fetchone()
+    if row and row[0] == ordering:
+        return False
+    conn.execute(
+        "INSERT INTO queue_settings (key, value) VALUES ('ordering', ?) "
+        "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+        (ordering,),
+    )
+    refresh_all(conn)
+    return True
+
+
+def _update(conn: sqlite3.Connection, scope: str, params=()) -> int:
+    expression = ORDERINGS[current_ordering(conn)]
+    return conn.execute(
+        f"""
+        UPDATE assignments SET priority = p.priority
+        FROM (SELECT assignment_id, {expression} AS priority FROM ({_inputs_sql(scope)})) p
+        WHERE assignments.id = p.assignment_id AND assignments.priority IS NOT p.priority
+        """,
+        params,
+    ).rowcount
+
+
+def _rebuild_categories(conn: sqlite3.Connection) -> None:
+    conn.execute("DELETE FROM queue_questions")
+    conn.execute("DELETE FROM queue_categories")
+    conn.execute(
+        f"INSERT INTO queue_questions (question_id, category, complete) {_QUESTION_STATE_SQL.format(scope='1')}"
+    )
+    conn.execute(
+        f"""
+        INSERT INTO queue_categories (category, lag, total, complete)
+        SELECT category, 0.0, COUNT(*), SUM(complete) FROM queue_questions GROUP BY category
+        """
+    )
+    conn.execute(f"UPDATE queue_categories SET lag = {_LAG_SQL}")
+
+
+def _refresh_categories(conn: sqlite3.Connection, question_ids: list) -> list:
+    """Apply the completion changes of ``question_ids`` to the category counters.
+
+    Only those questions are re-evaluated (a handful of indexed lookups each),
+    so the cost does not grow with the category. Returns the categories whose
+    lag bucket moved.
+    """
+    placeholders = ",".join("?" for _ in question_ids)
+    current = {
+        row[0]: (row[1], row[2])
+        for row in conn.execute(_QUESTION_STATE_SQL.format(scope=f"q.id IN ({placeholders})"), question_ids)
+    }
+    stored = {
+        row[0]: (row[1], row[2])
+        for row in conn.execute(
+            f"SELECT question_id, category, complete FROM queue_questions WHERE question_id IN ({placeholders})",
+            question_ids,
+        )
+    }
+    deltas = {}
+    for question_id in question_ids:
+        before, after = stored.get(question_id), current.get(question_id)
+        if before == after:
+            continue
+        for state, sign in ((before, -1), (after, 1)):
+            if state is not None:
+                total, complete = deltas.get(state[0], (0, 0))
+                deltas[state[0]] = (total + sign, complete + sign * state[1])
+        if after is None:
+            conn.execute("DELETE FROM queue_questions WHERE question_id = ?", (question_id,))
+        else:
+            conn.execute(
+                "INSERT INTO queue_questions (question_id, category, complete) VALUES (?, ?, ?) "
+                "ON CONFLICT(question_id) DO UPDATE SET category = excluded.category, complete = excluded.complete",
+                (question_id, *after),
+            )
+    moved = []
+    for category, (total, complete) in deltas.items():
+        if not total and not complete:
+            continue
+        row = conn.execute("SELECT lag FROM queue_categories WHERE category = ?", (category,)).fetchone()
+        conn.execute(
+            "INSERT INTO queue_categories (category, lag, total, complete) VALUES (?, 0.0, ?, ?) "
+            "ON CONFLICT(category) DO UPDATE SET total = total + excluded.total, complete = complete + excluded.complete",
+            (category, total, complete),
+        )
+        conn.execute(f"UPDATE queue_categories SET lag = {_LAG_SQL} WHERE category = ? AND total > 0", (category,))
+        conn.execute("DELETE FROM queue_categories WHERE category = ? AND total <= 0", (category,))
+        lag = conn.execute("SELECT lag FROM queue_categories WHERE category = ?", (category,)).fetchone()
+        if (row[0] if row else None) != (lag[0] if lag else None):
+            moved.append(category)
+    return moved
+
+
+def refresh_all(conn: sqlite3.Connection) -> int:
+    """Set-based recompute of every assignment; for imports and bulk changes."""
+    _rebuild_categories(conn)
+    return _update(conn, "1")
+
+
+def refresh_questions(conn: sqlite3.Connection, question_ids) -> int:
+    """Recompute after submits or assignment changes touching ``question_ids``.
+
+    Only the assignments of those questions are rewritten, plus a category's
+    assignments when its lag crosses a 0.1 step.
+    """
+    question_ids = sorted({int(qid) for qid in question_ids})
+    if not question_ids:
+        return 0
+    placeholders = ",".join("?" for _ in question_ids)
+    moved = _refresh_categories(conn, question_ids)
+    updated = _update(conn, f"a.question_id IN ({placeholders})", question_ids)
+    if moved:
+        moved_placeholders = ",".join("?" for _ in moved)
+        updated += _update(conn, f"COALESCE(q.category, '') IN ({moved_placeholders})", moved)
+    return updated
+
+
+def refresh_assignment(conn: sqlite3.Connection, user_id: int, question_id: int) -> int:
+    """Recompute one annotator's row, e.g. after a draft autosave."""
+    return _update(conn, "a.user_id = ? AND a.question_id = ?", (user_id, question_id))
@@ -0,0 +1,124 @@
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+REPLICA_SUFFIX = ".report.db"
+
+
+class ReportingReplica:
+    """Periodically refreshed, read-only copy of one database for admin reports.
+
+    Heavy report and export queries run against the copy, so they never hold a
+    WAL snapshot on the primary and never delay its checkpoints. The copy is
+    made with the backup API into a temp file and swapped in with
+    ``os.replace``; readers that already opened the old file keep a consistent
+    view until they close.
+
+    Refreshes are lazy: a reader that finds the copy older than
+    ``max_age_seconds`` gets the current copy immediately and triggers a
+    background refresh. Only a missing copy is built synchronously. A refresh
+    is a no-op (apart from the timestamp) when ``PRAGMA data_version`` shows
+    nothing was committed since the last copy.
+    """
+
+    def __init__(self, db_path, replica_dir, max_age_seconds: float = 60.0, pages: int = 1024):
+        self.db_path = Path(db_path)
+        self.replica_path = Path(replica_dir) / f"{self.db_path.stem}{REPLICA_SUFFIX}"
+        self.max_age_seconds = max_age_seconds
+        self.pages = pages
+        self.refreshed_at: Optional[float] = None
+        self.refreshes = 0
+        self.copies = 0
+        self.last_duration_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._source: Optional[sqlite3.Connection] = None
+        self._data_version = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def _copy(self) -> None:
+        if self._source is None:
+            self._source = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        data_version = self._source.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._data_version and self.replica_path.exists():
+            return
+        self.replica_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.replica_path.with_name(f".{self.replica_path.name}.tmp")
+        dst = sqlite3.connect(tmp_path)
+        try:
+            # Pausing between steps lets the writer in; the copy is one read snapshot either way.
+            self._source.backup(dst, pages=self.pages, progress=lambda *_: time.sleep(0.001))
+            dst.execute("PRAGMA journal_mode=DELETE")
+        finally:
+            dst.close()
+        os.replace(tmp_path, self.replica_path)
+        self._data_version = data_version
+        self.copies += 1
+
+    def refresh(self) -> None:
+        with self._lock:
+            started = time.monotonic()
+            # Stamp the start: the copy reflects commits up to here, maybe a little later.
+            as_of = time.time()
+            try:
+                self._copy()
+                self.refreshed_at = as_of
+                self.refreshes += 1
+                self.last_error = None
+            except Exception as exc:  # the previous copy stays usable
+                self.last_error = f"{type(exc).__name__}: {exc}"
+                raise
+            finally:
+                self.last_duration_ms = round((time.monotonic() - started) * 1000.0, 3)
+                self._refreshing = False
+
+    def _refresh_in_background(self) -> None:
+        try:
+            self.refresh()
+        except Exception:
+            pass  # recorded in last_error; readers keep the previous copy
+
+    def refresh_soon(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(
+            target=self._refresh_in_background, name=f"report-replica:{self.db_path.name}", daemon=True
+        ).start()
+
+    def age_seconds(self) -> Optional[float]:
+        if self.refreshed_at is None:
+            return None
+        return max(time.time() - self.refreshed_at, 0.0)
+
+    def ensure_fresh(self) -> None:
+        if self.refreshed_at is None or not self.replica_path.exists():
+            self.refresh()
+        elif self.age_seconds() > self.max_age_seconds:
+            self.refresh_soon()
+
+    def connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(f"file:{self.replica_path}?mode=ro", uri=True, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def status(self) -> dict:
+        age = self.age_seconds()
+        return {
+            "as_of": (
+                datetime.utcfromtimestamp(self.refreshed_at).isoformat(timespec="seconds")
+                if self.refreshed_at is not None
+                else None
+            ),
+            "age_seconds": round(age, 1) if age is not None else None,
+            "stale": age is None or age > self.max_age_seconds,
+            "refreshes": self.refreshes,
+            "copies": self.copies,
+            "last_duration_ms": self.last_duration_ms,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,152 @@
+import sqlite3
+
+import analytics
+import dedupe
+import fingerprints
+import maintenance
+import queueing
+import snapshots
+import storage
+import timings
+
+# Bump whenever SCHEMA or migrate() changes, so fingerprinted sheet imports rerun.
+SCHEMA_VERSION = 7
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    email TEXT NOT NULL UNIQUE,
+    email_norm TEXT,
+    username TEXT,
+    is_admin INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS questions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    content_key TEXT,
+    payload_hash TEXT,
+    category TEXT,
+    q_gu TEXT NOT NULL,
+    q_en TEXT,
+    search_results TEXT,
+    a_en TEXT,
+    a_gu TEXT,
+    active INTEGER NOT NULL DEFAULT 1
+);
+
+CREATE TABLE IF NOT EXISTS assignments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    question_id INTEGER NOT NULL,
+    priority REAL NOT NULL DEFAULT 0,
+    UNIQUE(user_id, question_id),
+    FOREIGN KEY(user_id) REFERENCES users(id),
+    FOREIGN KEY(question_id) REFERENCES questions(id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_assignments_question
+ON assignments(question_id);
+
+CREATE TABLE IF NOT EXISTS feedback (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    question_id INTEGER NOT NULL,
+    submission_status TEXT NOT NULL DEFAULT 'submitted',
+    q_translation_rating INTEGER,
+    q_translation_comment TEXT,
+    search_rating INTEGER,
+    search_issue_type TEXT,
+    search_comment TEXT,
+    answer_accuracy_rating INTEGER,
+    answer_translation_rating INTEGER,
+    answer_comment TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    UNIQUE(user_id, question_id),
+    FOREIGN KEY(user_id) REFERENCES users(id),
+    FOREIGN KEY(question_id) REFERENCES questions(id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_feedback_updated
+ON feedback(updated_at, id);
+
+CREATE INDEX IF NOT EXISTS idx_questions_q_gu
+ON questions(q_gu);
+
+CREATE INDEX IF NOT EXISTS idx_questions_q_en
+ON questions(q_en COLLATE NOCASE);
+
+CREATE TABLE IF NOT EXISTS suggested_questions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    question_text_gu TEXT NOT NULL,
+    question_text_en TEXT,
+    status TEXT NOT NULL DEFAULT 'new',
+    notes TEXT,
+    created_at TEXT NOT NULL,
+    FOREIGN KEY(user_id) REFERENCES users(id)
+);
+"""
+
+
+def migrate(conn: sqlite3.Connection) -> None:
+    feedback_columns = {
+        row["name"] for row in conn.execute("PRAGMA table_info(feedback)").fetchall()
+    }
+    if "submission_status" not in feedback_columns:
+        conn.execute(
+            "ALTER TABLE feedback ADD COLUMN submission_status TEXT NOT NULL DEFAULT 'submitted'"
+        )
+        conn.execute(
+            "UPDATE feedback SET submission_status='submitted' WHERE submission_status IS NULL OR submission_status=''"
+        )
+    user_columns = {row["name"] for row in conn.execute("PRAGMA table_info(users)").fetchall()}
+    if "email_norm" not in user_columns:
+        conn.execute("ALTER TABLE users ADD COLUMN email_norm TEXT")
+        conn.execute("UPDATE users SET email_norm = lower(trim(email))")
+    try:
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_users_email_norm ON users(email_norm)")
+    except sqlite3.IntegrityError as exc:
+        raise RuntimeError(
+            "Users with the same normalized email exist; merge them before upgrading."
+        ) from exc
+    question_columns = {row["name"] for row in conn.execute("PRAGMA table_info(questions)").fetchall()}
+    if "content_key" not in question_columns:
+        conn.execute("ALTER TABLE questions ADD COLUMN content_key TEXT")
+        storage.backfill_question_keys(conn)
+    if "payload_hash" not in question_columns:
+        conn.execute("ALTER TABLE questions ADD COLUMN payload_hash TEXT")
+        storage.backfill_payload_hashes(conn)
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_questions_content_key ON questions(content_key)")
+    assignment_columns = {row["name"] for row in conn.execute("PRAGMA table_info(assignments)").fetchall()}
+    queueing.ensure_schema(conn)
+    if "priority" not in assignment_columns:
+        conn.execute("ALTER TABLE assignments ADD COLUMN priority REAL NOT NULL DEFAULT 0")
+        queueing.refresh_all(conn)
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_assignments_queue ON assignments(user_id, priority DESC, question_id)"
+    )
+    conn.execute("DROP INDEX IF EXISTS idx_questions_unique")
+    conn.executescript(storage.versions_schema())
+    storage.seed_versions(conn)
+    analytics.ensure_schema(conn)
+    snapshots.ensure_schema(conn)
+    fingerprints.ensure_schema(conn)
+    dedupe.ensure_schema(conn)
+    timings.ensure_schema(conn)
+    maintenance.ensure_schema(conn)
+
+
+def ensure_schema(conn: sqlite3.Connection) -> None:
+    """Create tables and apply migrations in place; safe to run on every start.
+
+    On an up-to-date database this only reads, so it never waits for a writer.
+    """
+    # Setting auto_vacuum needs the write lock and only takes effect before the first
+    # table exists, so only a new file gets it; existing DBs switch via scripts/maintain_db.py.
+    if not conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchone():
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    migrate(conn)
+    conn.commit()
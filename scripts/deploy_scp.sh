@@ -54,10 +54,15 @@ fi
 mkdir -p "${TMP_DIR}"
 rm -f "${ARCHIVE_PATH}"
 
+PY_MODULES=()
+for module in "${ROOT_DIR}"/*.py; do
+  PY_MODULES+=("$(basename "${module}")")
+done
+
 echo "Creating deploy archive..."
 tar -czf "${ARCHIVE_PATH}" \
   -C "${ROOT_DIR}" \
-  app.py \
+  "${PY_MODULES[@]}" \
   requirements.txt \
   Dockerfile \
   docker-compose.yml \
@@ -90,9 +95,20 @@ scp "${SCP_OPTS[@]}" "${ARCHIVE_PATH}" "${REMOTE}:${REMOTE_DIR}/${ARCHIVE_NAME}"
 echo "Extracting archive on remote..."
 ssh "${SSH_OPTS[@]}" "${REMOTE}" "tar -xzf \"${REMOTE_DIR}/${ARCHIVE_NAME}\" -C \"${REMOTE_DIR}\" && rm -f \"${REMOTE_DIR}/${ARCHIVE_NAME}\""
 
+# One-time migration: the DB used to be mounted as ./app.db (a single file), which
+# left app.db-wal inside the container. Fold the WAL into app.db from the running
+# container, stop it, and move the file into ./db before the new compose file starts.
+MIGRATE_DB='mkdir -p db
+if [ -f app.db ] && [ ! -e db/app.db ]; then
+  echo "Moving app.db into db/ (checkpointing the WAL first)..."
+  docker compose exec -T feedback-ui python3 -c "import sqlite3; print(sqlite3.connect(\"/app/app.db\").execute(\"PRAGMA wal_checkpoint(TRUNCATE)\").fetchone())"
+  docker compose stop feedback-ui
+  mv app.db db/app.db
+fi'
+
 if [[ "${RUN_REMOTE}" = "1" ]]; then
   echo "Running docker compose on remote..."
-  ssh "${SSH_OPTS[@]}" "${REMOTE}" "cd \"${REMOTE_DIR}\" && docker compose up -d --build"
+  ssh "${SSH_OPTS[@]}" "${REMOTE}" "cd \"${REMOTE_DIR}\" && set -e && ${MIGRATE_DB} && docker compose up -d --build"
 fi
 
 echo "Done."
@@ -6,7 +6,8 @@ if [ "${INIT_FROM_SHEETS:-0}" = "1" ]; then
     --db "${DB_PATH:-app.db}" \
     --golden-sheet "${GOLDEN_SHEET_PATH:-data/Sheets/500_goldenset_final_sheet.csv}" \
     --eval-sheet "${EVAL_SHEET_PATH:-data/Sheets/Amul Eval Sheet.csv}" \
-    ${SYNC_ACTIVE:+--sync-active}
+    ${SYNC_ACTIVE:+--sync-active} \
+    ${FORCE_INIT:+--force}
 fi
 
 exec python3 app.py
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+import datasets
+import feedback
+import queueing
+import schema
+import storage
+
+CATALOG_PATH = Path(os.environ.get("CATALOG_PATH") or ROOT_DIR / "catalog.db")
+DATASETS_DIR = Path(os.environ.get("DATASETS_DIR") or ROOT_DIR / "datasets")
+
+
+def open_input(path: str):
+    if path == "-":
+        return open(sys.stdin.fileno(), "r", encoding="utf-8-sig", newline="", closefd=False)
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8-sig", newline="")
+    return open(path, "r", encoding="utf-8-sig", newline="")
+
+
+def infer_format(path: str) -> str:
+    name = path[:-3] if path.endswith(".gz") else path
+    return "csv" if name.lower().endswith(".csv") else "jsonl"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Bulk-load feedback rows (JSON Lines or CSV, e.g. a feedback export) into the DB."
+    )
+    parser.add_argument("input", help="Path to .jsonl/.csv (optionally .gz), or - for stdin")
+    parser.add_argument("--db", default="app.db", help="Path to sqlite DB")
+    parser.add_argument(
+        "--dataset",
+        default=datasets.DEFAULT_DATASET,
+        help="Dataset slug to load into (must exist in the catalog; default uses --db)",
+    )
+    parser.add_argument("--format", choices=("jsonl", "csv"), help="Input format (default: from extension)")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=feedback.INGEST_BATCH_SIZE,
+        help="Rows written per transaction",
+    )
+    parser.add_argument("--create-users", action="store_true", help="Create users for unknown emails")
+    parser.add_argument("--assign", action="store_true", help="Assign questions that are not yet assigned")
+    parser.add_argument("--dry-run", action="store_true", help="Validate and resolve rows without writing")
+    parser.add_argument("--errors", help="Write the per-row error report (JSON Lines) to this path")
+    args = parser.parse_args()
+
+    db_path = (ROOT_DIR / args.db).resolve() if not Path(args.db).is_absolute() else Path(args.db)
+    dataset = datasets.normalize_slug(args.dataset) or datasets.DEFAULT_DATASET
+    if dataset != datasets.DEFAULT_DATASET:
+        catalog = datasets.DatasetCatalog(CATALOG_PATH, db_path, DATASETS_DIR)
+        db_path = catalog.resolve(dataset)
+        if db_path is None:
+            print(f"Unknown dataset: {dataset}")
+            sys.exit(1)
+    fmt = args.format or infer_format(args.input)
+
+    started = time.perf_counter()
+    conn = storage.connect(db_path)
+    schema.ensure_schema(conn)
+    conn.isolation_level = None
+
+    ingest = feedback.FeedbackIngest(create_users=args.create_users, assign=args.assign, dry_run=args.dry_run)
+    batches = 0
+    with open_input(args.input) as f:
+        records = feedback.iter_csv(f) if fmt == "csv" else feedback.iter_jsonl(f)
+        for batch in ingest.batches(records, max(args.batch_size, 1)):
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                ingest.write_batch(conn, batch)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            batches += 1
+    if ingest.counts["saved"] and not args.dry_run:
+        conn.execute("BEGIN IMMEDIATE")
+        queueing.refresh_all(conn)
+        conn.execute("COMMIT")
+    conn.close()
+    elapsed = time.perf_counter() - started
+
+    if args.errors:
+        with open(args.errors, "w", encoding="utf-8") as out:
+            for error in ingest.errors:
+                out.write(json.dumps(error, ensure_ascii=False) + "\n")
+    else:
+        for error in ingest.errors[:20]:
+            print(f"line {error['line']}: {error['error']}", file=sys.stderr)
+
+    counts = ingest.counts
+    print(f"dataset={dataset} db={db_path} format={fmt} dry_run={int(args.dry_run)}")
+    print(
+        f"rows={counts['rows']} saved={counts['saved']} unchanged={counts['unchanged']} "
+        f"rejected={counts['rejected']} batches={batches}"
+    )
+    print(f"elapsed_ms={elapsed * 1000:.1f} rows_per_second={counts['rows'] / elapsed if elapsed else 0:.0f}")
+    if counts["rejected"]:
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
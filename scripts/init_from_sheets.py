@@ -1,55 +1,84 @@
 #!/usr/bin/env python3
 import argparse
 import csv
+import os
 import sqlite3
 import sys
+import time
+from contextlib import contextmanager
+from itertools import islice
 from pathlib import Path
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 if str(ROOT_DIR) not in sys.path:
     sys.path.insert(0, str(ROOT_DIR))
 
-from app import app
+import datasets
+import dedupe
+import fingerprints
+import schema
+import storage
 from scripts.sync_eval_sheet import (
-    apply_sync,
+    FUZZY_AUTO_THRESHOLD,
+    build_fuzzy_index,
     build_question_index,
+    fuzzy_map_entries,
+    iter_sheet_entries,
     map_entries_to_questions,
-    parse_sheet,
+    print_fuzzy_collisions,
+    sync_assignments,
 )
 
+CATALOG_PATH = Path(os.environ.get("CATALOG_PATH") or ROOT_DIR / "catalog.db")
+DATASETS_DIR = Path(os.environ.get("DATASETS_DIR") or ROOT_DIR / "datasets")
+UPSERT_CHUNK_SIZE = 500
 
-def upsert_questions(conn: sqlite3.Connection, golden_csv_path: Path):
-    seen_ids = set()
+
+def iter_golden_rows(golden_csv_path: Path):
     with golden_csv_path.open("r", encoding="utf-8-sig", newline="") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            category = (row.get("Category") or "").strip()
+        for row in csv.DictReader(f):
             q_gu = (row.get("Q (Gu)") or "").strip()
-            q_en = (row.get("Q (En)") or "").strip()
-            search_results = row.get("Search Results") or ""
-            a_en = row.get("A(En)") or ""
-            a_gu = row.get("A (Gu)") or ""
             if not q_gu:
                 continue
-            conn.execute(
-                """
-                INSERT INTO questions (category, q_gu, q_en, search_results, a_en, a_gu, active)
-                VALUES (?, ?, ?, ?, ?, ?, 1)
-                ON CONFLICT(category, q_gu, q_en) DO UPDATE SET
-                  search_results=excluded.search_results,
-                  a_en=excluded.a_en,
-                  a_gu=excluded.a_gu,
-                  active=1
-                """,
-                (category, q_gu, q_en, search_results, a_en, a_gu),
+            yield (
+                (row.get("Category") or "").strip(),
+                q_gu,
+                (row.get("Q (En)") or "").strip(),
+                row.get("Search Results") or "",
+                row.get("A(En)") or "",
+                row.get("A (Gu)") or "",
             )
-            found = conn.execute(
-                "SELECT id FROM questions WHERE category=? AND q_gu=? AND q_en=?",
-                (category, q_gu, q_en),
-            ).fetchone()
-            if found:
-                seen_ids.add(found["id"])
-    return seen_ids
+
+
+def chunked(iterable, size: int):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def upsert_questions(
+    conn: sqlite3.Connection, golden_csv_path: Path, chunk_size: int = UPSERT_CHUNK_SIZE
+) -> storage.QuestionSync:
+    """Upsert golden rows in chunks; ids seen are kept in ``temp.seen_questions``."""
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS seen_questions (id INTEGER PRIMARY KEY)")
+    conn.execute("DELETE FROM temp.seen_questions")
+    question_sync = storage.QuestionSync(conn)
+    for chunk in chunked(iter_golden_rows(golden_csv_path), chunk_size):
+        ids = question_sync.upsert_many(chunk)
+        conn.executemany("INSERT OR IGNORE INTO temp.seen_questions (id) VALUES (?)", [(qid,) for qid in ids])
+    return question_sync
+
+
+@contextmanager
+def phase(timings: dict, name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = round((time.perf_counter() - started) * 1000.0, 1)
 
 
 def main():
@@ -67,14 +96,41 @@ def main():
         default="data/Sheets/Amul Eval Sheet.csv",
         help="Path to eval sheet CSV containing Members mappings",
     )
+    parser.add_argument(
+        "--dataset",
+        default=datasets.DEFAULT_DATASET,
+        help="Dataset slug to load into (created in the catalog if missing; default uses --db)",
+    )
     parser.add_argument(
         "--sync-active",
         action="store_true",
         help="Deactivate questions not present in golden sheet",
     )
+    parser.add_argument(
+        "--fuzzy-threshold",
+        type=float,
+        default=FUZZY_AUTO_THRESHOLD,
+        help="Minimum n-gram similarity to auto-map an unmapped eval row (0-1)",
+    )
+    parser.add_argument("--no-fuzzy", action="store_true", help="Skip fuzzy matching of unmapped rows")
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=UPSERT_CHUNK_SIZE,
+        help="Golden rows upserted per batch",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Reload even if both sheets match the last successful import",
+    )
     args = parser.parse_args()
 
     db_path = (ROOT_DIR / args.db).resolve() if not Path(args.db).is_absolute() else Path(args.db)
+    dataset = datasets.normalize_slug(args.dataset) or datasets.DEFAULT_DATASET
+    if dataset != datasets.DEFAULT_DATASET:
+        catalog = datasets.DatasetCatalog(CATALOG_PATH, db_path, DATASETS_DIR)
+        db_path = catalog.resolve(dataset) or catalog.create(dataset)
     golden_path = (
         (ROOT_DIR / args.golden_sheet).resolve()
         if not Path(args.golden_sheet).is_absolute()
@@ -86,53 +142,105 @@ def main():
         else Path(args.eval_sheet)
     )
 
-    # Trigger app DB init/migrations once.
-    with app.test_client() as client:
-        client.get("/annotator/login")
+    timings = {}
+    started = time.perf_counter()
+    conn = storage.connect(db_path)
+    with phase(timings, "migrate"):
+        schema.ensure_schema(conn)
+
+    sources = {"golden": golden_path, "eval": eval_path}
+    options = {
+        "sync_active": bool(args.sync_active),
+        "fuzzy_threshold": None if args.no_fuzzy else args.fuzzy_threshold,
+    }
+    with phase(timings, "fingerprint_check"):
+        unchanged, sheet_fingerprints = fingerprints.check(conn, sources, schema.SCHEMA_VERSION, options)
+    if unchanged and not args.force:
+        # Store new mtimes of touched-but-identical files so they are not re-hashed next time.
+        with conn:
+            fingerprints.refresh_stats(conn, sheet_fingerprints)
+        conn.close()
+        print(f"dataset={dataset} db={db_path}")
+        print("skipped=1 (sheets unchanged since last import; use --force to reload)")
+        print(f"fingerprint_check_ms={timings['fingerprint_check']}")
+        return
 
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    conn.execute("BEGIN")
+    # Golden load, sheet mapping and assignment rebuild commit together, so the
+    # app never sees questions without their assignments.
+    conn.isolation_level = None
+    conn.execute("BEGIN IMMEDIATE")
     try:
-        seen_question_ids = upsert_questions(conn, golden_path)
-        if args.sync_active:
-            if seen_question_ids:
-                placeholders = ",".join("?" for _ in seen_question_ids)
-                conn.execute(
-                    f"UPDATE questions SET active=0 WHERE id NOT IN ({placeholders})",
-                    tuple(seen_question_ids),
+        with phase(timings, "golden_upsert"):
+            question_sync = upsert_questions(conn, golden_path, chunk_size=max(args.chunk_size, 1))
+            upserted = conn.execute("SELECT COUNT(*) FROM temp.seen_questions").fetchone()[0]
+            deactivated = 0
+            if args.sync_active:
+                deactivated = conn.execute(
+                    "UPDATE questions SET active=0 WHERE active=1 AND id NOT IN (SELECT id FROM temp.seen_questions)"
+                ).rowcount
+
+        with phase(timings, "dedupe_index"):
+            reindexed = dedupe.sync_questions(conn)
+
+        sheet = {"rows": 0, "emails": set()}
+
+        def tracked_entries():
+            for item in iter_sheet_entries(eval_path):
+                sheet["rows"] += 1
+                sheet["emails"].update(item["members"])
+                yield item
+
+        with phase(timings, "eval_mapping"):
+            by_exact, by_q_gu, by_q_gu_norm = build_question_index(conn)
+            mapped_pairs, unmapped_entries, ambiguous_entries = map_entries_to_questions(
+                tracked_entries(), by_exact, by_q_gu, by_q_gu_norm
+            )
+            fuzzy_pairs, collisions = [], []
+            if unmapped_entries and not args.no_fuzzy:
+                fuzzy_pairs, review, collisions = fuzzy_map_entries(
+                    unmapped_entries,
+                    build_fuzzy_index(conn),
+                    threshold=args.fuzzy_threshold,
+                    taken={qid for qid, _members, _comments in mapped_pairs},
                 )
-            else:
-                conn.execute("UPDATE questions SET active=0")
-        conn.commit()
+                unmapped_entries = [item for item, _matches in review]
+                mapped_pairs += [pair for pair, _item, _best in fuzzy_pairs]
+
+        with phase(timings, "assignments"):
+            sync_assignments(conn, mapped_pairs, sorted(sheet["emails"]))
+            fingerprints.record(conn, sheet_fingerprints, schema.SCHEMA_VERSION, options)
+
+        with phase(timings, "commit"):
+            conn.execute("COMMIT")
     except Exception:
-        conn.rollback()
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
         raise
 
-    entries, unique_emails = parse_sheet(eval_path)
-    by_exact, by_q_gu, by_q_gu_norm = build_question_index(conn)
-    mapped_pairs, unmapped_entries, ambiguous_entries = map_entries_to_questions(
-        entries, by_exact, by_q_gu, by_q_gu_norm
+    print(f"dataset={dataset} db={db_path}")
+    print(f"golden_unique_questions_upserted={upserted}")
+    print(
+        "golden_rows inserted={inserted} changed={changed} unchanged={unchanged}".format(**question_sync.counts)
+        + f" deactivated={deactivated}"
     )
-
-    print(f"golden_unique_questions_upserted={len(seen_question_ids)}")
-    print(f"eval_sheet_rows={len(entries)}")
-    print(f"unique_sheet_emails={len(unique_emails)}")
+    print(f"dedupe_reindexed_questions={reindexed}")
+    print(f"eval_sheet_rows={sheet['rows']}")
+    print(f"unique_sheet_emails={len(sheet['emails'])}")
     print(f"mapped_rows={len(mapped_pairs)}")
+    print(f"fuzzy_mapped_rows={len(fuzzy_pairs)}")
+    print(f"fuzzy_collision_rows={len(collisions)}")
     print(f"unmapped_rows={len(unmapped_entries)}")
     print(f"ambiguous_rows={len(ambiguous_entries)}")
-
-    apply_sync(
-        conn=conn,
-        mapped_pairs=mapped_pairs,
-        allowed_emails=[e.lower() for e in unique_emails],
-    )
+    if collisions:
+        print_fuzzy_collisions(collisions)
 
     users_count = conn.execute("SELECT COUNT(*) AS c FROM users").fetchone()["c"]
     assignments_count = conn.execute("SELECT COUNT(*) AS c FROM assignments").fetchone()["c"]
     active_questions = conn.execute("SELECT COUNT(*) AS c FROM questions WHERE active=1").fetchone()["c"]
     conn.close()
     print(f"applied=1 users={users_count} assignments={assignments_count} active_questions={active_questions}")
+    timings["total"] = round((time.perf_counter() - started) * 1000.0, 1)
+    print("timings_ms " + " ".join(f"{name}={ms}" for name, ms in timings.items()))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+import datasets
+import maintenance
+import schema
+import storage
+
+CATALOG_PATH = Path(os.environ.get("CATALOG_PATH") or ROOT_DIR / "catalog.db")
+DATASETS_DIR = Path(os.environ.get("DATASETS_DIR") or ROOT_DIR / "datasets")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run SQLite maintenance (optimize, analyze, incremental vacuum, WAL checkpoint)."
+    )
+    parser.add_argument("--db", default="app.db", help="Path to sqlite DB")
+    parser.add_argument(
+        "--dataset",
+        default=datasets.DEFAULT_DATASET,
+        help="Dataset slug to maintain (must exist in the catalog; default uses --db)",
+    )
+    parser.add_argument(
+        "--tasks",
+        default="",
+        help=f"Comma-separated subset of {','.join(maintenance.TASKS)} (default: whatever is due)",
+    )
+    parser.add_argument("--budget", type=float, default=30.0, help="Time budget in seconds")
+    parser.add_argument(
+        "--enable-incremental-vacuum",
+        action="store_true",
+        help="Switch an existing DB to auto_vacuum=INCREMENTAL with one full VACUUM (blocks writers)",
+    )
+    args = parser.parse_args()
+
+    db_path = (ROOT_DIR / args.db).resolve() if not Path(args.db).is_absolute() else Path(args.db)
+    dataset = datasets.normalize_slug(args.dataset) or datasets.DEFAULT_DATASET
+    if dataset != datasets.DEFAULT_DATASET:
+        catalog = datasets.DatasetCatalog(CATALOG_PATH, db_path, DATASETS_DIR)
+        db_path = catalog.resolve(dataset)
+        if db_path is None:
+            print(f"Unknown dataset: {dataset}")
+            sys.exit(1)
+    tasks = [task.strip() for task in args.tasks.split(",") if task.strip()]
+    unknown = [task for task in tasks if task not in maintenance.TASKS]
+    if unknown:
+        print(f"Unknown task(s): {', '.join(unknown)}")
+        sys.exit(1)
+
+    conn = storage.connect(db_path)
+    schema.ensure_schema(conn)
+    conn.close()
+
+    print(f"dataset={dataset} db={db_path}")
+    if args.enable_incremental_vacuum:
+        result = maintenance.enable_incremental_vacuum(db_path)
+        print(
+            f"auto_vacuum={result['auto_vacuum']} vacuum_ms={result['duration_ms']} "
+            f"bytes_reclaimed={result['bytes_reclaimed']}"
+        )
+    for result in maintenance.run(db_path, tasks=tasks or None, budget_seconds=args.budget, trigger="cli"):
+        print(
+            f"task={result['task']} status={result['status']} duration_ms={result['duration_ms']} "
+            f"bytes_reclaimed={result['bytes_reclaimed']}" + (f" detail={result['detail']!r}" if result["detail"] else "")
+        )
+
+
+if __name__ == "__main__":
+    main()
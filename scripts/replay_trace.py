@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+import argparse
+import gzip
+import http.cookiejar
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+import datasets
+import storage
+import tracing
+
+CATALOG_PATH = Path(os.environ.get("CATALOG_PATH") or ROOT_DIR / "catalog.db")
+DATASETS_DIR = Path(os.environ.get("DATASETS_DIR") or ROOT_DIR / "datasets")
+
+
+def load_trace(paths: list, dataset: str, limit: int) -> list:
+    events = []
+    for path in paths:
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    event = json.loads(line)
+                    if event.get("dataset", datasets.DEFAULT_DATASET) == dataset:
+                        events.append(event)
+    events.sort(key=lambda event: event["ts"])
+    return events[:limit] if limit else events
+
+
+def copy_database(source: Path, target: Path) -> None:
+    src = sqlite3.connect(f"file:{source}?mode=ro", uri=True)
+    dst = sqlite3.connect(target)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+
+
+def resolve_identities(db_path: Path, secret: str, dataset: str):
+    """Map trace pseudonyms back to emails in the replay DB (needs the recording secret)."""
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        rows = conn.execute("SELECT id, email FROM users").fetchall()
+    finally:
+        conn.close()
+    users = {tracing.user_pseudonym(secret, dataset, user_id): email for user_id, email in rows}
+    emails = {tracing.email_pseudonym(secret, email): email for _user_id, email in rows}
+    return users, emails
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HttpSession:
+    """One cookie jar against a running server; redirects are not followed."""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip("/")
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), _NoRedirect()
+        )
+
+    def send(self, method: str, path: str, args: dict, form: dict, body, headers: dict) -> int:
+        url = self.base_url + path
+        if args:
+            url += "?" + urllib.parse.urlencode(args, doseq=True)
+        if form:
+            body = urllib.parse.urlencode(form, doseq=True).encode()
+            headers = {**headers, "Content-Type": "application/x-www-form-urlencoded"}
+        req = urllib.request.Request(url, data=body, method=method, headers=headers)
+        try:
+            with self.opener.open(req, timeout=300) as resp:
+                resp.read()
+                return resp.status
+        except urllib.error.HTTPError as exc:
+            exc.read()
+            return exc.code
+
+
+class TestClientSession:
+    """Same interface on the in-process Flask test client."""
+
+    def __init__(self, flask_app):
+        self.client = flask_app.test_client()
+
+    def send(self, method: str, path: str, args: dict, form: dict, body, headers: dict) -> int:
+        resp = self.client.open(path, method=method, query_string=args, data=form or body, headers=headers)
+        resp.get_data()
+        resp.close()
+        return resp.status_code
+
+
+def build_request(event: dict, emails: dict):
+    """``(args, form, body, headers)`` for one event, or a skip reason string."""
+    if event.get("files"):
+        return "file upload"
+    if event.get("body_bytes") and "json" not in event:
+        return "body not recorded"
+    args = {k: v for k, v in tracing.synthesize(event.get("args") or {}, emails).items() if k != "dataset"}
+    form = {k: v for k, v in tracing.synthesize(event.get("form") or {}, emails).items() if k != "dataset"}
+    body, headers = None, {}
+    if "json" in event:
+        body = json.dumps(tracing.synthesize(event["json"], emails)).encode()
+        headers["Content-Type"] = "application/json"
+        if event.get("encoding") == "gzip":
+            body = gzip.compress(body)
+            headers["Content-Encoding"] = "gzip"
+    return args, form, body, headers
+
+
+class Replayer:
+    def __init__(self, make_session, users: dict, emails: dict, admin_email: str, admin_password: str):
+        self.make_session = make_session
+        self.users = users
+        self.emails = emails
+        self.admin_email = admin_email
+        self.admin_password = admin_password
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self.results = []  # (key, ms, lag_ms, status, recorded_status, recorded_ms)
+        self.skipped = {}
+
+    def skip(self, reason: str) -> None:
+        with self._lock:
+            self.skipped[reason] = self.skipped.get(reason, 0) + 1
+
+    def session_for(self, event: dict):
+        """Logged-in session (and its lock) per recorded identity, created on first use."""
+        key = (event.get("user"), bool(event.get("admin")))
+        with self._lock:
+            entry = self._sessions.get(key)
+            if entry is None:
+                entry = self._sessions[key] = [None, threading.Lock()]
+        with entry[1]:
+            if entry[0] is None:
+                session = self.make_session()
+                user, admin = key
+                if user:
+                    session.send("POST", "/annotator/login", {}, {"email": self.users[user]}, None, {})
+                if admin:
+                    session.send(
+                        "POST",
+                        "/admin/login",
+                        {},
+                        {"email": self.admin_email, "password": self.admin_password},
+                        None,
+                        {},
+                    )
+                entry[0] = session
+        return entry
+
+    def run(self, event: dict, scheduled_at: float) -> None:
+        if event.get("endpoint") in tracing.REPLAY_SKIP_ENDPOINTS:
+            self.skip(f"skipped endpoint {event.get('endpoint')}")
+            return
+        if event.get("user") and event["user"] not in self.users:
+            self.skip("unknown user")
+            return
+        prepared = build_request(event, self.emails)
+        if isinstance(prepared, str):
+            self.skip(prepared)
+            return
+        args, form, body, headers = prepared
+        session, lock = self.session_for(event)
+        with lock:
+            started = time.perf_counter()
+            try:
+                status = session.send(event["method"], event["path"], args, form, body, headers)
+            except Exception as exc:  # report transport failures instead of aborting the replay
+                status = f"{type(exc).__name__}"
+            elapsed_ms = (time.perf_counter() - started) * 1000.0
+        with self._lock:
+            self.results.append(
+                (
+                    f"{event['method']} {event.get('endpoint') or event['path']}",
+                    elapsed_ms,
+                    (started - scheduled_at) * 1000.0,
+                    status,
+                    event.get("status"),
+                    event.get("ms"),
+                )
+            )
+
+
+def summarize(results: list, wall_seconds: float) -> dict:
+    def latency(values: list) -> dict:
+        return {
+            "p50": storage.percentile(values, 50),
+            "p90": storage.percentile(values, 90),
+            "p99": storage.percentile(values, 99),
+            "max": max(values) if values else None,
+        }
+
+    by_route = {}
+    for key, ms, _lag, status, recorded_status, recorded_ms in results:
+        by_route.setdefault(key, []).append((ms, status, recorded_status, recorded_ms))
+    routes = []
+    for key, rows in sorted(by_route.items(), key=lambda item: -len(item[1])):
+        recorded = [row[3] for row in rows if row[3] is not None]
+        routes.append(
+            {
+                "route": key,
+                "n": len(rows),
+                "errors": sum(1 for row in rows if not isinstance(row[1], int) or row[1] >= 500),
+                "status_mismatches": sum(1 for row in rows if row[1] != row[2]),
+                "latency_ms": latency([row[0] for row in rows]),
+                "recorded_p50_ms": storage.percentile(recorded, 50),
+            }
+        )
+    return {
+        "requests": len(results),
+        "wall_seconds": round(wall_seconds, 3),
+        "requests_per_second": round(len(results) / wall_seconds, 1) if wall_seconds > 0 else None,
+        "latency_ms": latency([row[1] for row in results]),
+        "schedule_lag_ms": latency([row[2] for row in results]),
+        "routes": routes,
+    }
+
+
+def fmt(value) -> str:
+    return "-" if value is None else f"{value:.1f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replay a recorded request trace (TRACE_FILE) against a copy of the DB and report latencies."
+    )
+    parser.add_argument("trace", nargs="+", help="Trace file(s) (.jsonl, optionally .gz); merged by timestamp")
+    parser.add_argument("--db", default="app.db", help="Path to sqlite DB (copied; the original is never written)")
+    parser.add_argument(
+        "--dataset",
+        default=datasets.DEFAULT_DATASET,
+        help="Dataset slug whose traffic to replay (must exist in the catalog; default uses --db)",
+    )
+    parser.add_argument("--work-db", help="Where to put the DB copy (default: a temporary directory)")
+    parser.add_argument(
+        "--url",
+        help="Replay against a running server (e.g. http://127.0.0.1:5001) instead of the in-process test client; "
+        "point that server at a copy of the DB",
+    )
+    parser.add_argument("--speed", type=float, default=1.0, help="Time scale: 2 = twice as fast, 0 = no pauses")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight at most")
+    parser.add_argument("--limit", type=int, default=0, help="Replay only the first N requests")
+    parser.add_argument(
+        "--secret",
+        default=os.environ.get("TRACE_SECRET") or os.environ.get("SECRET_KEY") or "dev-secret-change-me",
+        help="TRACE_SECRET used when recording, to map user pseudonyms to users in the DB",
+    )
+    parser.add_argument("--admin-email", default=os.environ.get("ADMIN_EMAIL", "admin@local"))
+    parser.add_argument("--admin-password", default=os.environ.get("ADMIN_PASSWORD", "admin123"))
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    db_path = (ROOT_DIR / args.db).resolve() if not Path(args.db).is_absolute() else Path(args.db)
+    dataset = datasets.normalize_slug(args.dataset) or datasets.DEFAULT_DATASET
+    if dataset != datasets.DEFAULT_DATASET:
+        catalog = datasets.DatasetCatalog(CATALOG_PATH, db_path, DATASETS_DIR)
+        db_path = catalog.resolve(dataset)
+        if db_path is None:
+            print(f"Unknown dataset: {dataset}")
+            sys.exit(1)
+    events = load_trace(args.trace, dataset, args.limit)
+    if not events:
+        print(f"No requests for dataset {dataset} in the trace.")
+        sys.exit(1)
+
+    scratch = Path(tempfile.mkdtemp(prefix="replay-"))
+    try:
+        if args.url:
+            make_session = lambda: HttpSession(args.url)  # noqa: E731
+        else:
+            work_db = Path(args.work_db) if args.work_db else scratch / "replay.db"
+            copy_database(db_path, work_db)
+            db_path = work_db
+            # The replayed app must not touch the real catalog, record itself or run background jobs.
+            os.environ.update(
+                {
+                    "DB_PATH": str(work_db),
+                    "CATALOG_PATH": str(scratch / "catalog.db"),
+                    "DATASETS_DIR": str(scratch / "datasets"),
+                    "TRACE_FILE": "",
+                    "MAINTENANCE_INTERVAL_MINUTES": "0",
+                    "SNAPSHOT_INTERVAL_MINUTES": "0",
+                    "ADMIN_EMAIL": args.admin_email,
+                    "ADMIN_PASSWORD": args.admin_password,
+                }
+            )
+            from app import app as flask_app
+
+            make_session = lambda: TestClientSession(flask_app)  # noqa: E731
+
+        users, emails = resolve_identities(db_path, args.secret, dataset)
+        replayer = Replayer(make_session, users, emails, args.admin_email, args.admin_password)
+        first_ts = events[0]["ts"]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(args.concurrency, 1)) as pool:
+            for event in events:
+                scheduled_at = started
+                if args.speed > 0:
+                    scheduled_at = started + (event["ts"] - first_ts) / args.speed
+                    delay = scheduled_at - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                pool.submit(replayer.run, event, scheduled_at)
+        report = summarize(replayer.results, time.perf_counter() - started)
+        report["skipped"] = replayer.skipped
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(
+        f"dataset={dataset} requests={report['requests']} wall_seconds={report['wall_seconds']} "
+        f"rps={report['requests_per_second']} speed={args.speed} concurrency={args.concurrency}"
+    )
+    overall, lag = report["latency_ms"], report["schedule_lag_ms"]
+    print(
+        f"latency_ms p50={fmt(overall['p50'])} p90={fmt(overall['p90'])} p99={fmt(overall['p99'])} "
+        f"max={fmt(overall['max'])}  schedule_lag_ms p50={fmt(lag['p50'])} p99={fmt(lag['p99'])}"
+    )
+    for reason, count in sorted(report["skipped"].items()):
+        print(f"skipped {count}: {reason}")
+    print(f"{'route':<40} {'n':>6} {'err':>4} {'diff':>4} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8} {'rec p50':>8}")
+    for row in report["routes"]:
+        lat = row["latency_ms"]
+        print(
+            f"{row['route']:<40} {row['n']:>6} {row['errors']:>4} {row['status_mismatches']:>4} "
+            f"{fmt(lat['p50']):>8} {fmt(lat['p90']):>8} {fmt(lat['p99']):>8} {fmt(lat['max']):>8} "
+            f"{fmt(row['recorded_p50_ms']):>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
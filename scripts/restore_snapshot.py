@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+import argparse
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+import snapshots
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Restore the SQLite DB from a snapshot (.db or .db.gz).")
+    parser.add_argument("snapshot", help="Path to snapshot file")
+    parser.add_argument("--db", default="app.db", help="Path to sqlite DB to overwrite")
+    parser.add_argument(
+        "--snapshot-dir",
+        default="snapshots",
+        help="Where to write a safety snapshot of the current DB before restoring",
+    )
+    parser.add_argument("--no-safety-snapshot", action="store_true", help="Skip the pre-restore snapshot")
+    parser.add_argument("--yes", action="store_true", help="Do not ask for confirmation")
+    args = parser.parse_args()
+
+    snapshot_path = Path(args.snapshot)
+    db_path = (ROOT_DIR / args.db).resolve() if not Path(args.db).is_absolute() else Path(args.db)
+    snapshot_dir = (
+        (ROOT_DIR / args.snapshot_dir).resolve()
+        if not Path(args.snapshot_dir).is_absolute()
+        else Path(args.snapshot_dir)
+    )
+    if not snapshot_path.exists():
+        print(f"Snapshot not found: {snapshot_path}")
+        sys.exit(1)
+
+    if not args.yes:
+        answer = input(f"Overwrite {db_path} with {snapshot_path}? [y/N] ").strip().lower()
+        if answer not in {"y", "yes"}:
+            print("restored=0 (aborted)")
+            return
+
+    if db_path.exists() and not args.no_safety_snapshot:
+        safety = snapshots.create_snapshot(db_path, snapshot_dir)
+        print(f"safety_snapshot={safety['path']}")
+
+    result = snapshots.restore_snapshot(snapshot_path, db_path)
+    print(f"restored=1 db={db_path} duration_ms={result['duration_ms']} db_bytes={result['db_bytes']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,28 @@
 #!/usr/bin/env python3
 import argparse
 import csv
+import os
 import re
 import sqlite3
+import sys
 from datetime import datetime
 from pathlib import Path
 
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+import datasets
+import maintenance
+import queueing
+import schema
+from similarity import NgramIndex
+
+CATALOG_PATH = Path(os.environ.get("CATALOG_PATH") or ROOT_DIR / "catalog.db")
+DATASETS_DIR = Path(os.environ.get("DATASETS_DIR") or ROOT_DIR / "datasets")
+FUZZY_AUTO_THRESHOLD = 0.85
+FUZZY_MIN_MARGIN = 0.05
+
 
 def norm_text(value: str) -> str:
     return re.sub(r"\s+", " ", (value or "").strip())
@@ -16,17 +33,27 @@ def norm_header(value: str) -> str:
 
 
 def parse_sheet(sheet_path: Path):
-    rows = list(csv.reader(sheet_path.open("r", encoding="utf-8-sig", newline="")))
-    header_index = None
-    for i, row in enumerate(rows):
-        lowered = [norm_header(cell) for cell in row]
-        if "members" in lowered and "q (gu)" in lowered:
-            header_index = i
-            break
-    if header_index is None:
-        raise RuntimeError("Could not find header row containing Members and Q (Gu).")
-
-    header = rows[header_index]
+    entries = list(iter_sheet_entries(sheet_path))
+    unique_emails = {email for item in entries for email in item["members"]}
+    return entries, sorted(unique_emails)
+
+
+def iter_sheet_entries(sheet_path: Path):
+    """Yield eval-sheet rows one at a time; the file is never held in memory."""
+    with sheet_path.open("r", encoding="utf-8-sig", newline="") as f:
+        rows = csv.reader(f)
+        header = None
+        for row in rows:
+            lowered = [norm_header(cell) for cell in row]
+            if "members" in lowered and "q (gu)" in lowered:
+                header = row
+                break
+        if header is None:
+            raise RuntimeError("Could not find header row containing Members and Q (Gu).")
+        yield from _sheet_entries(header, rows)
+
+
+def _sheet_entries(header, rows):
     index_map = {norm_header(name): idx for idx, name in enumerate(header)}
     members_idx = index_map["members"]
     q_gu_idx = index_map["q (gu)"]
@@ -44,9 +71,7 @@ def parse_sheet(sheet_path: Path):
     if fb_a_idx is None:
         fb_a_idx = index_map.get("feedback a")
 
-    entries = []
-    unique_emails = set()
-    for row in rows[header_index + 1 :]:
+    for row in rows:
         if not row:
             continue
         q_gu = row[q_gu_idx].strip() if q_gu_idx < len(row) else ""
@@ -63,19 +88,15 @@ def parse_sheet(sheet_path: Path):
             email = part.strip().lower().lstrip("@")
             if email and "@" in email:
                 members.append(email)
-                unique_emails.add(email)
-        entries.append(
-            {
-                "category": category,
-                "q_gu": q_gu,
-                "q_en": q_en,
-                "members": members,
-                "feedback_q": fb_q,
-                "feedback_search": fb_search,
-                "feedback_a": fb_a,
-            }
-        )
-    return entries, sorted(unique_emails)
+        yield {
+            "category": category,
+            "q_gu": q_gu,
+            "q_en": q_en,
+            "members": members,
+            "feedback_q": fb_q,
+            "feedback_search": fb_search,
+            "feedback_a": fb_a,
+        }
 
 
 def build_question_index(conn: sqlite3.Connection):
@@ -118,20 +139,87 @@ def map_entries_to_questions(entries, by_exact, by_q_gu, by_q_gu_norm):
         if qid is None:
             unmapped_entries.append(item)
             continue
-        mapped_pairs.append(
-            (
-                qid,
-                item["members"],
-                {
-                    "q_translation_comment": item.get("feedback_q", ""),
-                    "search_comment": item.get("feedback_search", ""),
-                    "answer_comment": item.get("feedback_a", ""),
-                },
-            )
-        )
+        mapped_pairs.append(mapped_pair(qid, item))
     return mapped_pairs, unmapped_entries, ambiguous_entries
 
 
+def mapped_pair(qid, item):
+    return (
+        qid,
+        item["members"],
+        {
+            "q_translation_comment": item.get("feedback_q", ""),
+            "search_comment": item.get("feedback_search", ""),
+            "answer_comment": item.get("feedback_a", ""),
+        },
+    )
+
+
+def build_fuzzy_index(conn: sqlite3.Connection) -> NgramIndex:
+    index = NgramIndex(weights={"q_gu": 0.7, "q_en": 0.3})
+    for row in conn.execute("SELECT id, q_gu, q_en FROM questions WHERE active = 1"):
+        index.add(row["id"], {"q_gu": row["q_gu"], "q_en": row["q_en"]})
+    return index
+
+
+def fuzzy_map_entries(
+    entries,
+    index: NgramIndex,
+    threshold: float = FUZZY_AUTO_THRESHOLD,
+    min_margin: float = FUZZY_MIN_MARGIN,
+    taken=None,
+):
+    """Rank n-gram matches for rows the exact passes could not map.
+
+    A row is auto-mapped only when its best match scores at least ``threshold``
+    and beats the runner-up by ``min_margin``. ``taken`` holds question ids
+    already mapped by the exact passes; they are never handed out again, and
+    question ids auto-mapped here are added to it.
+
+    Returns ``(fuzzy_pairs, review, collisions)``. ``review`` holds rows with
+    no confident match, with their ranked candidates. ``collisions`` holds
+    ``(item, matches, reason)`` for confident matches left unresolved: the
+    question is already ``"taken"``, two candidates ``"tie"`` within the
+    margin, or several rows are ``"contested"`` for the same question.
+    """
+    taken = set() if taken is None else taken
+    proposals = {}
+    review = []
+    collisions = []
+    for item in entries:
+        matches = index.search({"q_gu": item["q_gu"], "q_en": item["q_en"]}, limit=5)
+        free = [match for match in matches if match["id"] not in taken]
+        blocked = [match for match in matches if match["id"] in taken]
+        best = free[0] if free else None
+        best_score = best["score"] if best else 0.0
+        runner_up = free[1]["score"] if len(free) > 1 else 0.0
+        if blocked and blocked[0]["score"] >= threshold and blocked[0]["score"] + min_margin > best_score:
+            collisions.append((item, matches, "taken"))
+        elif best_score < threshold:
+            review.append((item, matches))
+        elif best_score - runner_up < min_margin:
+            collisions.append((item, matches, "tie"))
+        else:
+            proposals.setdefault(best["id"], []).append((item, best, matches))
+
+    fuzzy_pairs = []
+    for qid, claims in proposals.items():
+        if len(claims) > 1:
+            collisions.extend((item, matches, "contested") for item, _best, matches in claims)
+            continue
+        item, best, _matches = claims[0]
+        taken.add(qid)
+        fuzzy_pairs.append((mapped_pair(qid, item), item, best))
+    return fuzzy_pairs, review, collisions
+
+
+def print_fuzzy_collisions(collisions, limit: int = 5) -> None:
+    print("first_fuzzy_collisions (not applied):")
+    for item, matches, reason in collisions[:limit]:
+        ranked = ", ".join(f"#{m['id']}={m['score']:.3f}" for m in matches)
+        print(f" - {reason}: {item['q_gu']} [{ranked}]")
+
+
 def apply_sync(
     conn: sqlite3.Connection,
     mapped_pairs,
@@ -139,81 +227,97 @@ def apply_sync(
 ):
     conn.execute("BEGIN")
     try:
-        # Remove test users and defaults not present in sheet list.
-        if allowed_emails:
-            placeholders = ",".join("?" for _ in allowed_emails)
-            disallowed_users = conn.execute(
-                f"SELECT id FROM users WHERE lower(email) NOT IN ({placeholders})",
-                allowed_emails,
-            ).fetchall()
-            disallowed_ids = [row["id"] for row in disallowed_users]
-            if disallowed_ids:
-                placeholders = ",".join("?" for _ in disallowed_ids)
-                conn.execute(f"DELETE FROM feedback WHERE user_id IN ({placeholders})", disallowed_ids)
-                conn.execute(f"DELETE FROM assignments WHERE user_id IN ({placeholders})", disallowed_ids)
-                conn.execute(f"DELETE FROM users WHERE id IN ({placeholders})", disallowed_ids)
-
-        # Remove known local test questions inserted during development.
-        conn.execute("DELETE FROM assignments WHERE question_id IN (SELECT id FROM questions WHERE category IN ('CatX','CatZ'))")
-        conn.execute("DELETE FROM feedback WHERE question_id IN (SELECT id FROM questions WHERE category IN ('CatX','CatZ'))")
-        conn.execute("DELETE FROM questions WHERE category IN ('CatX','CatZ')")
-
-        # Ensure sheet users exist.
-        for email in allowed_emails:
-            conn.execute(
-                "INSERT OR IGNORE INTO users (email, is_admin) VALUES (?, 0)",
-                (email,),
-            )
-
-        # Rebuild assignments from sheet mappings.
-        conn.execute("DELETE FROM assignments")
-        for question_id, members, feedback in mapped_pairs:
-            for email in sorted(set(members)):
-                user = conn.execute("SELECT id FROM users WHERE lower(email)=?", (email,)).fetchone()
-                if user:
-                    conn.execute(
-                        "INSERT OR IGNORE INTO assignments (user_id, question_id) VALUES (?, ?)",
-                        (user["id"], question_id),
-                    )
-                    if (
-                        feedback.get("q_translation_comment")
-                        or feedback.get("search_comment")
-                        or feedback.get("answer_comment")
-                    ):
-                        now = datetime.utcnow().isoformat()
-                        conn.execute(
-                            """
-                            INSERT INTO feedback (
-                                user_id, question_id, submission_status,
-                                q_translation_rating, q_translation_comment,
-                                search_rating, search_issue_type, search_comment,
-                                answer_accuracy_rating, answer_translation_rating, answer_comment,
-                                created_at, updated_at
-                            )
-                            VALUES (?, ?, 'submitted', NULL, ?, NULL, NULL, ?, NULL, NULL, ?, ?, ?)
-                            ON CONFLICT(user_id, question_id) DO UPDATE SET
-                                submission_status='submitted',
-                                q_translation_comment=excluded.q_translation_comment,
-                                search_comment=excluded.search_comment,
-                                answer_comment=excluded.answer_comment,
-                                updated_at=excluded.updated_at
-                            """,
-                            (
-                                user["id"],
-                                question_id,
-                                feedback.get("q_translation_comment", ""),
-                                feedback.get("search_comment", ""),
-                                feedback.get("answer_comment", ""),
-                                now,
-                                now,
-                            ),
-                        )
+        sync_assignments(conn, mapped_pairs, allowed_emails)
         conn.commit()
     except Exception:
         conn.rollback()
         raise
 
 
+def sync_assignments(conn: sqlite3.Connection, mapped_pairs, allowed_emails) -> None:
+    """Rebuild users/assignments from sheet mappings inside the caller's transaction."""
+    # Remove test users and defaults not present in sheet list.
+    if allowed_emails:
+        placeholders = ",".join("?" for _ in allowed_emails)
+        disallowed_users = conn.execute(
+            f"SELECT id FROM users WHERE email_norm NOT IN ({placeholders})",
+            allowed_emails,
+        ).fetchall()
+        disallowed_ids = [row["id"] for row in disallowed_users]
+        if disallowed_ids:
+            placeholders = ",".join("?" for _ in disallowed_ids)
+            conn.execute(f"DELETE FROM feedback WHERE user_id IN ({placeholders})", disallowed_ids)
+            conn.execute(f"DELETE FROM assignments WHERE user_id IN ({placeholders})", disallowed_ids)
+            conn.execute(f"DELETE FROM users WHERE id IN ({placeholders})", disallowed_ids)
+
+    # Remove known local test questions inserted during development.
+    conn.execute("DELETE FROM assignments WHERE question_id IN (SELECT id FROM questions WHERE category IN ('CatX','CatZ'))")
+    conn.execute("DELETE FROM feedback WHERE question_id IN (SELECT id FROM questions WHERE category IN ('CatX','CatZ'))")
+    conn.execute("DELETE FROM questions WHERE category IN ('CatX','CatZ')")
+
+    # Ensure sheet users exist.
+    conn.executemany(
+        "INSERT OR IGNORE INTO users (email, email_norm, is_admin) VALUES (?, ?, 0)",
+        [(email, email) for email in allowed_emails],
+    )
+    user_ids = {row["email_norm"]: row["id"] for row in conn.execute("SELECT id, email_norm FROM users")}
+
+    # Rebuild assignments from sheet mappings.
+    assignment_rows = []
+    feedback_rows = []
+    now = datetime.utcnow().isoformat()
+    for question_id, members, feedback in mapped_pairs:
+        has_comment = (
+            feedback.get("q_translation_comment")
+            or feedback.get("search_comment")
+            or feedback.get("answer_comment")
+        )
+        for email in sorted(set(members)):
+            user_id = user_ids.get(email)
+            if user_id is None:
+                continue
+            assignment_rows.append((user_id, question_id))
+            if has_comment:
+                feedback_rows.append(
+                    (
+                        user_id,
+                        question_id,
+                        feedback.get("q_translation_comment", ""),
+                        feedback.get("search_comment", ""),
+                        feedback.get("answer_comment", ""),
+                        now,
+                        now,
+                    )
+                )
+    conn.execute("DELETE FROM assignments")
+    conn.executemany(
+        "INSERT OR IGNORE INTO assignments (user_id, question_id) VALUES (?, ?)",
+        assignment_rows,
+    )
+    conn.executemany(
+        """
+        INSERT INTO feedback (
+            user_id, question_id, submission_status,
+            q_translation_rating, q_translation_comment,
+            search_rating, search_issue_type, search_comment,
+            answer_accuracy_rating, answer_translation_rating, answer_comment,
+            created_at, updated_at
+        )
+        VALUES (?, ?, 'submitted', NULL, ?, NULL, NULL, ?, NULL, NULL, ?, ?, ?)
+        ON CONFLICT(user_id, question_id) DO UPDATE SET
+            submission_status='submitted',
+            q_translation_comment=excluded.q_translation_comment,
+            search_comment=excluded.search_comment,
+            answer_comment=excluded.answer_comment,
+            updated_at=excluded.updated_at
+        """,
+        feedback_rows,
+    )
+    queueing.refresh_all(conn)
+    # Every assignment was deleted and re-inserted; planner statistics are stale.
+    maintenance.request(conn, "eval sheet sync rebuilt assignments")
+
+
 def main():
     parser = argparse.ArgumentParser(description="Sync users and assignments from Amul Eval Sheet.")
     parser.add_argument("--db", default="app.db", help="Path to sqlite DB")
@@ -222,29 +326,73 @@ def main():
         default="data/Sheets/Amul Eval Sheet.csv",
         help="Path to eval sheet CSV",
     )
+    parser.add_argument(
+        "--dataset",
+        default=datasets.DEFAULT_DATASET,
+        help="Dataset slug to sync (resolved through the catalog; default uses --db)",
+    )
+    parser.add_argument("--catalog", default=str(CATALOG_PATH), help="Path to dataset catalog DB (default: $CATALOG_PATH)")
+    parser.add_argument(
+        "--datasets-dir", default=str(DATASETS_DIR), help="Directory of dataset DBs (default: $DATASETS_DIR)"
+    )
     parser.add_argument("--apply", action="store_true", help="Apply changes")
+    parser.add_argument(
+        "--fuzzy-threshold",
+        type=float,
+        default=FUZZY_AUTO_THRESHOLD,
+        help="Minimum n-gram similarity to auto-map an unmapped row (0-1)",
+    )
+    parser.add_argument("--no-fuzzy", action="store_true", help="Skip fuzzy matching of unmapped rows")
     args = parser.parse_args()
 
     db_path = Path(args.db)
+    dataset = datasets.normalize_slug(args.dataset) or datasets.DEFAULT_DATASET
+    if dataset != datasets.DEFAULT_DATASET:
+        catalog = datasets.DatasetCatalog(args.catalog, db_path, args.datasets_dir)
+        db_path = catalog.resolve(dataset)
+        if db_path is None:
+            print(f"Unknown dataset: {dataset}")
+            sys.exit(1)
     sheet_path = Path(args.sheet)
     entries, unique_emails = parse_sheet(sheet_path)
 
     conn = sqlite3.connect(db_path)
     conn.row_factory = sqlite3.Row
+    # The DB may not have been opened by the upgraded app yet (content_key, version triggers).
+    schema.ensure_schema(conn)
     by_exact, by_q_gu, by_q_gu_norm = build_question_index(conn)
     mapped_pairs, unmapped_entries, ambiguous_entries = map_entries_to_questions(
         entries, by_exact, by_q_gu, by_q_gu_norm
     )
 
+    fuzzy_pairs, review, collisions = [], [], []
+    if unmapped_entries and not args.no_fuzzy:
+        fuzzy_pairs, review, collisions = fuzzy_map_entries(
+            unmapped_entries,
+            build_fuzzy_index(conn),
+            threshold=args.fuzzy_threshold,
+            taken={qid for qid, _members, _comments in mapped_pairs},
+        )
+        unmapped_entries = [item for item, _matches in review]
+
     print(f"sheet_rows={len(entries)}")
     print(f"unique_sheet_emails={len(unique_emails)}")
     print(f"mapped_rows={len(mapped_pairs)}")
+    print(f"fuzzy_mapped_rows={len(fuzzy_pairs)}")
+    print(f"fuzzy_collision_rows={len(collisions)}")
     print(f"unmapped_rows={len(unmapped_entries)}")
     print(f"ambiguous_rows={len(ambiguous_entries)}")
+    if fuzzy_pairs:
+        print("fuzzy_mapped (auto-applied with --apply):")
+        for pair, item, best in fuzzy_pairs[:20]:
+            print(f" - #{pair[0]} confidence={best['score']:.3f} <- {item['q_gu']}")
+    if collisions:
+        print_fuzzy_collisions(collisions)
     if unmapped_entries:
         print("first_unmapped_q_gu:")
-        for item in unmapped_entries[:5]:
-            print(f" - {item['q_gu']}")
+        for item, matches in (review or [(item, []) for item in unmapped_entries])[:5]:
+            ranked = ", ".join(f"#{m['id']}={m['score']:.3f}" for m in matches) or "no candidates"
+            print(f" - {item['q_gu']} [{ranked}]")
     if ambiguous_entries:
         print("first_ambiguous_q_gu:")
         for item in ambiguous_entries[:5]:
@@ -253,7 +401,7 @@ def main():
     if args.apply:
         apply_sync(
             conn=conn,
-            mapped_pairs=mapped_pairs,
+            mapped_pairs=mapped_pairs + [pair for pair, _item, _best in fuzzy_pairs],
             allowed_emails=[e.lower() for e in unique_emails],
         )
         users_count = conn.execute("SELECT COUNT(*) AS c FROM users").fetchone()["c"]
@@ -0,0 +1,96 @@
+import re
+import unicodedata
+from collections import Counter, defaultdict
+
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_for_matching(text) -> str:
+    """NFC, lowercase, punctuation/symbols dropped, whitespace collapsed.
+
+    Filtering by Unicode category (not ``\\W``) keeps Gujarati vowel signs and
+    viramas, which are combining marks rather than alphanumerics.
+    """
+    value = unicodedata.normalize("NFC", text or "").lower()
+    value = "".join(" " if unicodedata.category(ch)[0] in "PS" else ch for ch in value)
+    return _SPACE_RE.sub(" ", value).strip()
+
+
+def char_ngrams(text, n: int = 3) -> set:
+    value = normalize_for_matching(text)
+    if not value:
+        return set()
+    padded = f" {value} "
+    if len(padded) <= n:
+        return {padded}
+    return {padded[i : i + n] for i in range(len(padded) - n + 1)}
+
+
+def dice(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return 2.0 * len(a & b) / (len(a) + len(b))
+
+
+class NgramIndex:
+    """Character n-gram inverted index over several text fields.
+
+    Candidates come from posting lists of the query's n-grams, skipping grams
+    that appear in more than ``max_df`` of the indexed items, so a lookup
+    touches only items sharing rare-enough grams instead of every item.
+    Candidates are then scored with a weighted Dice coefficient per field.
+    """
+
+    def __init__(self, weights: dict, n: int = 3, max_df: float = 0.25, candidates: int = 25):
+        self.weights = weights
+        self.n = n
+        self.max_df = max_df
+        self.candidates = candidates
+        self._grams: dict = {}
+        self._postings = {field: defaultdict(list) for field in weights}
+
+    def __len__(self) -> int:
+        return len(self._grams)
+
+    def add(self, item_id, fields: dict) -> None:
+        grams = {field: char_ngrams(fields.get(field), self.n) for field in self.weights}
+        self._grams[item_id] = grams
+        for field, field_grams in grams.items():
+            postings = self._postings[field]
+            for gram in field_grams:
+                postings[gram].append(item_id)
+
+    def _candidates(self, query_grams: dict) -> list:
+        overlap = self._overlap(query_grams, max(int(self.max_df * len(self._grams)), 1))
+        if not overlap:
+            # Only common grams matched; fall back to using every posting list.
+            overlap = self._overlap(query_grams, None)
+        return [item_id for item_id, _count in overlap.most_common(self.candidates)]
+
+    def _overlap(self, query_grams: dict, limit) -> Counter:
+        overlap = Counter()
+        for field, grams in query_grams.items():
+            postings = self._postings[field]
+            for gram in grams:
+                items = postings.get(gram)
+                if not items or (limit is not None and len(items) > limit):
+                    continue
+                overlap.update(items)
+        return overlap
+
+    def search(self, fields: dict, limit: int = 3) -> list:
+        """Ranked ``[{"id", "score"}]`` with scores in ``[0, 1]``."""
+        query_grams = {field: char_ngrams(fields.get(field), self.n) for field in self.weights}
+        active = {field: w for field, w in self.weights.items() if query_grams[field]}
+        total_weight = sum(active.values())
+        if not total_weight:
+            return []
+        scored = []
+        for item_id in self._candidates(query_grams):
+            item_grams = self._grams[item_id]
+            score = sum(
+                weight * dice(query_grams[field], item_grams[field]) for field, weight in active.items()
+            ) / total_weight
+            scored.append({"id": item_id, "score": round(score, 4)})
+        scored.sort(key=lambda match: (-match["score"], match["id"]))
+        return scored[:limit]
@@ -0,0 +1,250 @@
+import gzip
+import re
+import shutil
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Optional
+
+import storage
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshot_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    trigger TEXT NOT NULL,
+    path TEXT NOT NULL,
+    duration_ms REAL NOT NULL,
+    db_bytes INTEGER NOT NULL,
+    size_bytes INTEGER NOT NULL,
+    pages INTEGER NOT NULL,
+    restarts INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+SNAPSHOT_SUFFIX = ".db.gz"
+
+
+class _BackupRestarting(Exception):
+    pass
+
+
+def ensure_schema(conn: sqlite3.Connection) -> None:
+    conn.executescript(SCHEMA)
+
+
+def _backup(src: sqlite3.Connection, dst: sqlite3.Connection, pages: int, step_pause: float, max_restarts: int):
+    """Copy ``src`` into ``dst`` a few pages at a time.
+
+    Pausing between steps lets the writer get in. A write from another
+    connection restarts the copy; if that keeps happening the copy falls back
+    to a single step, which in WAL mode still only holds a read snapshot.
+    """
+    state = {"remaining": None, "restarts": 0, "pages": 0}
+
+    def progress(_status, remaining, total):
+        state["pages"] = total
+        if state["remaining"] is not None and remaining > state["remaining"]:
+            state["restarts"] += 1
+            if state["restarts"] > max_restarts:
+                raise _BackupRestarting()
+        state["remaining"] = remaining
+        if step_pause:
+            time.sleep(step_pause)
+
+    try:
+        src.backup(dst, pages=pages, progress=progress)
+    except _BackupRestarting:
+        src.backup(dst, pages=-1)
+    return state["pages"], state["restarts"]
+
+
+def create_snapshot(
+    db_path,
+    snapshot_dir,
+    pages: int = 256,
+    step_pause: float = 0.005,
+    max_restarts: int = 3,
+) -> dict:
+    db_path = Path(db_path)
+    snapshot_dir = Path(snapshot_dir)
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%fZ")
+    final_path = snapshot_dir / f"{db_path.stem}-{stamp}{SNAPSHOT_SUFFIX}"
+    tmp_path = snapshot_dir / f".{db_path.stem}-{stamp}.db.tmp"
+
+    started = time.monotonic()
+    src = sqlite3.connect(db_path, timeout=30)
+    dst = sqlite3.connect(tmp_path)
+    try:
+        page_count, restarts = _backup(src, dst, pages, step_pause, max_restarts)
+        dst.execute("PRAGMA journal_mode=DELETE")
+    finally:
+        dst.close()
+        src.close()
+    try:
+        db_bytes = tmp_path.stat().st_size
+        with tmp_path.open("rb") as raw, gzip.open(final_path, "wb", compresslevel=6) as packed:
+            shutil.copyfileobj(raw, packed, length=1024 * 1024)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+    return {
+        "created_at": datetime.utcnow().isoformat(),
+        "path": str(final_path),
+        "duration_ms": round((time.monotonic() - started) * 1000.0, 3),
+        "db_bytes": db_bytes,
+        "size_bytes": final_path.stat().st_size,
+        "pages": page_count,
+        "restarts": restarts,
+    }
+
+
+def list_snapshots(snapshot_dir, db_stem: Optional[str] = None):
+    snapshot_dir = Path(snapshot_dir)
+    if not snapshot_dir.exists():
+        return []
+    paths = snapshot_dir.glob(f"*{SNAPSHOT_SUFFIX}")
+    if db_stem:
+        # Exact stamp match: "app-*" would also catch "app-eval-<stamp>" of another dataset.
+        own = re.compile(rf"^{re.escape(db_stem)}-\d{{8}}T\d{{12}}Z{re.escape(SNAPSHOT_SUFFIX)}$")
+        paths = (path for path in paths if own.match(path.name))
+    return sorted(paths)
+
+
+def prune_snapshots(snapshot_dir, db_stem: str, keep: int):
+    """Delete all but the newest ``keep`` snapshots of one database."""
+    removed = []
+    if keep <= 0:
+        return removed
+    for path in list_snapshots(snapshot_dir, db_stem)[:-keep]:
+        path.unlink(missing_ok=True)
+        removed.append(path)
+    return removed
+
+
+def record_run(conn: sqlite3.Connection, info: dict, trigger: str) -> None:
+    conn.execute(
+        """
+        INSERT INTO snapshot_runs (created_at, trigger, path, duration_ms, db_bytes, size_bytes, pages, restarts)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (
+            info["created_at"],
+            trigger,
+            info["path"],
+            info["duration_ms"],
+            info["db_bytes"],
+            info["size_bytes"],
+            info["pages"],
+            info["restarts"],
+        ),
+    )
+
+
+def snapshot_metrics(conn: sqlite3.Connection) -> dict:
+    row = conn.execute(
+        """
+        SELECT COUNT(*) AS runs, AVG(duration_ms) AS avg_duration_ms, MAX(duration_ms) AS max_duration_ms
+        FROM snapshot_runs
+        """
+    ).fetchone()
+    last = conn.execute("SELECT * FROM snapshot_runs ORDER BY id DESC LIMIT 1").fetchone()
+    return {
+        "runs": row["runs"],
+        "avg_duration_ms": row["avg_duration_ms"],
+        "max_duration_ms": row["max_duration_ms"],
+        "last": dict(last) if last else None,
+    }
+
+
+def restore_snapshot(snapshot_path, db_path) -> dict:
+    """Replace the contents of ``db_path`` with a snapshot (plain or gzipped).
+
+    The snapshot is integrity-checked first and copied in with the backup API,
+    so open connections see either the old or the new database, never a mix.
+    """
+    snapshot_path = Path(snapshot_path)
+    db_path = Path(db_path)
+    started = time.monotonic()
+    tmp_path = db_path.with_name(f".{db_path.name}.restore.tmp")
+    try:
+        if snapshot_path.suffix == ".gz":
+            with gzip.open(snapshot_path, "rb") as packed, tmp_path.open("wb") as raw:
+                shutil.copyfileobj(packed, raw, length=1024 * 1024)
+        else:
+            shutil.copyfile(snapshot_path, tmp_path)
+        src = sqlite3.connect(tmp_path)
+        try:
+            check = src.execute("PRAGMA integrity_check").fetchone()[0]
+            if check != "ok":
+                raise RuntimeError(f"Snapshot failed integrity check: {check}")
+            dst = sqlite3.connect(db_path, timeout=30)
+            try:
+                src.backup(dst)
+            finally:
+                dst.close()
+        finally:
+            src.close()
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return {"duration_ms": round((time.monotonic() - started) * 1000.0, 3), "db_bytes": db_path.stat().st_size}
+
+
+class SnapshotScheduler:
+    """Background thread that snapshots a set of databases on an interval."""
+
+    def __init__(
+        self,
+        db_paths: Callable[[], list],
+        snapshot_dir,
+        interval_seconds: float,
+        keep: int,
+        pages: int = 256,
+    ):
+        self.db_paths = db_paths
+        self.snapshot_dir = Path(snapshot_dir)
+        self.interval_seconds = interval_seconds
+        self.keep = keep
+        self.pages = pages
+        self.last_error: Optional[str] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        if self.interval_seconds <= 0:
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="snapshot-scheduler", daemon=True)
+            self._thread.start()
+
+    def run_once(self) -> list:
+        results = []
+        for db_path in self.db_paths():
+            db_path = Path(db_path)
+            if not db_path.exists():
+                continue
+            info = create_snapshot(db_path, self.snapshot_dir, pages=self.pages)
+            prune_snapshots(self.snapshot_dir, db_path.stem, self.keep)
+            conn = storage.connect(db_path)
+            try:
+                with conn:
+                    record_run(conn, info, "scheduled")
+            finally:
+                conn.close()
+            results.append(info)
+        return results
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval_seconds)
+            try:
+                self.run_once()
+                self.last_error = None
+            except Exception as exc:  # keep the scheduler alive across failures
+                self.last_error = f"{type(exc).__name__}: {exc}"
@@ -0,0 +1,569 @@
+import hashlib
+import queue
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+import zlib
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, Optional
+
+
+def connect(db_path, timeout: float = 30.0) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, timeout=timeout)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def checkpoint(db_path) -> Optional[tuple]:
+    """Copy the WAL back into the DB file and truncate it, e.g. before shutdown.
+
+    Returns SQLite's ``(busy, log_frames, checkpointed)``; ``None`` if the file is gone.
+    """
+    if not Path(db_path).exists():
+        return None
+    conn = sqlite3.connect(db_path, timeout=5)
+    try:
+        return tuple(conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone())
+    finally:
+        conn.close()
+
+
+def normalize_email(value) -> str:
+    return (value or "").strip().lower()
+
+
+def normalize_text(value) -> str:
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", value or "")).strip()
+
+
+def question_content_key(category, q_gu, q_en) -> str:
+    """Fixed-width identity for a question: 128-bit hash of its normalized text."""
+    material = "\x1f".join(normalize_text(part) for part in (category, q_gu, q_en))
+    return hashlib.blake2b(material.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def backfill_question_keys(conn: sqlite3.Connection) -> int:
+    """Fill ``content_key`` for rows missing it; later duplicates stay NULL."""
+    taken = {
+        row[0] for row in conn.execute("SELECT content_key FROM questions WHERE content_key IS NOT NULL")
+    }
+    updates = []
+    for row in conn.execute(
+        "SELECT id, category, q_gu, q_en FROM questions WHERE content_key IS NULL ORDER BY id"
+    ).fetchall():
+        key = question_content_key(row[1], row[2], row[3])
+        if key in taken:
+            continue
+        taken.add(key)
+        updates.append((key, row[0]))
+    conn.executemany("UPDATE questions SET content_key = ? WHERE id = ?", updates)
+    return len(updates)
+
+
+def question_payload_hash(search_results, a_en, a_gu) -> str:
+    """Hash of the fields an upsert rewrites, byte-for-byte (no normalization)."""
+    material = "\x1f".join(value or "" for value in (search_results, a_en, a_gu))
+    return hashlib.blake2b(material.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def backfill_payload_hashes(conn: sqlite3.Connection) -> int:
+    updates = [
+        (question_payload_hash(row[1], row[2], row[3]), row[0])
+        for row in conn.execute(
+            "SELECT id, search_results, a_en, a_gu FROM questions WHERE payload_hash IS NULL"
+        ).fetchall()
+    ]
+    conn.executemany("UPDATE questions SET payload_hash = ? WHERE id = ?", updates)
+    return len(updates)
+
+
+INSERT_CHUNK_ROWS = 100  # 8 bound values per row stays far below SQLite's variable limit
+
+
+class QuestionSync:
+    """Writes incoming question rows only when they differ from what is stored.
+
+    Reads ``(id, content_key, payload_hash, active)`` for every question once,
+    then classifies each row as inserted, changed or unchanged. Unchanged rows
+    cost a dict lookup and no write, so re-importing an identical CSV is close
+    to a read-only pass. Rows are ``(category, q_gu, q_en, search_results, a_en, a_gu)``.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.by_key: dict = {}
+        self.by_id: dict = {}
+        self.counts = {"inserted": 0, "changed": 0, "unchanged": 0}
+        for row in conn.execute("SELECT id, content_key, payload_hash, active FROM questions"):
+            self.by_id[row[0]] = (row[1], row[2], row[3])
+            if row[1] is not None:
+                self.by_key[row[1]] = row[0]
+
+    def _remember(self, question_id: int, key: str, payload: str) -> None:
+        self.by_id[question_id] = (key, payload, 1)
+        self.by_key[key] = question_id
+
+    def _insert(self, key: str, payload: str, fields) -> int:
+        question_id = self.conn.execute(
+            """
+            INSERT INTO questions (content_key, payload_hash, category, q_gu, q_en, search_results, a_en, a_gu, active)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1)
+            RETURNING id
+            """,
+            (key, payload, *fields),
+        ).fetchone()[0]
+        self.counts["inserted"] += 1
+        self._remember(question_id, key, payload)
+        return question_id
+
+    def upsert(self, fields, question_id: Optional[int] = None) -> int:
+        """Insert or refresh by content key; with ``question_id``, rewrite that row in place."""
+        key = question_content_key(*fields[:3])
+        payload = question_payload_hash(*fields[3:])
+        if question_id and question_id in self.by_id:
+            if self.by_id[question_id] == (key, payload, 1):
+                self.counts["unchanged"] += 1
+                return question_id
+            self.conn.execute(
+                """
+                UPDATE questions
+                SET content_key=?, payload_hash=?, category=?, q_gu=?, q_en=?, search_results=?, a_en=?, a_gu=?, active=1
+                WHERE id=?
+                """,
+                (key, payload, *fields, question_id),
+            )
+            old_key = self.by_id[question_id][0]
+            if self.by_key.get(old_key) == question_id:
+                del self.by_key[old_key]
+            self.counts["changed"] += 1
+            self._remember(question_id, key, payload)
+            return question_id
+
+        existing = self.by_key.get(key)
+        if existing is None:
+            return self._insert(key, payload, fields)
+        if self.by_id[existing][1:] == (payload, 1):
+            self.counts["unchanged"] += 1
+            return existing
+        self.conn.execute(
+            "UPDATE questions SET payload_hash=?, search_results=?, a_en=?, a_gu=?, active=1 WHERE id=?",
+            (payload, *fields[3:], existing),
+        )
+        self.counts["changed"] += 1
+        self._remember(existing, key, payload)
+        return existing
+
+    def upsert_many(self, rows) -> list:
+        """Chunked :meth:`upsert` by content key.
+
+        One ``executemany`` for changed rows, then one multi-row ``INSERT ... RETURNING``
+        per ``INSERT_CHUNK_ROWS`` new rows.
+        """
+        ids = []
+        updates = []
+        inserts = {}
+        for fields in rows:
+            key = question_content_key(*fields[:3])
+            payload = question_payload_hash(*fields[3:])
+            existing = self.by_key.get(key)
+            if existing is None:
+                inserts[key] = (key, payload, *fields)
+                continue
+            ids.append(existing)
+            if self.by_id[existing][1:] == (payload, 1):
+                self.counts["unchanged"] += 1
+                continue
+            updates.append((payload, *fields[3:], existing))
+            self.counts["changed"] += 1
+            self._remember(existing, key, payload)
+        if updates:
+            self.conn.executemany(
+                "UPDATE questions SET payload_hash=?, search_results=?, a_en=?, a_gu=?, active=1 WHERE id=?",
+                updates,
+            )
+        # Multi-row INSERT ... RETURNING hands back each new id with its key, no re-read.
+        rows = list(inserts.values())
+        for start in range(0, len(rows), INSERT_CHUNK_ROWS):
+            chunk = rows[start : start + INSERT_CHUNK_ROWS]
+            returned = self.conn.execute(
+                f"""
+                INSERT INTO questions (content_key, payload_hash, category, q_gu, q_en, search_results, a_en, a_gu, active)
+                VALUES {", ".join("(?, ?, ?, ?, ?, ?, ?, ?, 1)" for _ in chunk)}
+                RETURNING content_key, id
+                """,
+                [value for row in chunk for value in row],
+            ).fetchall()
+            for key, question_id in returned:
+                self.counts["inserted"] += 1
+                self._remember(question_id, key, inserts[key][1])
+                ids.append(question_id)
+        return ids
+
+    def insert_if_missing(self, fields) -> int:
+        key = question_content_key(*fields[:3])
+        existing = self.by_key.get(key)
+        if existing is not None:
+            self.counts["unchanged"] += 1
+            return existing
+        return self._insert(key, question_payload_hash(*fields[3:]), fields)
+
+
+def gunzip(data: bytes, max_size: int) -> bytes:
+    """Decompress a (possibly multi-member) gzip body, producing at most ``max_size`` bytes.
+
+    Raises ``ValueError`` once the output would exceed ``max_size``, without
+    inflating the rest; ``zlib.error``/``EOFError`` for corrupt or truncated input.
+    """
+    out = bytearray()
+    while data:
+        decompressor = zlib.decompressobj(wbits=31)
+        out += decompressor.decompress(data, max_size + 1 - len(out))
+        if len(out) > max_size:
+            raise ValueError(f"decompressed body exceeds {max_size} bytes")
+        if not decompressor.eof:
+            raise EOFError("gzip stream ended before the end-of-stream marker")
+        data = decompressor.unused_data
+    return bytes(out)
+
+
+def prefix_upper_bound(prefix: str) -> str:
+    """Smallest string greater than every string starting with ``prefix``."""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+VERSIONED_TABLES = ("users", "questions", "assignments", "feedback")
+
+
+def versions_schema(tables=VERSIONED_TABLES) -> str:
+    """Per-table change counters, bumped by triggers on every write path.
+
+    Only DDL, so rerunning it on an up-to-date database takes no write lock;
+    the counter rows are added by :func:`seed_versions`.
+    """
+    parts = [
+        """
+        CREATE TABLE IF NOT EXISTS table_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        );
+        """
+    ]
+    for table in tables:
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            parts.append(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_version_{event.lower()}
+                AFTER {event} ON {table}
+                BEGIN
+                  UPDATE table_versions SET version = version + 1 WHERE name = '{table}';
+                END;
+                """
+            )
+    return "\n".join(parts)
+
+
+def seed_versions(conn: sqlite3.Connection, tables=VERSIONED_TABLES) -> None:
+    """Add the missing ``table_versions`` rows; writes nothing once they all exist."""
+    present = {row[0] for row in conn.execute("SELECT name FROM table_versions").fetchall()}
+    missing = [(table,) for table in tables if table not in present]
+    if missing:
+        conn.executemany("INSERT OR IGNORE INTO table_versions (name, version) VALUES (?, 0)", missing)
+
+
+class VersionWatcher:
+    """Cheap cross-process change detection for one database file.
+
+    ``PRAGMA data_version`` on a long-lived connection changes whenever any
+    other connection (any thread or process) commits, so ``table_versions`` is
+    re-read only after a commit has actually happened somewhere.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = Path(db_path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._data_version = None
+        self._versions: dict = {}
+
+    def versions(self) -> dict:
+        with self._lock:
+            if self._conn is None:
+                self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if data_version != self._data_version:
+                self._versions = dict(self._conn.execute("SELECT name, version FROM table_versions").fetchall())
+                self._data_version = data_version
+            return self._versions
+
+
+class DependentCache:
+    """Bounded LRU cache whose entries are dropped when a table they read changes.
+
+    ``depends_on`` names tables from ``VERSIONED_TABLES``; an entry may narrow
+    that set when stored. ``set`` takes the table versions the caller probed
+    before reading, and skips storing when a newer change has already been
+    seen, so a slow reader cannot put stale data back after an invalidation.
+    """
+
+    def __init__(self, name: str, depends_on, max_entries: int = 1024):
+        unknown = set(depends_on) - set(VERSIONED_TABLES)
+        if unknown:
+            raise ValueError(f"Cache {name!r} depends on unversioned tables: {', '.join(sorted(unknown))}")
+        self.name = name
+        self.depends_on = frozenset(depends_on)
+        self.max_entries = max_entries
+        self._entries: "OrderedDict" = OrderedDict()
+        self._seen: dict = {}
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.dropped = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, versions: dict, depends_on=None) -> None:
+        tables = self.depends_on if depends_on is None else frozenset(depends_on)
+        if not tables <= self.depends_on:
+            raise ValueError(f"Entry depends on tables cache {self.name!r} is not registered for")
+        with self._lock:
+            if any(self._seen.get(table, versions.get(table)) != versions.get(table) for table in tables):
+                return
+            self._entries[key] = (tables, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, changed, versions: dict) -> int:
+        """Drop entries that read any ``changed`` table; returns how many."""
+        with self._lock:
+            self._seen = {table: versions.get(table) for table in self.depends_on}
+            changed = self.depends_on & set(changed)
+            if not changed:
+                return 0
+            stale = [key for key, (tables, _value) in self._entries.items() if tables & changed]
+            for key in stale:
+                del self._entries[key]
+            self.dropped += len(stale)
+            return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "depends_on": sorted(self.depends_on),
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "dropped": self.dropped,
+            }
+
+
+class CacheRegistry:
+    """The in-process caches of one database, invalidated by table.
+
+    Call :meth:`sync` with :meth:`VersionWatcher.versions` at the start of each
+    request. A commit from any connection or process moves ``data_version``,
+    the watcher re-reads ``table_versions``, and only entries that read a
+    changed table are dropped. Each worker process keeps its own registry.
+    """
+
+    def __init__(self):
+        self._caches: dict = {}
+        self._versions: Optional[dict] = None
+        self._lock = threading.Lock()
+
+    def register(self, cache: DependentCache) -> DependentCache:
+        with self._lock:
+            if cache.name in self._caches:
+                raise ValueError(f"Cache {cache.name!r} is already registered")
+            self._caches[cache.name] = cache
+            if self._versions is not None:
+                cache.invalidate((), self._versions)
+        return cache
+
+    def get(self, name: str) -> DependentCache:
+        return self._caches[name]
+
+    def sync(self, versions: dict) -> set:
+        """Apply the latest table versions; returns the tables that changed."""
+        with self._lock:
+            # VersionWatcher hands back the same dict until something commits.
+            if versions is self._versions:
+                return set()
+            previous, self._versions = self._versions, versions
+            changed = set()
+            if previous is not None:
+                changed = {t for t in set(versions) | set(previous) if versions.get(t) != previous.get(t)}
+            for cache in self._caches.values():
+                cache.invalidate(changed, versions)
+            return changed
+
+    def stats(self) -> dict:
+        return {name: cache.stats() for name, cache in self._caches.items()}
+
+
+def percentile(values, pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(int(round((pct / 100.0) * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+class WriteQueue:
+    """Single writer thread that group-commits queued writes.
+
+    Callers enqueue work and wait on the returned future, which resolves only
+    after the batch containing that work has been committed. Each item runs
+    inside its own savepoint, so one failing write does not abort the rest of
+    the batch.
+    """
+
+    def __init__(self, db_path, batch_window_ms: float = 5.0, max_batch: int = 256):
+        self.db_path = Path(db_path)
+        self.batch_window = max(batch_window_ms, 0.0) / 1000.0
+        self.max_batch = max(int(max_batch), 1)
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._batch_sizes = deque(maxlen=1000)
+        self._latencies_ms = deque(maxlen=1000)
+        self._batches = 0
+        self._items = 0
+        self._failed_items = 0
+        self._max_batch_seen = 0
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run, name=f"write-queue:{self.db_path.name}", daemon=True
+            )
+            self._thread.start()
+
+    def submit_call(self, fn: Callable[[sqlite3.Connection], object]) -> Future:
+        self.start()
+        future: Future = Future()
+        self._queue.put((fn, future, time.monotonic()))
+        return future
+
+    def submit(self, sql: str, params=()) -> Future:
+        return self.submit_call(lambda conn: conn.execute(sql, params).rowcount)
+
+    def execute(self, sql: str, params=(), timeout: float = 30.0):
+        return self.submit(sql, params).result(timeout=timeout)
+
+    def call(self, fn: Callable[[sqlite3.Connection], object], timeout: float = 30.0):
+        return self.submit_call(fn).result(timeout=timeout)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            sizes = list(self._batch_sizes)
+            latencies = list(self._latencies_ms)
+            return {
+                "batches": self._batches,
+                "items": self._items,
+                "failed_items": self._failed_items,
+                "queued": self._queue.qsize(),
+                "max_batch_size": self._max_batch_seen,
+                "avg_batch_size": round(sum(sizes) / len(sizes), 2) if sizes else None,
+                "queue_latency_ms": {
+                    "p50": percentile(latencies, 50),
+                    "p95": percentile(latencies, 95),
+                    "max": max(latencies) if latencies else None,
+                },
+            }
+
+    def _open(self) -> sqlite3.Connection:
+        conn = connect(self.db_path)
+        conn.isolation_level = None
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Commit everything already queued, then close the writer connection."""
+        with self._start_lock:
+            thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        self._queue.put(None)
+        thread.join(timeout)
+
+    def _collect_batch(self):
+        """Next batch, and whether a :meth:`stop` sentinel was reached."""
+        item = self._queue.get()
+        if item is None:
+            return [], True
+        batch = [item]
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    item = self._queue.get_nowait()
+                else:
+                    item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self) -> None:
+        conn = self._open()
+        stopping = False
+        while not stopping:
+            batch, stopping = self._collect_batch()
+            if not batch:
+                break
+            outcomes = []
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                for fn, future, _enqueued in batch:
+                    conn.execute("SAVEPOINT write_item")
+                    try:
+                        result = fn(conn)
+                    except Exception as exc:
+                        conn.execute("ROLLBACK TO write_item")
+                        conn.execute("RELEASE write_item")
+                        outcomes.append((future, None, exc))
+                        continue
+                    conn.execute("RELEASE write_item")
+                    outcomes.append((future, result, None))
+                conn.execute("COMMIT")
+            except Exception as exc:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                outcomes = [(future, None, exc) for _fn, future, _enqueued in batch]
+
+            done_at = time.monotonic()
+            with self._stats_lock:
+                self._batches += 1
+                self._items += len(batch)
+                self._failed_items += sum(1 for _f, _r, exc in outcomes if exc is not None)
+                self._max_batch_seen = max(self._max_batch_seen, len(batch))
+                self._batch_sizes.append(len(batch))
+                for _fn, _future, enqueued in batch:
+                    self._latencies_ms.append(round((done_at - enqueued) * 1000.0, 3))
+            for future, result, exc in outcomes:
+                if exc is not None:
+                    future.set_exception(exc)
+                else:
+                    future.set_result(result)
+        conn.close()
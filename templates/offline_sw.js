@@ -0,0 +1,41 @@
+// Service worker for offline annotation: keeps the page shell and stylesheet
+// available without a connection. Bundles and answers live in localStorage.
+const CACHE = "offline-annotate-v1";
+const SHELL = [
+  "{{ url_for('annotate_offline') }}",
+  "{{ url_for('static', filename='styles.css') }}",
+];
+
+self.addEventListener("install", function (event) {
+  event.waitUntil(caches.open(CACHE).then(function (cache) { return cache.addAll(SHELL); }));
+  self.skipWaiting();
+});
+
+self.addEventListener("activate", function (event) {
+  event.waitUntil(
+    caches.keys().then(function (keys) {
+      return Promise.all(keys.filter(function (key) { return key !== CACHE; }).map(function (key) {
+        return caches.delete(key);
+      }));
+    }).then(function () { return self.clients.claim(); })
+  );
+});
+
+self.addEventListener("fetch", function (event) {
+  const url = new URL(event.request.url);
+  if (event.request.method !== "GET" || url.origin !== self.location.origin || SHELL.indexOf(url.pathname) === -1) {
+    return;
+  }
+  // Network first so a fresh page wins when online; the cached copy covers dropouts.
+  event.respondWith(
+    fetch(event.request).then(function (resp) {
+      if (resp.ok && !resp.redirected) {
+        const copy = resp.clone();
+        caches.open(CACHE).then(function (cache) { cache.put(url.pathname, copy); });
+      }
+      return resp;
+    }).catch(function () {
+      return caches.match(url.pathname);
+    })
+  );
+});
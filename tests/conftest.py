@@ -0,0 +1,85 @@
+import io
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+# app.py builds a module-level app on import; keep it and its schedulers away from real files.
+_SCRATCH = Path(tempfile.mkdtemp(prefix="feedback-ui-tests-"))
+os.environ["DB_PATH"] = str(_SCRATCH / "import.db")
+os.environ["CATALOG_PATH"] = str(_SCRATCH / "catalog.db")
+os.environ["DATASETS_DIR"] = str(_SCRATCH / "datasets")
+os.environ["MAINTENANCE_INTERVAL_MINUTES"] = "0"
+os.environ["SNAPSHOT_INTERVAL_MINUTES"] = "0"
+os.environ.pop("TRACE_FILE", None)
+
+QUESTIONS_HEADER = "Category,Q (Gu),Q (En),Search Results,A(En),A (Gu),assigned_emails"
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    import app as appmod
+
+    monkeypatch.setattr(appmod, "DB_PATH", tmp_path / "app.db")
+    monkeypatch.setattr(appmod, "CATALOG_PATH", tmp_path / "catalog.db")
+    monkeypatch.setattr(appmod, "DATASETS_DIR", tmp_path / "datasets")
+    monkeypatch.setattr(appmod, "SOURCE_CSV", tmp_path / "no-golden-sheet.csv")
+    flask_app = appmod.create_app()
+    flask_app.config["TESTING"] = True
+    return flask_app
+
+
+@pytest.fixture
+def admin_client(app):
+    client = app.test_client()
+    client.post("/admin/login", data={"email": app.config["ADMIN_EMAIL"], "password": app.config["ADMIN_PASSWORD"]})
+    return client
+
+
+def login(app, email: str):
+    client = app.test_client()
+    client.post("/annotator/login", data={"email": email})
+    return client
+
+
+def import_questions(admin_client, count: int, emails=("a@x.com", "b@x.com")) -> None:
+    """Upsert ``count`` questions (ids 1..count on a fresh DB), each assigned to ``emails``."""
+    rows = [QUESTIONS_HEADER]
+    for i in range(count):
+        rows.append(f'Cat{i % 2},પ્રશ્ન {i},Question {i},"Query one\nres",Ans {i},જવાબ {i},"{";".join(emails)}"')
+    admin_client.post(
+        "/admin/data",
+        data={"import_mode": "upsert", "questions_csv": (io.BytesIO("\n".join(rows).encode()), "q.csv")},
+        content_type="multipart/form-data",
+    )
+
+
+def submit(client, question_id: int, save_action: str = "submitted", **fields):
+    """POST /annotate/save with a valid form; ``fields`` override individual answers."""
+    form = {
+        "question_id": str(question_id),
+        "save_action": save_action,
+        "q_translation_rating": "4",
+        "q_translation_comment": "",
+        "search_comment": "",
+        "answer_accuracy_rating": "4",
+        "answer_translation_rating": "4",
+        "answer_comment": "",
+        **fields,
+    }
+    return client.post("/annotate/save", data=form)
+
+
+def pull_feedback(admin_client, since: str = "", **params):
+    """Incremental JSON Lines export: ``(rows, next_cursor)``."""
+    resp = admin_client.get("/admin/export/feedback.jsonl", query_string={"since": since, **params})
+    assert resp.status_code == 200, resp.data
+    rows = [json.loads(line) for line in resp.get_data(as_text=True).splitlines() if line]
+    return rows, resp.headers["X-Next-Cursor"]
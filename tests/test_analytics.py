@@ -0,0 +1,76 @@
+import analytics
+import schema
+import storage
+
+
+def agreement(conn):
+    return sorted(
+        tuple(row) for row in conn.execute("SELECT question_id, metric, n, total, total_sq FROM question_agreement WHERE n > 0")
+    )
+
+
+def rebuilt(conn):
+    conn.execute("SAVEPOINT rebuild")
+    analytics.recompute(conn)
+    rows = agreement(conn)
+    conn.execute("ROLLBACK TO rebuild")
+    conn.execute("RELEASE rebuild")
+    return rows
+
+
+def save(conn, user_id, question_id, status, ratings):
+    conn.execute(
+        """
+        INSERT INTO feedback (user_id, question_id, submission_status, q_translation_rating,
+                              answer_accuracy_rating, answer_translation_rating, created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, '2026-01-01', '2026-01-01')
+        """,
+        (user_id, question_id, status, *ratings),
+    )
+
+
+def test_trigger_aggregates_match_a_full_recompute(tmp_path):
+    conn = storage.connect(tmp_path / "app.db")
+    schema.ensure_schema(conn)
+
+    save(conn, 1, 1, "submitted", (5, 4, 3))
+    save(conn, 2, 1, "submitted", (1, 4, None))
+    save(conn, 3, 1, "draft", (2, 2, 2))
+    assert agreement(conn) == rebuilt(conn)
+    assert (1, "q_translation_rating", 2, 6, 26) in agreement(conn)
+
+    conn.execute("UPDATE feedback SET submission_status = 'submitted' WHERE user_id = 3")
+    assert agreement(conn) == rebuilt(conn)
+
+    conn.execute("UPDATE feedback SET answer_accuracy_rating = NULL WHERE user_id = 1")
+    assert agreement(conn) == rebuilt(conn)
+
+    conn.execute("UPDATE feedback SET question_id = 2 WHERE user_id = 2")
+    assert agreement(conn) == rebuilt(conn)
+    assert (2, "q_translation_rating", 1, 1, 1) in agreement(conn)
+
+    conn.execute("DELETE FROM feedback WHERE user_id = 3")
+    assert agreement(conn) == rebuilt(conn)
+    assert agreement(conn) == [
+        (1, "answer_translation_rating", 1, 3, 9),
+        (1, "q_translation_rating", 1, 5, 25),
+        (2, "answer_accuracy_rating", 1, 4, 16),
+        (2, "q_translation_rating", 1, 1, 1),
+    ]
+
+
+def test_category_summary_merges_question_sums(tmp_path):
+    conn = storage.connect(tmp_path / "app.db")
+    schema.ensure_schema(conn)
+    conn.executemany("INSERT INTO questions (category, q_gu) VALUES (?, ?)", [("A", "one"), ("A", "two"), ("B", "three")])
+    save(conn, 1, 1, "submitted", (5, 5, 5))
+    save(conn, 2, 1, "submitted", (1, 5, 5))
+    save(conn, 1, 2, "submitted", (3, 5, 5))
+    save(conn, 1, 3, "submitted", (4, 4, 4))
+
+    summary = {entry["category"]: entry["metrics"] for entry in analytics.category_summary(conn, 1.0)}
+
+    assert summary["A"]["q_translation_rating"]["n"] == 3
+    assert summary["A"]["q_translation_rating"]["mean"] == 3.0
+    assert summary["A"]["q_translation_rating"]["disputed_questions"] == 1
+    assert summary["B"]["q_translation_rating"]["questions"] == 1
@@ -0,0 +1,67 @@
+import sqlite3
+
+from conftest import import_questions, login, submit
+
+
+def draft(client, question_id, **fields):
+    return client.patch("/annotate/draft", json={"question_id": question_id, "fields": fields})
+
+
+def feedback_row(app, question_id):
+    conn = sqlite3.connect(app.config["DB_PATH"])
+    conn.row_factory = sqlite3.Row
+    try:
+        return conn.execute("SELECT * FROM feedback WHERE question_id = ?", (question_id,)).fetchone()
+    finally:
+        conn.close()
+
+
+def test_draft_saves_only_whitelisted_fields(app, admin_client):
+    import_questions(admin_client, 1, emails=("a@x.com",))
+    alice = login(app, "a@x.com")
+
+    assert draft(alice, 1, answer_comment=" half done ", q_translation_rating="4").status_code == 204
+    assert draft(alice, 1, submission_status="submitted").status_code == 400
+    assert draft(alice, 1, user_id=2).status_code == 400
+
+    row = feedback_row(app, 1)
+    assert (row["submission_status"], row["answer_comment"], row["q_translation_rating"]) == ("draft", "half done", 4)
+
+
+def test_invalid_rating_is_stored_as_null(app, admin_client):
+    import_questions(admin_client, 1, emails=("a@x.com",))
+    alice = login(app, "a@x.com")
+    draft(alice, 1, q_translation_rating="4")
+
+    assert draft(alice, 1, q_translation_rating="9", answer_accuracy_rating="x").status_code == 204
+
+    row = feedback_row(app, 1)
+    assert (row["q_translation_rating"], row["answer_accuracy_rating"]) == (None, None)
+
+
+def test_unassigned_question_is_rejected(app, admin_client):
+    import_questions(admin_client, 2, emails=("b@x.com",))
+    import_questions(admin_client, 1, emails=("a@x.com",))
+    alice = login(app, "a@x.com")
+
+    assert draft(alice, 2, answer_comment="not mine").status_code == 409
+    assert feedback_row(app, 2) is None
+
+
+def test_draft_never_overwrites_a_submitted_row(app, admin_client):
+    import_questions(admin_client, 1, emails=("a@x.com",))
+    alice = login(app, "a@x.com")
+    submit(alice, 1, answer_comment="final")
+
+    assert draft(alice, 1, answer_comment="late autosave").status_code == 409
+
+    row = feedback_row(app, 1)
+    assert (row["submission_status"], row["answer_comment"]) == ("submitted", "final")
+
+
+def test_non_object_body_is_rejected(app, admin_client):
+    import_questions(admin_client, 1, emails=("a@x.com",))
+    alice = login(app, "a@x.com")
+
+    assert alice.patch("/annotate/draft", json=[1, 2]).status_code == 400
+    assert alice.patch("/annotate/draft", json="question").status_code == 400
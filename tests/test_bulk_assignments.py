@@ -0,0 +1,41 @@
+import sqlite3
+
+from conftest import import_questions, login, submit
+
+
+def bulk(admin_client, action, operation, **form):
+    return admin_client.post(
+        "/admin/assignments", data={"action": action, "operation": operation, "pending_only": "on", **form}
+    )
+
+
+def assignment_pairs(app):
+    conn = sqlite3.connect(app.config["DB_PATH"])
+    try:
+        return sorted(conn.execute("SELECT user_id, question_id FROM assignments").fetchall())
+    finally:
+        conn.close()
+
+
+def test_clear_inactive_ignores_pending_only(app, admin_client):
+    import_questions(admin_client, 2, emails=("a@x.com",))
+    assert submit(login(app, "a@x.com"), 1).status_code in (200, 302)
+    conn = sqlite3.connect(app.config["DB_PATH"])
+    conn.execute("UPDATE questions SET active = 0")
+    conn.commit()
+    conn.close()
+
+    resp = bulk(admin_client, "bulk_preview", "clear_inactive")
+    assert resp.status_code == 200
+    bulk(admin_client, "bulk_apply", "clear_inactive")
+
+    assert assignment_pairs(app) == []
+
+
+def test_unassign_keeps_submitted_rows_when_pending_only(app, admin_client):
+    import_questions(admin_client, 2, emails=("a@x.com",))
+    submit(login(app, "a@x.com"), 1)
+
+    bulk(admin_client, "bulk_apply", "unassign")
+
+    assert assignment_pairs(app) == [(1, 1)]
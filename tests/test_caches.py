@@ -0,0 +1,80 @@
+import sqlite3
+
+import pytest
+
+import storage
+from conftest import import_questions
+
+
+def registry_with(*caches):
+    registry = storage.CacheRegistry()
+    for cache in caches:
+        registry.register(cache)
+    return registry
+
+
+def test_sync_drops_only_entries_that_read_a_changed_table():
+    users = storage.DependentCache("users", ("users",))
+    progress = storage.DependentCache("progress", ("assignments", "feedback"))
+    registry = registry_with(users, progress)
+    v1 = {"users": 1, "assignments": 1, "feedback": 1}
+    registry.sync(v1)
+    users.set(1, "alice", v1)
+    progress.set((1, "assigned"), 3, v1, depends_on=("assignments",))
+    progress.set((1, "done"), 2, v1)
+
+    assert registry.sync({**v1, "feedback": 2}) == {"feedback"}
+
+    assert users.get(1) == "alice"
+    assert progress.get((1, "assigned")) == 3
+    assert progress.get((1, "done")) is None
+    assert progress.stats()["dropped"] == 1
+
+
+def test_set_skips_values_read_before_a_newer_change():
+    cache = storage.DependentCache("users", ("users",))
+    registry = registry_with(cache)
+    registry.sync({"users": 2})
+
+    cache.set("stale", "old row", {"users": 1})
+    cache.set("fresh", "new row", {"users": 2})
+
+    assert cache.get("stale") is None
+    assert cache.get("fresh") == "new row"
+
+
+def test_entries_are_evicted_least_recently_used_first():
+    cache = storage.DependentCache("users", ("users",), max_entries=2)
+    versions = {"users": 1}
+    cache.set("a", 1, versions)
+    cache.set("b", 2, versions)
+    cache.get("a")
+    cache.set("c", 3, versions)
+
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+
+
+def test_dependencies_must_be_versioned_tables():
+    with pytest.raises(ValueError):
+        storage.DependentCache("suggestions", ("suggested_questions",))
+    cache = storage.DependentCache("users", ("users",))
+    with pytest.raises(ValueError):
+        cache.set("k", "v", {}, depends_on=("questions",))
+
+
+def test_picker_cache_sees_writes_from_other_connections(app, admin_client):
+    import_questions(admin_client, 2)
+
+    def picked():
+        resp = admin_client.get("/admin/picker/questions.json", query_string={"q": "Question"})
+        return [item["id"] for item in resp.get_json()["items"]]
+
+    assert picked() == [1, 2]
+    conn = sqlite3.connect(app.config["DB_PATH"])
+    conn.execute("INSERT INTO questions (q_gu, q_en) VALUES ('નવો', 'Question new')")
+    conn.commit()
+    conn.close()
+
+    assert picked() == [1, 2, 3]
+    caches = admin_client.get("/admin/metrics.json").get_json()["caches"]
+    assert caches["pickers"]["dropped"] >= 1
@@ -0,0 +1,81 @@
+import sqlite3
+
+import dedupe
+import storage
+from conftest import import_questions, login
+
+WATER = ("ગામમાં પાણીની સમસ્યા કેવી રીતે ઉકેલવી", "How to solve the water problem in the village")
+WATER_AGAIN = ("ગામમાં પાણીની સમસ્યા કેવી રીતે ઉકેલવી?", "How do I solve the water problem in the village")
+LOAN = ("ખેતી માટે લોન ક્યાંથી મળે", "Where can I get a loan for farming")
+
+
+def suggest(client, text):
+    q_gu, q_en = text
+    return client.post("/questions", data={"question_text_gu": q_gu, "question_text_en": q_en})
+
+
+def matches(app):
+    conn = sqlite3.connect(app.config["DB_PATH"])
+    conn.row_factory = sqlite3.Row
+    try:
+        return {row["suggestion_id"]: row for row in conn.execute("SELECT * FROM suggestion_matches")}
+    finally:
+        conn.close()
+
+
+def test_near_duplicate_suggestions_share_a_cluster(app, admin_client):
+    import_questions(admin_client, 1)
+    alice = login(app, "a@x.com")
+
+    for text in (WATER, LOAN, WATER_AGAIN):
+        assert suggest(alice, text).status_code == 200
+
+    rows = matches(app)
+    assert rows[3]["duplicate_of"] == 1
+    assert rows[3]["duplicate_score"] >= dedupe.DUPLICATE_THRESHOLD
+    assert [rows[i]["cluster_id"] for i in (1, 2, 3)] == [1, 2, 1]
+
+
+def test_match_below_threshold_starts_its_own_cluster(app, admin_client, monkeypatch):
+    import_questions(admin_client, 1)
+    alice = login(app, "a@x.com")
+    monkeypatch.setattr(dedupe, "DUPLICATE_THRESHOLD", 1.01)
+
+    suggest(alice, WATER)
+    suggest(alice, WATER_AGAIN)
+
+    row = matches(app)[2]
+    assert row["duplicate_of"] == 1
+    assert row["cluster_id"] == 2
+
+
+def test_sync_questions_reindexes_only_edited_questions(app, admin_client):
+    import_questions(admin_client, 3)
+    suggest(login(app, "a@x.com"), LOAN)
+    assert matches(app)[1]["question_id"] != 2
+
+    conn = sqlite3.connect(app.config["DB_PATH"])
+    try:
+        assert dedupe.sync_questions(conn) == 0
+        conn.execute(
+            "UPDATE questions SET q_gu = ?, q_en = ?, content_key = ? WHERE id = 2",
+            (*LOAN, storage.question_content_key("Cat1", *LOAN)),
+        )
+        assert dedupe.sync_questions(conn) == 1
+        conn.commit()
+        assert dedupe.sync_questions(conn) == 0
+    finally:
+        conn.close()
+
+    row = matches(app)[1]
+    assert (row["question_id"], row["question_score"]) == (2, 1.0)
+
+    conn = sqlite3.connect(app.config["DB_PATH"])
+    try:
+        conn.execute("UPDATE questions SET active = 0 WHERE id = 2")
+        assert dedupe.sync_questions(conn) == 0
+        conn.commit()
+    finally:
+        conn.close()
+
+    assert matches(app)[1]["question_id"] != 2
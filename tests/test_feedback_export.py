@@ -0,0 +1,55 @@
+import pytest
+
+from conftest import import_questions, login, pull_feedback, submit
+
+
+@pytest.fixture
+def app(app):
+    app.config["EXPORT_SETTLE_SECONDS"] = 0
+    return app
+
+
+def test_incremental_pull_returns_only_new_or_changed_rows(app, admin_client):
+    import_questions(admin_client, 3)
+    alice = login(app, "a@x.com")
+    submit(alice, 1)
+    submit(alice, 2)
+
+    rows, cursor = pull_feedback(admin_client)
+    assert [row["question_id"] for row in rows] == [1, 2]
+    assert pull_feedback(admin_client, cursor) == ([], cursor)
+
+    submit(login(app, "b@x.com"), 3)
+    submit(alice, 1, answer_comment="changed my mind")
+    rows, cursor = pull_feedback(admin_client, cursor)
+    assert [(row["user_email"], row["question_id"]) for row in rows] == [("b@x.com", 3), ("a@x.com", 1)]
+    assert rows[1]["answer_comment"] == "changed my mind"
+    assert pull_feedback(admin_client, cursor)[0] == []
+
+
+def test_limit_pages_through_rows_in_cursor_order(app, admin_client):
+    import_questions(admin_client, 5)
+    alice = login(app, "a@x.com")
+    for question_id in range(1, 6):
+        submit(alice, question_id)
+
+    seen, cursor = [], ""
+    while True:
+        rows, cursor = pull_feedback(admin_client, cursor, limit=2)
+        if not rows:
+            break
+        assert len(rows) <= 2
+        seen.extend(row["question_id"] for row in rows)
+    assert seen == [1, 2, 3, 4, 5]
+
+
+def test_settle_window_holds_back_fresh_rows(app, admin_client):
+    app.config["EXPORT_SETTLE_SECONDS"] = 3600
+    import_questions(admin_client, 1)
+    submit(login(app, "a@x.com"), 1)
+    assert pull_feedback(admin_client) == ([], "")
+
+
+def test_invalid_cursor_is_rejected(admin_client):
+    resp = admin_client.get("/admin/export/feedback.jsonl?since=not-a-cursor")
+    assert resp.status_code == 400
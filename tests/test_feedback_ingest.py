@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from conftest import import_questions, login, pull_feedback, submit
+from feedback import _timestamp
+
+
+@pytest.fixture
+def app(app):
+    app.config["EXPORT_SETTLE_SECONDS"] = 0
+    return app
+
+
+def ingest(admin_client, rows):
+    body = "\n".join(json.dumps(row) for row in rows)
+    resp = admin_client.post("/admin/feedback/ingest?format=jsonl", data=body.encode())
+    assert resp.status_code == 200, resp.data
+    return resp.get_json()
+
+
+def test_ingested_changes_reach_the_next_incremental_export(app, admin_client):
+    import_questions(admin_client, 2)
+    alice = login(app, "a@x.com")
+    submit(alice, 1)
+    submit(alice, 2)
+    exported, cursor = pull_feedback(admin_client)
+
+    edited = {**exported[0], "answer_comment": "fixed offline"}
+    result = ingest(admin_client, [edited, exported[1]])
+    assert (result["saved"], result["unchanged"]) == (1, 1)
+
+    rows, _cursor = pull_feedback(admin_client, cursor)
+    assert [(row["question_id"], row["answer_comment"]) for row in rows] == [(1, "fixed offline")]
+    assert rows[0]["created_at"] == exported[0]["created_at"]
+    assert rows[0]["updated_at"] > exported[0]["updated_at"]
+
+
+def test_new_rows_keep_the_callers_created_at(app, admin_client):
+    import_questions(admin_client, 1)
+    row = {
+        "user_email": "b@x.com",
+        "question_id": 1,
+        "q_translation_rating": 4,
+        "answer_accuracy_rating": 4,
+        "answer_translation_rating": 4,
+        "created_at": "2025-03-01T10:00:00+05:30",
+        "updated_at": "2000-01-01",
+    }
+    assert ingest(admin_client, [row])["saved"] == 1
+
+    (exported,), _cursor = pull_feedback(admin_client)
+    assert exported["created_at"] == "2025-03-01T04:30:00"
+    assert exported["updated_at"] > exported["created_at"]
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("2026-01-02", "2026-01-02T00:00:00"),
+        ("2026-01-02 07:15:00", "2026-01-02T07:15:00"),
+        ("2026-01-02T05:30:00+05:30", "2026-01-02T00:00:00"),
+        ("2026-01-02T00:00:00.250000Z", "2026-01-02T00:00:00.250000"),
+        ("  ", None),
+    ],
+)
+def test_timestamps_normalize_to_naive_utc(value, expected):
+    assert _timestamp(value) == expected
@@ -0,0 +1,115 @@
+import os
+import re
+import sqlite3
+import subprocess
+import sys
+
+from conftest import ROOT_DIR
+
+GOLDEN_HEADER = "Category,Q (Gu),Q (En),Search Results,A(En),A (Gu)"
+
+
+def write_golden(path, answers):
+    lines = [GOLDEN_HEADER] + [f"Cat,પ્રશ્ન {i},Question {i},results,{answer},જવાબ" for i, answer in answers.items()]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def run_init(tmp_path, *args):
+    eval_sheet = tmp_path / "eval.csv"
+    if not eval_sheet.exists():
+        eval_sheet.write_text("Category,Q (Gu),Q (En),Members\nCat,પ્રશ્ન 1,Question 1,a@x.com\n", encoding="utf-8")
+    result = subprocess.run(
+        [
+            sys.executable,
+            str(ROOT_DIR / "scripts" / "init_from_sheets.py"),
+            "--db",
+            str(tmp_path / "app.db"),
+            "--golden-sheet",
+            str(tmp_path / "golden.csv"),
+            "--eval-sheet",
+            str(eval_sheet),
+            *args,
+        ],
+        capture_output=True,
+        text=True,
+        cwd=ROOT_DIR,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    return result.stdout
+
+
+def golden_counts(output):
+    match = re.search(r"golden_rows inserted=(\d+) changed=(\d+) unchanged=(\d+) deactivated=(\d+)", output)
+    assert match, output
+    return dict(zip(("inserted", "changed", "unchanged", "deactivated"), map(int, match.groups())))
+
+
+def test_golden_upsert_counts(tmp_path):
+    golden = tmp_path / "golden.csv"
+    write_golden(golden, {1: "one", 2: "two", 3: "three"})
+    assert golden_counts(run_init(tmp_path)) == {"inserted": 3, "changed": 0, "unchanged": 0, "deactivated": 0}
+
+    assert golden_counts(run_init(tmp_path, "--force")) == {
+        "inserted": 0,
+        "changed": 0,
+        "unchanged": 3,
+        "deactivated": 0,
+    }
+
+    write_golden(golden, {1: "one", 2: "two, revised", 3: "three", 4: "four"})
+    assert golden_counts(run_init(tmp_path)) == {"inserted": 1, "changed": 1, "unchanged": 2, "deactivated": 0}
+
+    write_golden(golden, {1: "one", 2: "two, revised"})
+    assert golden_counts(run_init(tmp_path, "--sync-active")) == {
+        "inserted": 0,
+        "changed": 0,
+        "unchanged": 2,
+        "deactivated": 2,
+    }
+
+
+def fingerprint_rows(tmp_path):
+    conn = sqlite3.connect(tmp_path / "app.db")
+    try:
+        return {row[0]: row[1:] for row in conn.execute("SELECT source, mtime_ns, loaded_at FROM import_fingerprints")}
+    finally:
+        conn.close()
+
+
+def test_unchanged_sheets_skip_without_rewriting_fingerprints(tmp_path):
+    write_golden(tmp_path / "golden.csv", {1: "one"})
+    run_init(tmp_path)
+    loaded = fingerprint_rows(tmp_path)
+
+    output = run_init(tmp_path)
+
+    assert "skipped=1" in output
+    assert fingerprint_rows(tmp_path) == loaded
+
+
+def test_touched_but_identical_sheet_keeps_loaded_at(tmp_path):
+    golden = tmp_path / "golden.csv"
+    write_golden(golden, {1: "one"})
+    run_init(tmp_path)
+    loaded = fingerprint_rows(tmp_path)
+    stat = golden.stat()
+    os.utime(golden, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+
+    assert "skipped=1" in run_init(tmp_path)
+
+    mtime_ns, loaded_at = fingerprint_rows(tmp_path)["golden"]
+    assert mtime_ns == stat.st_mtime_ns + 5_000_000_000
+    assert loaded_at == loaded["golden"][1]
+    assert fingerprint_rows(tmp_path)["eval"] == loaded["eval"]
+
+
+def test_force_reloads_and_records_a_new_load(tmp_path):
+    write_golden(tmp_path / "golden.csv", {1: "one"})
+    run_init(tmp_path)
+    loaded = fingerprint_rows(tmp_path)
+
+    output = run_init(tmp_path, "--force")
+
+    assert "skipped=1" not in output
+    assert golden_counts(output)["unchanged"] == 1
+    assert fingerprint_rows(tmp_path)["golden"][1] > loaded["golden"][1]
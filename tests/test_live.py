@@ -0,0 +1,94 @@
+import json
+import time
+
+import live
+import schema
+import storage
+from conftest import import_questions
+
+
+def make_db(tmp_path):
+    db_path = tmp_path / "app.db"
+    conn = storage.connect(db_path)
+    schema.ensure_schema(conn)
+    conn.execute("INSERT INTO users (email, email_norm) VALUES ('a@x.com', 'a@x.com')")
+    conn.execute("INSERT INTO questions (q_gu, q_en) VALUES ('પ્રશ્ન', 'Question')")
+    conn.commit()
+    return db_path, conn
+
+
+def next_event(subscriber):
+    event_id, payload = subscriber.get(timeout=5)
+    return event_id, json.loads(payload)
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_subscribers_start_with_the_current_full_state(tmp_path):
+    db_path, conn = make_db(tmp_path)
+    broadcaster = live.ProgressBroadcaster(db_path, poll_interval=0.01)
+    first = broadcaster.subscribe()
+    try:
+        assert next_event(first) == (
+            0,
+            {
+                "users": {"1": {"assigned": 0, "completed": 0, "drafts": 0}},
+                "questions": {"1": {"assigned_count": 0, "completed_count": 0}},
+                "metrics": {"total_questions": 1, "unassigned": 1, "partial": 0, "full": 0},
+            },
+        )
+
+        conn.execute("INSERT INTO assignments (user_id, question_id) VALUES (1, 1)")
+        conn.commit()
+        event_id, delta = next_event(first)
+        assert event_id == 1
+        assert delta["questions"] == {"1": {"assigned_count": 1, "completed_count": 0}}
+
+        second = broadcaster.subscribe()
+        event_id, state = next_event(second)
+        assert event_id == 1
+        assert state["users"]["1"]["assigned"] == 1
+        broadcaster.unsubscribe(second)
+    finally:
+        broadcaster.unsubscribe(first)
+
+
+def test_writes_to_unwatched_tables_do_not_recompute(tmp_path):
+    db_path, conn = make_db(tmp_path)
+    broadcaster = live.ProgressBroadcaster(db_path, poll_interval=0.01)
+    subscriber = broadcaster.subscribe()
+    try:
+        next_event(subscriber)
+        recomputes = broadcaster.stats()["recomputes"]
+        conn.execute(
+            "INSERT INTO suggested_questions (user_id, question_text_gu, created_at) VALUES (1, 'x', '2026-01-01')"
+        )
+        conn.commit()
+        time.sleep(0.2)
+        assert broadcaster.stats()["recomputes"] == recomputes
+
+        conn.execute("INSERT INTO assignments (user_id, question_id) VALUES (1, 1)")
+        conn.commit()
+        wait_for(lambda: broadcaster.stats()["recomputes"] > recomputes)
+    finally:
+        broadcaster.unsubscribe(subscriber)
+
+
+def test_stream_reconnect_starts_with_a_snapshot(app, admin_client):
+    import_questions(admin_client, 2, emails=("a@x.com",))
+    resp = admin_client.get("/admin/assignments/stream", headers={"Last-Event-ID": "42"}, buffered=False)
+    try:
+        chunks = (chunk.decode() for chunk in resp.response)
+        assert next(chunks).startswith("retry:")
+        lines = next(chunks).splitlines()
+        assert lines[:2] == ["id: 0", "event: progress"]
+        state = json.loads(lines[2][len("data: "):])
+        assert state["metrics"]["total_questions"] == 2
+        assert state["users"]["1"]["assigned"] == 2
+    finally:
+        resp.close()
@@ -0,0 +1,79 @@
+import sqlite3
+import threading
+
+import maintenance
+import schema
+import storage
+
+
+def make_db(path, rows=0):
+    conn = storage.connect(path)
+    schema.ensure_schema(conn)
+    conn.executemany(
+        "INSERT INTO questions (q_gu, q_en, search_results) VALUES (?, ?, ?)",
+        [(f"q{i}", f"q{i}", "x" * 2000) for i in range(rows)],
+    )
+    conn.commit()
+    return conn
+
+
+def statuses(results):
+    return {r["task"]: r["status"] for r in results}
+
+
+def test_tasks_run_and_are_recorded(tmp_path):
+    db_path = tmp_path / "app.db"
+    conn = make_db(db_path, rows=500)
+    conn.execute("DELETE FROM questions")
+    conn.commit()
+
+    results = maintenance.run(db_path, tasks=list(maintenance.TASKS), trigger="test")
+
+    assert statuses(results) == {task: "ok" for task in maintenance.TASKS}
+    vacuum = next(r for r in results if r["task"] == "incremental_vacuum")
+    assert vacuum["bytes_reclaimed"] > 0
+    assert conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
+    recorded = [(r["task"], r["trigger"]) for r in maintenance.recent_runs(conn)]
+    assert sorted(recorded) == sorted((task, "test") for task in maintenance.TASKS)
+
+
+def test_spent_budget_skips_remaining_tasks(tmp_path):
+    db_path = tmp_path / "app.db"
+    make_db(db_path)
+
+    results = maintenance.run(db_path, tasks=["optimize", "checkpoint"], budget_seconds=0)
+
+    assert statuses(results) == {"optimize": "skipped", "checkpoint": "skipped"}
+    assert {r["detail"] for r in results} == {"time budget spent"}
+
+
+def test_incremental_vacuum_is_skipped_without_incremental_mode(tmp_path):
+    db_path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE legacy (id INTEGER PRIMARY KEY)")
+    conn.commit()
+    schema.ensure_schema(storage.connect(db_path))
+    assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 0
+
+    (result,) = maintenance.run(db_path, tasks=["incremental_vacuum"])
+
+    assert result["status"] == "skipped"
+    assert "maintain_db.py" in result["detail"]
+
+
+def test_locked_database_reports_busy(tmp_path):
+    db_path = tmp_path / "app.db"
+    make_db(db_path, rows=10)
+    holder = sqlite3.connect(db_path, check_same_thread=False)
+    holder.execute("BEGIN IMMEDIATE")
+    # Released after ANALYZE gave up, before the run's own bookkeeping write times out.
+    release = threading.Timer(maintenance.BUSY_TIMEOUT_MS / 1000.0 + 1.0, holder.rollback)
+    release.start()
+    try:
+        (result,) = maintenance.run(db_path, tasks=["analyze"])
+    finally:
+        release.join()
+        holder.close()
+
+    assert result["status"] == "busy"
+    assert "locked" in result["detail"]
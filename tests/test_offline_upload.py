@@ -0,0 +1,73 @@
+import gzip
+import json
+
+import feedback
+import schema
+import storage
+from conftest import import_questions, login
+
+ANSWERS = {
+    "q_translation_rating": "4",
+    "q_translation_comment": "",
+    "search_comment": "",
+    "answer_accuracy_rating": "4",
+    "answer_translation_rating": "4",
+    "answer_comment": "",
+}
+
+
+def test_replay_guard_skips_identical_rows_and_draft_reverts(tmp_path):
+    conn = storage.connect(tmp_path / "app.db")
+    schema.ensure_schema(conn)
+    submitted = feedback.clean_form(ANSWERS)
+    edited = feedback.clean_form({**ANSWERS, "answer_comment": "typo fixed"})
+
+    def replay(save_action, form_data, now):
+        return feedback.upsert(conn, 1, 1, save_action, form_data, now, replay=True)
+
+    assert replay("submitted", submitted, "2026-01-01T00:00:00") == 1
+    assert replay("submitted", submitted, "2026-01-02T00:00:00") == 0
+    assert replay("draft", edited, "2026-01-03T00:00:00") == 0
+    assert replay("submitted", edited, "2026-01-04T00:00:00") == 1
+    row = conn.execute("SELECT submission_status, answer_comment, updated_at FROM feedback").fetchone()
+    assert tuple(row) == ("submitted", "typo fixed", "2026-01-04T00:00:00")
+
+
+def upload(client, body: bytes, gzipped: bool = True):
+    headers = {"Content-Type": "application/json"}
+    if gzipped:
+        headers["Content-Encoding"] = "gzip"
+    return client.post("/annotate/bundle/upload", data=body, headers=headers)
+
+
+def test_bundle_upload_is_safe_to_retry(app, admin_client):
+    import_questions(admin_client, 2, emails=("a@x.com",))
+    alice = login(app, "a@x.com")
+    body = gzip.compress(json.dumps({"items": [{"question_id": 1, "fields": ANSWERS}]}).encode())
+
+    first = upload(alice, body).get_json()
+    second = upload(alice, body).get_json()
+
+    assert (first["saved"], first["unchanged"]) == (1, 0)
+    assert (second["saved"], second["unchanged"]) == (0, 1)
+
+
+def test_gzip_bodies_are_capped_after_decompression(app, admin_client):
+    app.config["MAX_CONTENT_LENGTH"] = 64 * 1024
+    import_questions(admin_client, 1, emails=("a@x.com",))
+    alice = login(app, "a@x.com")
+    bomb = gzip.compress(b'{"items": [' + b" " * (1024 * 1024) + b"]}")
+    assert len(bomb) < 64 * 1024
+
+    assert upload(alice, bomb).status_code == 413
+    resp = admin_client.post(
+        "/admin/feedback/ingest", data=bomb, headers={"Content-Encoding": "gzip", "Content-Type": "text/csv"}
+    )
+    assert resp.status_code == 413
+    assert upload(alice, b"not gzip").status_code == 400
+    assert upload(alice, gzip.compress(b'{"items": []}')[:-4]).status_code == 400
+
+
+def test_gunzip_reads_every_member():
+    body = gzip.compress(b"one,") + gzip.compress(b"two")
+    assert storage.gunzip(body, 7) == b"one,two"
@@ -0,0 +1,40 @@
+import sqlite3
+
+from conftest import import_questions
+
+
+def pick(admin_client, q, after="", limit=2):
+    resp = admin_client.get("/admin/picker/questions.json", query_string={"q": q, "after": after, "limit": limit})
+    assert resp.status_code == 200
+    return resp.get_json()
+
+
+def test_question_prefix_search_pages_across_both_columns(app, admin_client):
+    import_questions(admin_client, 12)
+    conn = sqlite3.connect(app.config["DB_PATH"])
+    conn.execute("UPDATE questions SET q_gu = 'question 1 alt' WHERE id = 5")
+    conn.execute("UPDATE questions SET active = 0 WHERE id = 11")
+    conn.commit()
+    conn.close()
+
+    pages, after = [], ""
+    while True:
+        page = pick(admin_client, "question 1", after)
+        pages.append([item["id"] for item in page["items"]])
+        if page["next"] is None:
+            break
+        after = page["next"]
+
+    # q_en matches 2, 11 and 12 case-insensitively; q_gu matches 5; 11 is inactive.
+    assert pages == [[2, 5], [12]]
+
+
+def test_gujarati_prefix_and_id_search(app, admin_client):
+    import_questions(admin_client, 12)
+
+    page = pick(admin_client, "પ્રશ્ન 1", limit=5)
+    assert [item["id"] for item in page["items"]] == [2, 11, 12]
+    assert page["next"] is None
+
+    page = pick(admin_client, "#11", limit=5)
+    assert [item["id"] for item in page["items"]] == [11, 12]
@@ -0,0 +1,55 @@
+import schema
+import storage
+
+
+def make_conn(tmp_path):
+    conn = storage.connect(tmp_path / "app.db")
+    schema.ensure_schema(conn)
+    return conn
+
+
+def row(i, answer="answer"):
+    return ("Cat", f"પ્રશ્ન {i}", f"Question {i}", "results", f"{answer} {i}", f"જવાબ {i}")
+
+
+def test_upsert_many_returns_the_id_of_every_row(tmp_path):
+    conn = make_conn(tmp_path)
+    sync = storage.QuestionSync(conn)
+    first = sync.upsert_many([row(i) for i in range(250)])
+
+    stored = dict(conn.execute("SELECT q_en, id FROM questions").fetchall())
+    assert sorted(first) == sorted(stored.values())
+    assert len(set(first)) == 250
+
+    again = storage.QuestionSync(conn).upsert_many([row(3), row(300)])
+    assert again[0] == stored["Question 3"]
+    assert again[1] == conn.execute("SELECT id FROM questions WHERE q_en = 'Question 300'").fetchone()[0]
+
+
+def test_single_insert_returns_the_new_id(tmp_path):
+    conn = make_conn(tmp_path)
+    question_id = storage.QuestionSync(conn).upsert(row(1))
+    assert conn.execute("SELECT q_en FROM questions WHERE id = ?", (question_id,)).fetchone()[0] == "Question 1"
+
+
+def test_counts_classify_each_row(tmp_path):
+    conn = make_conn(tmp_path)
+    storage.QuestionSync(conn).upsert_many([row(1), row(2), row(3)])
+    conn.execute("UPDATE questions SET active = 0 WHERE q_en = 'Question 3'")
+
+    sync = storage.QuestionSync(conn)
+    sync.upsert_many([row(1), row(2, answer="edited"), row(3), row(4)])
+
+    # A deactivated row that comes back is rewritten (reactivated), so it counts as changed.
+    assert sync.counts == {"inserted": 1, "changed": 2, "unchanged": 1}
+
+
+def test_upsert_by_id_rewrites_in_place(tmp_path):
+    conn = make_conn(tmp_path)
+    question_id = storage.QuestionSync(conn).upsert(row(1))
+
+    sync = storage.QuestionSync(conn)
+    assert sync.upsert(row(1), question_id=question_id) == question_id
+    assert sync.upsert(row(5), question_id=question_id) == question_id
+    assert sync.counts == {"inserted": 0, "changed": 1, "unchanged": 1}
+    assert conn.execute("SELECT q_en FROM questions").fetchall()[0][0] == "Question 5"
@@ -0,0 +1,130 @@
+import sqlite3
+
+import pytest
+
+import queueing
+from conftest import import_questions, login, submit
+
+
+def connect(app):
+    conn = sqlite3.connect(app.config["DB_PATH"])
+    conn.isolation_level = None
+    return conn
+
+
+def user_id(app, email):
+    conn = connect(app)
+    try:
+        return conn.execute("SELECT id FROM users WHERE email = ?", (email,)).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def queue(app, email):
+    conn = connect(app)
+    try:
+        return [
+            row[0]
+            for row in conn.execute(
+                "SELECT question_id FROM assignments WHERE user_id = ? ORDER BY priority DESC, question_id",
+                (user_id(app, email),),
+            )
+        ]
+    finally:
+        conn.close()
+
+
+def queue_state(conn):
+    return (
+        conn.execute("SELECT id, priority FROM assignments ORDER BY id").fetchall(),
+        conn.execute("SELECT * FROM queue_categories ORDER BY category").fetchall(),
+        conn.execute("SELECT * FROM queue_questions ORDER BY question_id").fetchall(),
+    )
+
+
+def assert_matches_full_refresh(app):
+    conn = connect(app)
+    try:
+        incremental = queue_state(conn)
+        conn.execute("SAVEPOINT recompute")
+        queueing.refresh_all(conn)
+        full = queue_state(conn)
+        conn.execute("ROLLBACK TO recompute")
+        conn.execute("RELEASE recompute")
+    finally:
+        conn.close()
+    assert incremental == full
+
+
+def draft(client, question_id, **fields):
+    return client.patch("/annotate/draft", json={"question_id": question_id, "fields": fields})
+
+
+def test_completion_ordering_serves_drafts_then_nearly_done_questions(app, admin_client):
+    import_questions(admin_client, 4)
+    alice, bob = login(app, "a@x.com"), login(app, "b@x.com")
+    assert queue(app, "a@x.com") == [1, 2, 3, 4]
+
+    submit(bob, 2)
+    assert queue(app, "a@x.com") == [2, 1, 3, 4]
+
+    assert draft(alice, 4, answer_comment="started").status_code == 204
+    assert queue(app, "a@x.com") == [4, 2, 1, 3]
+
+
+def test_id_ordering_restores_lowest_id_first(app, admin_client):
+    import_questions(admin_client, 3)
+    submit(login(app, "b@x.com"), 3)
+    conn = connect(app)
+    try:
+        assert queueing.configure(conn, "id") is True
+        assert queueing.configure(conn, "id") is False
+        with pytest.raises(ValueError):
+            queueing.configure(conn, "random")
+    finally:
+        conn.close()
+
+    assert queue(app, "a@x.com") == [1, 2, 3]
+
+
+def test_submit_refresh_matches_full_recompute(app, admin_client):
+    import_questions(admin_client, 4)
+    alice, bob = login(app, "a@x.com"), login(app, "b@x.com")
+
+    for client, question_id in [(bob, 1), (alice, 1), (bob, 3), (alice, 3), (alice, 2)]:
+        submit(client, question_id)
+        assert_matches_full_refresh(app)
+
+    conn = connect(app)
+    try:
+        assert conn.execute("SELECT lag FROM queue_categories WHERE category = 'Cat0'").fetchone() == (0.0,)
+    finally:
+        conn.close()
+
+
+def test_draft_refresh_matches_full_recompute(app, admin_client):
+    import_questions(admin_client, 2)
+    alice = login(app, "a@x.com")
+
+    draft(alice, 2, answer_comment="first pass")
+    assert_matches_full_refresh(app)
+    submit(alice, 2)
+    assert_matches_full_refresh(app)
+
+
+def test_assignment_changes_refresh_matches_full_recompute(app, admin_client):
+    import_questions(admin_client, 2, emails=("a@x.com", "b@x.com"))
+    bob_id = str(user_id(app, "b@x.com"))
+    submit(login(app, "a@x.com"), 1)
+    submit(login(app, "b@x.com"), 1)
+    assert_matches_full_refresh(app)
+
+    admin_client.post(
+        "/admin/assignments", data={"action": "bulk_apply", "operation": "unassign", "pending_only": "on", "user_id": bob_id}
+    )
+    assert queue(app, "b@x.com") == [1]
+    assert_matches_full_refresh(app)
+
+    admin_client.post("/admin/assignments", data={"action": "manual", "user_id": bob_id, "question_id": "2"})
+    assert queue(app, "b@x.com") == [1, 2]
+    assert_matches_full_refresh(app)
@@ -0,0 +1,57 @@
+import sqlite3
+import time
+
+import schema
+
+
+def test_new_databases_use_incremental_auto_vacuum(tmp_path):
+    conn = sqlite3.connect(tmp_path / "app.db")
+    conn.row_factory = sqlite3.Row
+    schema.ensure_schema(conn)
+    assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_schema_check_on_an_up_to_date_db_takes_no_write_lock(tmp_path):
+    db_path = tmp_path / "app.db"
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    schema.ensure_schema(conn)
+    conn.close()
+
+    holder = sqlite3.connect(db_path)
+    holder.execute("BEGIN IMMEDIATE")
+    try:
+        conn = sqlite3.connect(db_path, timeout=0.2)
+        conn.row_factory = sqlite3.Row
+        schema.ensure_schema(conn)
+        conn.close()
+    finally:
+        holder.rollback()
+        holder.close()
+
+
+def test_table_versions_are_seeded_once(tmp_path):
+    conn = sqlite3.connect(tmp_path / "app.db")
+    conn.row_factory = sqlite3.Row
+    schema.ensure_schema(conn)
+    conn.execute("INSERT INTO users (email, email_norm) VALUES ('a@x.com', 'a@x.com')")
+    conn.commit()
+    schema.ensure_schema(conn)
+    versions = dict(conn.execute("SELECT name, version FROM table_versions").fetchall())
+    assert versions == {"users": 1, "questions": 0, "assignments": 0, "feedback": 0}
+
+
+def test_requests_do_not_wait_on_another_writer(app):
+    client = app.test_client()
+    assert client.get("/annotator/login").status_code == 200
+
+    holder = sqlite3.connect(app.config["DB_PATH"])
+    holder.execute("BEGIN IMMEDIATE")
+    try:
+        started = time.monotonic()
+        assert client.get("/annotator/login").status_code == 200
+        assert time.monotonic() - started < 1.0
+    finally:
+        holder.rollback()
+        holder.close()
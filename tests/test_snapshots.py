@@ -0,0 +1,132 @@
+import sqlite3
+
+import pytest
+
+import replica
+import snapshots
+from conftest import import_questions
+
+
+def touch(directory, name):
+    path = directory / name
+    path.write_bytes(b"")
+    return path
+
+
+def test_prune_keeps_newest_and_leaves_other_datasets_alone(tmp_path):
+    own = [touch(tmp_path, f"app-2026010{day}T101112000000Z.db.gz") for day in range(1, 5)]
+    other = [touch(tmp_path, f"app-eval-2026010{day}T101112000000Z.db.gz") for day in range(1, 3)]
+
+    removed = snapshots.prune_snapshots(tmp_path, "app", keep=2)
+
+    assert removed == own[:2]
+    assert sorted(p for p in tmp_path.iterdir()) == sorted(own[2:] + other)
+    assert snapshots.list_snapshots(tmp_path, "app-eval") == other
+
+
+def test_create_and_restore_round_trip(tmp_path):
+    db_path = tmp_path / "app.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE t (v TEXT)")
+    conn.execute("INSERT INTO t VALUES ('kept')")
+    conn.commit()
+
+    info = snapshots.create_snapshot(db_path, tmp_path / "snaps")
+    conn.execute("DELETE FROM t")
+    conn.commit()
+    conn.close()
+    assert [str(p) for p in snapshots.list_snapshots(tmp_path / "snaps", "app")] == [info["path"]]
+
+    snapshots.restore_snapshot(info["path"], db_path)
+    assert sqlite3.connect(db_path).execute("SELECT v FROM t").fetchall() == [("kept",)]
+
+
+def make_db(path, rows):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE t (v TEXT)")
+    conn.executemany("INSERT INTO t VALUES (?)", [(row,) for row in rows])
+    conn.commit()
+    conn.close()
+
+
+def add_row(path, value):
+    conn = sqlite3.connect(path)
+    conn.execute("INSERT INTO t VALUES (?)", (value,))
+    conn.commit()
+    conn.close()
+
+
+def values(conn):
+    return [row[0] for row in conn.execute("SELECT v FROM t ORDER BY v")]
+
+
+def test_replica_refresh_picks_up_writes_and_skips_idle_copies(tmp_path):
+    make_db(tmp_path / "app.db", ["a"])
+    report = replica.ReportingReplica(tmp_path / "app.db", tmp_path / "replicas", max_age_seconds=3600)
+    report.ensure_fresh()
+    add_row(tmp_path / "app.db", "b")
+
+    report.ensure_fresh()
+    assert values(report.connect()) == ["a"]
+    report.refresh()
+    assert values(report.connect()) == ["a", "b"]
+
+    report.refresh()
+    assert (report.refreshes, report.copies) == (3, 2)
+    assert report.status()["stale"] is False
+
+
+def test_failed_refresh_keeps_serving_the_previous_copy(tmp_path, monkeypatch):
+    make_db(tmp_path / "app.db", ["a"])
+    report = replica.ReportingReplica(tmp_path / "app.db", tmp_path / "replicas", max_age_seconds=3600)
+    report.refresh()
+    add_row(tmp_path / "app.db", "b")
+
+    def fail(*_args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(replica.os, "replace", fail)
+    with pytest.raises(OSError):
+        report.refresh()
+
+    assert report.status()["last_error"] == "OSError: disk full"
+    assert values(report.connect()) == ["a"]
+
+
+def test_open_readers_keep_their_copy_while_it_is_replaced(tmp_path):
+    make_db(tmp_path / "app.db", ["a"])
+    report = replica.ReportingReplica(tmp_path / "app.db", tmp_path / "replicas", max_age_seconds=3600, pages=1)
+    report.refresh()
+    reader = report.connect()
+    assert values(reader) == ["a"]
+
+    add_row(tmp_path / "app.db", "b")
+    report.refresh()
+
+    assert values(reader) == ["a"]
+    assert values(report.connect()) == ["a", "b"]
+
+
+def test_reports_use_the_primary_without_a_replica(app, admin_client):
+    import_questions(admin_client, 1)
+
+    resp = admin_client.get("/admin/export/questions.csv")
+
+    assert "X-Data-As-Of" not in resp.headers
+    assert resp.get_data(as_text=True).count("Question 0") == 1
+    assert admin_client.get("/admin/metrics.json").get_json()["report_replica"] is None
+
+
+def test_admin_write_refreshes_the_replica(app, admin_client, tmp_path):
+    app.config["REPORT_REPLICA_MAX_AGE_SECONDS"] = 3600
+    app.config["REPORT_REPLICA_DIR"] = tmp_path / "replicas"
+    import_questions(admin_client, 1)
+    assert "Question 0" in admin_client.get("/admin/export/questions.csv").get_data(as_text=True)
+
+    import_questions(admin_client, 2)
+    resp = admin_client.get("/admin/export/questions.csv")
+    assert resp.headers["X-Data-As-Of"]
+    assert "Question 1" not in resp.get_data(as_text=True)
+
+    admin_client.post("/admin/assignments", data={"action": "manual", "user_id": "1", "question_id": "2"})
+    assert "Question 1" in admin_client.get("/admin/export/questions.csv").get_data(as_text=True)
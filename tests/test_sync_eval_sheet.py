@@ -0,0 +1,138 @@
+import os
+import sqlite3
+import subprocess
+import sys
+
+import datasets
+from conftest import ROOT_DIR
+
+# Schema as created before the content_key/email_norm/table_versions migrations.
+LEGACY_SCHEMA = """
+CREATE TABLE users (id INTEGER PRIMARY KEY AUTOINCREMENT, email TEXT NOT NULL UNIQUE, username TEXT,
+                    is_admin INTEGER NOT NULL DEFAULT 0);
+CREATE TABLE questions (id INTEGER PRIMARY KEY AUTOINCREMENT, category TEXT, q_gu TEXT NOT NULL, q_en TEXT,
+                        search_results TEXT, a_en TEXT, a_gu TEXT, active INTEGER NOT NULL DEFAULT 1);
+CREATE UNIQUE INDEX idx_questions_unique ON questions(category, q_gu, q_en);
+CREATE TABLE assignments (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER NOT NULL,
+                          question_id INTEGER NOT NULL, UNIQUE(user_id, question_id));
+CREATE TABLE feedback (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER NOT NULL, question_id INTEGER NOT NULL,
+                       submission_status TEXT NOT NULL DEFAULT 'submitted', q_translation_rating INTEGER,
+                       q_translation_comment TEXT, search_rating INTEGER, search_issue_type TEXT, search_comment TEXT,
+                       answer_accuracy_rating INTEGER, answer_translation_rating INTEGER, answer_comment TEXT,
+                       created_at TEXT NOT NULL, updated_at TEXT NOT NULL, UNIQUE(user_id, question_id));
+INSERT INTO questions (category, q_gu, q_en) VALUES ('A', 'પ્રશ્ન એક', 'Question one'), ('B', 'પ્રશ્ન બે', 'Question two');
+"""
+
+
+def run_sync(db_path, sheet_path, *args, env=None, cwd=ROOT_DIR):
+    return subprocess.run(
+        [
+            sys.executable,
+            str(ROOT_DIR / "scripts" / "sync_eval_sheet.py"),
+            "--db",
+            str(db_path),
+            "--sheet",
+            str(sheet_path),
+            "--apply",
+            *args,
+        ],
+        capture_output=True,
+        text=True,
+        cwd=cwd,
+        env=env,
+    )
+
+
+def test_sync_migrates_a_legacy_db_before_writing(tmp_path):
+    db_path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(db_path)
+    conn.executescript(LEGACY_SCHEMA)
+    conn.close()
+    sheet = tmp_path / "eval.csv"
+    sheet.write_text(
+        "Category,Q (Gu),Q (En),Members\n"
+        "A,પ્રશ્ન એક,Question one,a@x.com; b@x.com\n"
+        "B,પ્રશ્ન બે,Question two,b@x.com\n",
+        encoding="utf-8",
+    )
+
+    result = run_sync(db_path, sheet)
+
+    assert result.returncode == 0, result.stderr
+    assert "applied=1 users=2 assignments=3" in result.stdout
+    conn = sqlite3.connect(db_path)
+    question_columns = {row[1] for row in conn.execute("PRAGMA table_info(questions)")}
+    assert {"content_key", "payload_hash"} <= question_columns
+    assert conn.execute("SELECT COUNT(*) FROM questions WHERE content_key IS NULL").fetchone()[0] == 0
+    versions = dict(conn.execute("SELECT name, version FROM table_versions"))
+    assert versions["assignments"] > 0
+
+
+
+def test_dataset_is_resolved_through_the_env_catalog(tmp_path):
+    catalog_path = tmp_path / "mounted" / "catalog.db"
+    datasets_dir = tmp_path / "mounted" / "datasets"
+    db_path = datasets.DatasetCatalog(catalog_path, tmp_path / "app.db", datasets_dir).create("pilot")
+    conn = sqlite3.connect(db_path)
+    conn.executescript(LEGACY_SCHEMA)
+    conn.close()
+    sheet = tmp_path / "eval.csv"
+    sheet.write_text("Category,Q (Gu),Q (En),Members\nA,પ્રશ્ન એક,Question one,a@x.com\n", encoding="utf-8")
+    env = {**os.environ, "CATALOG_PATH": str(catalog_path), "DATASETS_DIR": str(datasets_dir)}
+
+    result = run_sync(tmp_path / "app.db", sheet, "--dataset", "pilot", env=env, cwd=tmp_path)
+
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "applied=1 users=1 assignments=1" in result.stdout
+
+
+def fuzzy_index(questions):
+    from similarity import NgramIndex
+
+    index = NgramIndex(weights={"q_gu": 0.7, "q_en": 0.3})
+    for qid, q_en in questions.items():
+        index.add(qid, {"q_gu": q_en, "q_en": q_en})
+    return index
+
+
+def entry(q_en):
+    return {"category": "", "q_gu": q_en, "q_en": q_en, "members": ["a@x.com"]}
+
+
+def test_fuzzy_mapping_never_reuses_a_taken_question():
+    from scripts.sync_eval_sheet import fuzzy_map_entries
+
+    index = fuzzy_index({1: "How do I store milk powder safely", 2: "What is the shelf life of ghee"})
+    taken = {1}
+    pairs, review, collisions = fuzzy_map_entries(
+        [entry("How do I store milk powder safely?"), entry("What is the shelf life of ghee?")], index, taken=taken
+    )
+
+    assert [pair[0] for pair, _item, _best in pairs] == [2]
+    assert [(item["q_en"], reason) for item, _matches, reason in collisions] == [
+        ("How do I store milk powder safely?", "taken")
+    ]
+    assert review == []
+    assert taken == {1, 2}
+
+
+def test_fuzzy_mapping_reports_rows_contesting_one_question():
+    from scripts.sync_eval_sheet import fuzzy_map_entries
+
+    index = fuzzy_index({1: "How do I store milk powder safely", 2: "What is the shelf life of ghee"})
+    pairs, _review, collisions = fuzzy_map_entries(
+        [entry("How do I store milk powder safely?"), entry("How do I store milk powder safely!")], index
+    )
+
+    assert pairs == []
+    assert [reason for _item, _matches, reason in collisions] == ["contested", "contested"]
+
+
+def test_fuzzy_mapping_reports_ties_instead_of_picking_one():
+    from scripts.sync_eval_sheet import fuzzy_map_entries
+
+    index = fuzzy_index({1: "How do I store milk powder", 2: "How do I store milk powder"})
+    pairs, _review, collisions = fuzzy_map_entries([entry("How do I store milk powder?")], index)
+
+    assert pairs == []
+    assert [reason for _item, _matches, reason in collisions] == ["tie"]
@@ -0,0 +1,40 @@
+import sqlite3
+import time
+
+import timings
+from conftest import import_questions, login
+
+
+def timing_rows(app):
+    conn = sqlite3.connect(app.config["DB_PATH"])
+    try:
+        return sorted(conn.execute("SELECT metric, ms, question_id FROM timing_events").fetchall())
+    finally:
+        conn.close()
+
+
+def test_malformed_beacons_are_rejected(app, admin_client):
+    import_questions(admin_client, 1, emails=("a@x.com",))
+    alice = login(app, "a@x.com")
+
+    for body in (b"[1, 2]", b'"render"', b"42", b"not json", b"{}"):
+        resp = alice.post("/annotate/timings", data=body, content_type="text/plain")
+        assert resp.status_code == 400, body
+
+
+def test_only_plausible_durations_are_recorded(app, admin_client):
+    app.config["TIMING_FLUSH_SIZE"] = 1
+    import_questions(admin_client, 1, emails=("a@x.com",))
+    alice = login(app, "a@x.com")
+
+    resp = alice.post(
+        "/annotate/timings",
+        json={"question_id": "1", "render_ms": 120, "interact_ms": True, "submit_ms": -5},
+    )
+
+    assert resp.status_code == 204
+    deadline = time.monotonic() + 5
+    while not timing_rows(app):
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    assert timing_rows(app) == [(timings.METRICS["render"], 120, 1)]
@@ -0,0 +1,71 @@
+import pytest
+
+import datasets
+import tracing
+from conftest import import_questions, login, submit
+
+SECRET = "trace-secret"
+
+
+def test_shapes_keep_structure_but_no_personal_text():
+    shape = tracing.value_shape(
+        SECRET,
+        None,
+        {
+            "save_action": "draft",
+            "question_id": "12",
+            "email": "Alice@X.com",
+            "password": "hunter2",
+            "answer_comment": "the answer cites the wrong plant",
+            "items": [{"rating": 4}],
+        },
+    )
+
+    assert shape == {
+        "save_action": "draft",
+        "question_id": "12",
+        "email": {"$email": tracing.email_pseudonym(SECRET, "alice@x.com")},
+        "password": {"$redacted": True},
+        "answer_comment": {"$len": 32},
+        "items": [{"rating": 4}],
+    }
+    replayed = tracing.synthesize(shape, {shape["email"]["$email"]: "alice@x.com"})
+    assert replayed["email"] == "alice@x.com"
+    assert replayed["answer_comment"] == "x" * 32
+    assert replayed["password"] == ""
+
+
+@pytest.fixture
+def traced_app(request, tmp_path, monkeypatch):
+    monkeypatch.setenv("TRACE_FILE", str(tmp_path / "trace.jsonl"))
+    monkeypatch.setenv("TRACE_SECRET", SECRET)
+    return request.getfixturevalue("app")
+
+
+def test_recorded_trace_is_anonymized_and_replays(traced_app, tmp_path):
+    from scripts.replay_trace import Replayer, TestClientSession, build_request, load_trace, resolve_identities
+
+    admin = traced_app.test_client()
+    admin.post(
+        "/admin/login", data={"email": traced_app.config["ADMIN_EMAIL"], "password": traced_app.config["ADMIN_PASSWORD"]}
+    )
+    import_questions(admin, 2, emails=("alice@x.com",))
+    alice = login(traced_app, "alice@x.com")
+    assert submit(alice, 1, answer_comment="private remark").status_code == 302
+
+    raw = (tmp_path / "trace.jsonl").read_text(encoding="utf-8")
+    assert "alice@x.com" not in raw and "private remark" not in raw
+    assert traced_app.config["ADMIN_PASSWORD"] not in raw
+    events = load_trace([str(tmp_path / "trace.jsonl")], datasets.DEFAULT_DATASET, 0)
+    (save,) = [event for event in events if event["endpoint"] == "annotate_save"]
+    assert save["user"] == tracing.user_pseudonym(SECRET, datasets.DEFAULT_DATASET, 1)
+    assert save["form"]["answer_comment"] == {"$len": len("private remark")}
+    assert save["status"] == 302
+
+    users, emails = resolve_identities(traced_app.config["DB_PATH"], SECRET, datasets.DEFAULT_DATASET)
+    assert build_request(save, emails)[1]["answer_comment"] == "x" * len("private remark")
+    replayer = Replayer(lambda: TestClientSession(traced_app), users, emails, "unused", "unused")
+    replayer.run(save, 0.0)
+    assert replayer.skipped == {}
+    ((key, _ms, _lag, status, recorded_status, _recorded_ms),) = replayer.results
+    assert (key, status, recorded_status) == ("POST annotate_save", 302, 302)
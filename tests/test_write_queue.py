@@ -0,0 +1,64 @@
+import sqlite3
+import threading
+
+import pytest
+
+import storage
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "wq.db"
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE t (v INTEGER NOT NULL)")
+    conn.commit()
+    conn.close()
+    return path
+
+
+def test_concurrent_writes_are_group_committed(db_path):
+    writer = storage.WriteQueue(db_path, batch_window_ms=50, max_batch=64)
+    start = threading.Barrier(20)
+
+    def work(i):
+        start.wait()
+        writer.execute("INSERT INTO t (v) VALUES (?)", (i,))
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = writer.stats()
+    assert stats["items"] == 20
+    assert stats["batches"] < 20
+    assert sqlite3.connect(db_path).execute("SELECT COUNT(*) FROM t").fetchone()[0] == 20
+    writer.stop()
+
+
+def test_failing_item_does_not_fail_its_batch(db_path):
+    writer = storage.WriteQueue(db_path, batch_window_ms=50)
+    ok = writer.submit("INSERT INTO t (v) VALUES (1)")
+    bad = writer.submit("INSERT INTO t (v) VALUES (NULL)")
+    assert ok.result(5) == 1
+    with pytest.raises(sqlite3.IntegrityError):
+        bad.result(5)
+    assert sqlite3.connect(db_path).execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1
+    writer.stop()
+
+
+def test_stop_commits_queued_writes_and_checkpoint_empties_wal(db_path):
+    writer = storage.WriteQueue(db_path, batch_window_ms=20)
+    futures = [writer.submit("INSERT INTO t (v) VALUES (?)", (i,)) for i in range(10)]
+    writer.stop()
+    assert all(future.done() for future in futures)
+    assert storage.checkpoint(db_path)[0] == 0
+    wal = db_path.parent / "wq.db-wal"
+    assert not wal.exists() or wal.stat().st_size == 0
+    assert sqlite3.connect(db_path).execute("SELECT COUNT(*) FROM t").fetchone()[0] == 10
+
+
+def test_checkpoint_ignores_missing_file(tmp_path):
+    assert storage.checkpoint(tmp_path / "missing.db") is None
+    assert not (tmp_path / "missing.db").exists()
@@ -0,0 +1,150 @@
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from storage import percentile
+
+# Stored codes; append new metrics, never renumber.
+METRICS = {
+    "render": 1,  # client: navigation start -> first contentful paint
+    "interact": 2,  # client: navigation start -> first input on the form
+    "submit": 3,  # client: navigation start -> Submit & Next (time on task)
+    "annotate": 4,  # server: GET /annotate handler
+    "save": 5,  # server: POST /annotate/save handler
+}
+CLIENT_METRICS = ("render", "interact", "submit")
+MAX_DURATION_MS = 6 * 60 * 60 * 1000  # longer page views are abandoned tabs, not work
+
+# One row per measurement: integer seconds, codes and milliseconds keep rows small.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS timing_events (
+    at INTEGER NOT NULL,
+    user_id INTEGER,
+    question_id INTEGER,
+    metric INTEGER NOT NULL,
+    ms INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_timing_events_at
+ON timing_events(at);
+"""
+
+
+def ensure_schema(conn: sqlite3.Connection) -> None:
+    conn.executescript(SCHEMA)
+
+
+class TimingBuffer:
+    """In-memory events handed to the writer in batches instead of one write each.
+
+    :meth:`add` returns the batch to write once ``flush_size`` events are
+    buffered or the oldest is ``flush_seconds`` old; events still buffered when
+    the process exits are lost.
+    """
+
+    def __init__(self, flush_size: int = 200, flush_seconds: float = 10.0):
+        self.flush_size = max(flush_size, 1)
+        self.flush_seconds = flush_seconds
+        self._events: list = []
+        self._first_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._flushes = 0
+        self._flushed_events = 0
+
+    def add(self, user_id, question_id, metric: str, ms: float) -> Optional[list]:
+        now = time.time()
+        with self._lock:
+            if not self._events:
+                self._first_at = now
+            self._events.append((int(now), user_id, question_id, METRICS[metric], int(round(ms))))
+            if len(self._events) >= self.flush_size or now - self._first_at >= self.flush_seconds:
+                return self._take()
+        return None
+
+    def drain(self) -> list:
+        with self._lock:
+            return self._take()
+
+    def _take(self) -> list:
+        events, self._events = self._events, []
+        if events:
+            self._flushes += 1
+            self._flushed_events += len(events)
+        return events
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "buffered": len(self._events),
+                "flushes": self._flushes,
+                "flushed_events": self._flushed_events,
+            }
+
+
+def write_events(conn: sqlite3.Connection, events: list, retention_days: float = 0) -> int:
+    conn.executemany(
+        "INSERT INTO timing_events (at, user_id, question_id, metric, ms) VALUES (?, ?, ?, ?, ?)", events
+    )
+    if retention_days > 0:
+        conn.execute("DELETE FROM timing_events WHERE at < ?", (int(time.time() - retention_days * 86400),))
+    return len(events)
+
+
+def _summary(values: list) -> dict:
+    return {
+        "n": len(values),
+        "p50": percentile(values, 50),
+        "p90": percentile(values, 90),
+        "p99": percentile(values, 99),
+    }
+
+
+def summarize(conn: sqlite3.Connection, since: int) -> dict:
+    """Percentiles per metric overall, per annotator and per question category.
+
+    Server and render timings separate app slowness from time on task; the
+    per-category time to submit is the question-difficulty signal. Throughput
+    is submits per hour of measured time on task.
+    """
+    codes = {code: name for name, code in METRICS.items()}
+    rows = conn.execute(
+        """
+        SELECT e.metric, e.ms, COALESCE(u.email, '(unknown)') AS email, COALESCE(q.category, '') AS category
+        FROM timing_events e
+        LEFT JOIN users u ON u.id = e.user_id
+        LEFT JOIN questions q ON q.id = e.question_id
+        WHERE e.at >= ?
+        """,
+        (since,),
+    ).fetchall()
+    overall, by_user, by_category = {}, {}, {}
+    for metric, ms, email, category in rows:
+        name = codes.get(metric)
+        if name is None:
+            continue
+        overall.setdefault(name, []).append(ms)
+        by_user.setdefault(email, {}).setdefault(name, []).append(ms)
+        by_category.setdefault(category, {}).setdefault(name, []).append(ms)
+
+    def group(values_by_metric: dict) -> dict:
+        submits = values_by_metric.get("submit", [])
+        hours = sum(submits) / 3_600_000
+        return {
+            "metrics": {name: _summary(values) for name, values in values_by_metric.items()},
+            "submitted": len(submits),
+            "per_hour": round(len(submits) / hours, 1) if hours else None,
+        }
+
+    return {
+        "events": len(rows),
+        "overall": {name: _summary(values) for name, values in overall.items()},
+        "users": sorted(
+            ({"email": email, **group(values)} for email, values in by_user.items()),
+            key=lambda row: (-row["submitted"], row["email"]),
+        ),
+        "categories": sorted(
+            ({"category": category, **group(values)} for category, values in by_category.items()),
+            key=lambda row: row["category"],
+        ),
+    }
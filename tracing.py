@@ -0,0 +1,179 @@
+import hashlib
+import hmac
+import json
+import os
+import random
+import re
+import threading
+import zlib
+from typing import Optional
+
+import storage
+
+# Field values kept as-is: app-defined choices and identifiers, never free text.
+VERBATIM_FIELDS = {
+    "action",
+    "assign_mode",
+    "dataset",
+    "format",
+    "import_mode",
+    "operation",
+    "pending_only",
+    "replace_assignments",
+    "save_action",
+    "since",
+    "slug",
+    "submission_status",
+    "tasks",
+}
+SECRET_FIELDS = {"password", "token"}  # not even the length is recorded
+MAX_VERBATIM_CHARS = 64
+MAX_BODY_BYTES = 256 * 1024  # larger bodies (bulk ingest, imports) are recorded by size only
+# Never replayed: streams stay open, and logins are re-established per session up front.
+REPLAY_SKIP_ENDPOINTS = {
+    "admin_assignments_stream",
+    "admin_login",
+    "admin_logout",
+    "annotator_login",
+    "annotator_logout",
+    "static",
+}
+
+_INTEGER = re.compile(r"^-?\d{1,18}$")
+_EMAIL = re.compile(r"^[^@\s,;]+@[^@\s,;]+$")
+
+
+def pseudonym(secret: str, kind: str, value) -> str:
+    """Stable, keyed stand-in for a user id or email; resolvable only with ``secret``."""
+    digest = hmac.new(secret.encode(), f"{kind}:{value}".encode(), hashlib.sha256).hexdigest()
+    return f"{kind[0]}-{digest[:16]}"
+
+
+def user_pseudonym(secret: str, dataset: str, user_id: int) -> str:
+    # User ids are per dataset file, so the dataset is part of the key.
+    return pseudonym(secret, "user", f"{dataset}:{user_id}")
+
+
+def email_pseudonym(secret: str, email: str) -> str:
+    return pseudonym(secret, "email", storage.normalize_email(email))
+
+
+def value_shape(secret: str, key: Optional[str], value):
+    """Anonymized stand-in for one input value.
+
+    Numbers, integers-as-strings and ``VERBATIM_FIELDS`` are kept; a single
+    email becomes ``{"$email": pseudonym}``; any other text only keeps its
+    length as ``{"$len": n}``. Objects and lists are walked recursively.
+    """
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, dict):
+        return {k: value_shape(secret, k, v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [value_shape(secret, key, v) for v in value]
+    if key in SECRET_FIELDS:
+        return {"$redacted": True}
+    value = str(value)
+    if _INTEGER.match(value.strip()) or (key in VERBATIM_FIELDS and len(value) <= MAX_VERBATIM_CHARS):
+        return value
+    if _EMAIL.match(value.strip()):
+        return {"$email": email_pseudonym(secret, value)}
+    return {"$len": len(value)}
+
+
+def multidict_shape(secret: str, values) -> dict:
+    shapes = {}
+    for key in values:
+        items = [value_shape(secret, key, v) for v in values.getlist(key)]
+        shapes[key] = items[0] if len(items) == 1 else items
+    return shapes
+
+
+def synthesize(shape, emails: Optional[dict] = None):
+    """Inverse of :func:`value_shape` for replay: same sizes, placeholder text.
+
+    ``emails`` maps email pseudonyms to addresses in the replay database.
+    """
+    if isinstance(shape, list):
+        return [synthesize(v, emails) for v in shape]
+    if isinstance(shape, dict):
+        if "$len" in shape:
+            return "x" * shape["$len"]
+        if "$email" in shape:
+            return (emails or {}).get(shape["$email"]) or f"{shape['$email']}@trace.invalid"
+        if "$redacted" in shape:
+            return ""
+        if "$file" in shape:
+            return None
+        return {k: synthesize(v, emails) for k, v in shape.items()}
+    return shape
+
+
+class TraceRecorder:
+    """Appends one anonymized JSON line per request to ``path``.
+
+    Lines carry the route, method, status and server time, the shape of query,
+    form and JSON inputs (see :func:`value_shape`) and keyed pseudonyms for the
+    annotator. ``{pid}`` in the path gives each worker process its own file.
+    Write failures are counted, never raised into the request.
+    """
+
+    def __init__(self, path: str, secret: str, sample: float = 1.0):
+        self.path = path.replace("{pid}", str(os.getpid()))
+        self.secret = secret
+        self.sample = sample
+        self._file = None
+        self._lock = threading.Lock()
+        self.recorded = 0
+        self.errors = 0
+
+    def wants(self) -> bool:
+        return self.sample >= 1.0 or random.random() < self.sample
+
+    def body_shape(self, request) -> dict:
+        """``{"json": shape}`` for small JSON bodies, else ``{"body_bytes": n}``."""
+        if request.files or request.form or not request.content_length:
+            return {}
+        shape = {"body_bytes": request.content_length}
+        if request.content_length > MAX_BODY_BYTES:
+            return shape
+        encoding = request.headers.get("Content-Encoding")
+        raw = request.get_data()
+        try:
+            payload = json.loads(storage.gunzip(raw, MAX_BODY_BYTES * 4) if encoding == "gzip" else raw)
+        except (EOFError, ValueError, zlib.error):
+            return shape
+        shape["json"] = value_shape(self.secret, None, payload)
+        if encoding == "gzip":
+            shape["encoding"] = "gzip"
+        return shape
+
+    def record(self, request, response, session, dataset: str, started_at: float, elapsed_ms: float) -> None:
+        event = {
+            "ts": round(started_at, 3),
+            "method": request.method,
+            "endpoint": request.endpoint,
+            "path": request.path,
+            "args": multidict_shape(self.secret, request.args),
+            "form": multidict_shape(self.secret, request.form),
+            "files": {key: {"$file": True} for key in request.files},
+            **self.body_shape(request),
+            "dataset": dataset,
+            "user": user_pseudonym(self.secret, dataset, session["user_id"]) if session.get("user_id") else None,
+            "admin": bool(session.get("is_admin")),
+            "status": response.status_code,
+            "ms": round(elapsed_ms, 2),
+        }
+        line = json.dumps(event, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._lock:
+            try:
+                if self._file is None:
+                    self._file = open(self.path, "a", encoding="utf-8")
+                self._file.write(line)
+                self._file.flush()
+                self.recorded += 1
+            except OSError:
+                self.errors += 1
+
+    def stats(self) -> dict:
+        return {"path": self.path, "sample": self.sample, "recorded": self.recorded, "errors": self.errors}